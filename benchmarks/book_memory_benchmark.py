@@ -0,0 +1,76 @@
+# Memory benchmark for the different ways of storing books
+# Compares the old dictionary-based Book, the __slots__ Book and the columnar BookColumns store
+# Run from the project folder:  python -m benchmarks.book_memory_benchmark
+
+import tracemalloc
+
+from models.book import Book
+from models.book_columns import BookColumns
+
+BOOK_COUNT = 200_000
+
+AUTHORS = [f"Author {i}" for i in range(2_000)]
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+
+
+class DictBook:
+    """
+    Copy of the old Book class (no __slots__, id stored twice) for comparison
+    """
+    def __init__(self, book_id, title, author, genre, price, in_stock=True, image_path=None):
+        self.book_id = book_id
+        self.id = book_id
+        self.title = title
+        self.author = author
+        self.genre = genre
+        self.price = price
+        self.in_stock = in_stock
+        self.image_path = image_path
+
+
+def book_rows():
+    """
+    Generate the same fake book data for every test
+    """
+    for i in range(BOOK_COUNT):
+        yield (100_000 + i, f"Title number {i}", AUTHORS[i % len(AUTHORS)],
+               GENRES[i % len(GENRES)], 5.0 + (i % 5_000) / 100)
+
+
+def measure(build):
+    """
+    Return how many bytes build() allocated (and is still holding)
+    """
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def build_columns():
+    store = BookColumns()
+    for row in book_rows():
+        store.append(*row)
+    return store
+
+
+def main():
+    results = [
+        ("Old Book (__dict__)", measure(lambda: [DictBook(*row) for row in book_rows()])),
+        ("Book (__slots__)", measure(lambda: [Book(*row) for row in book_rows()])),
+        ("BookColumns", measure(build_columns)),
+    ]
+
+    print(f"Memory used by {BOOK_COUNT:,} books")
+    print("=" * 60)
+    print(f"{'Storage':<22} | {'Total MB':>9} | {'Bytes per book':>14}")
+    print("-" * 60)
+    for name, total in results:
+        print(f"{name:<22} | {total / 1_000_000:9.1f} | {total / BOOK_COUNT:14.0f}")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Benchmark for copy-on-write snapshots (SnapshotInventory)
+# A report thread exports the whole catalogue in title order while a writer thread keeps editing it.
+#   - locked:   ThreadSafeInventory, export holds the read lock throughout (consistent, but edits wait)
+#   - snapshot: SnapshotInventory, export reads a snapshot (consistent, edits carry on)
+# Also reports how long taking a snapshot takes and how much memory an old snapshot keeps alive.
+# Run from the project folder:  python -m benchmarks.cow_snapshot_benchmark
+
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from models.book import Book
+from data_structures.snapshot_inventory import InventorySnapshot, SnapshotInventory
+from data_structures.thread_safe_inventory import ThreadSafeInventory
+from storage.book_io import export_books
+
+BOOK_COUNT = 200_000
+CHANGES = 1_000         # Edits made while measuring snapshot memory
+
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+
+
+def make_books():
+    return [Book(100_000 + i, f"Title number {i}", f"Author {i % 5_000}", GENRES[i % len(GENRES)],
+                 5.0 + (i % 5_000) / 100)
+            for i in range(BOOK_COUNT)]
+
+
+def writer(inventory, stop, counts):
+    # Keep changing prices until told to stop
+    rng = random.Random(7)
+    while not stop.is_set():
+        inventory.update(100_000 + rng.randrange(BOOK_COUNT), price=rng.randrange(100, 5000) / 100)
+        counts["edits"] += 1
+
+
+def run_report(inventory, path, use_snapshot):
+    """
+    Export every book while a writer thread edits
+    Returns (export seconds, edits made during the export, rows written)
+    """
+    stop = threading.Event()
+    counts = {"edits": 0}
+    thread = threading.Thread(target=writer, args=(inventory, stop, counts))
+    thread.start()
+    time.sleep(0.2)     # Let the writer get going
+
+    start = time.perf_counter()
+    edits_before = counts["edits"]
+    if use_snapshot:
+        report = export_books(inventory.snapshot().iter_sorted(), path)
+    else:
+        with inventory.lock.read():
+            report = export_books(inventory.tree.iter_sorted(), path)
+    elapsed = time.perf_counter() - start
+    edits = counts["edits"] - edits_before
+
+    stop.set()
+    thread.join()
+    return elapsed, edits, report.rows
+
+
+def measure_snapshot_memory(books):
+    """
+    (memory kept alive by one old snapshot after CHANGES edits, memory of one full copy of the snapshot structures)
+    Everything is built while tracemalloc is running, so memory freed by dropping the old snapshot is counted
+    """
+    rng = random.Random(3)
+    tracemalloc.start()
+    inventory = SnapshotInventory.from_books(books)
+
+    before = tracemalloc.get_traced_memory()[0]
+    full_copy = InventorySnapshot.from_sorted_books(inventory.tree.iter_sorted())
+    full_copy_size = tracemalloc.get_traced_memory()[0] - before
+    del full_copy
+
+    old_snapshot = inventory.snapshot()
+    for _ in range(CHANGES):
+        inventory.update(100_000 + rng.randrange(BOOK_COUNT), price=rng.randrange(100, 5000) / 100)
+    with_old = tracemalloc.get_traced_memory()[0]
+    del old_snapshot
+    without_old = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return with_old - without_old, full_copy_size
+
+
+def main():
+    books = make_books()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "report.csv")
+
+        locked = ThreadSafeInventory.from_books(books)
+        locked_time, locked_edits, locked_rows = run_report(locked, path, use_snapshot=False)
+
+        books = make_books()    # Fresh Book objects (the locked run changed prices in place)
+        snapshot_inventory = SnapshotInventory.from_books(books)
+        snapshot_time, snapshot_edits, snapshot_rows = run_report(snapshot_inventory, path, use_snapshot=True)
+
+    start = time.perf_counter()
+    for _ in range(100_000):
+        snapshot_inventory.snapshot()
+    snapshot_cost = (time.perf_counter() - start) / 100_000
+
+    kept_memory, full_copy = measure_snapshot_memory(make_books())
+
+    print(f"Copy-on-write snapshots, {BOOK_COUNT:,} books")
+    print("=" * 60)
+    print(f"{'Report':10}  {'Export':>8}  {'Rows':>8}  {'Edits during export':>20}")
+    print(f"{'locked':10}  {locked_time:7.2f}s  {locked_rows:8,}  {locked_edits:20,}")
+    print(f"{'snapshot':10}  {snapshot_time:7.2f}s  {snapshot_rows:8,}  {snapshot_edits:20,}")
+    print("(with a snapshot the edits share the CPU with the export, so the export itself takes longer)")
+    print("-" * 60)
+    print(f"Take a snapshot:       {snapshot_cost * 1_000_000_000:10.0f} ns")
+    print(f"Old snapshot kept alive after {CHANGES:,} edits: {kept_memory / 1_000_000:6.1f} MB "
+          f"({kept_memory / CHANGES:,.0f} bytes per edit)")
+    print(f"A full copy instead:                      {full_copy / 1_000_000:6.1f} MB")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
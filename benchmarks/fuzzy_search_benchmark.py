@@ -0,0 +1,95 @@
+# Benchmark for typo-tolerant title search (FuzzyTitleIndex)
+# Builds 500,000 made-up titles, then searches for titles with typos added
+# and reports how long each search takes (target: under 50 ms)
+# Run from the project folder:  python -m benchmarks.fuzzy_search_benchmark
+
+import random
+import time
+
+from models.book import Book
+from data_structures.fuzzy_index import FuzzyTitleIndex
+
+TITLE_COUNT = 500_000
+VOCABULARY_SIZE = 40_000    # Different words used in the titles
+SEARCHES = 500
+
+COMMON_WORDS = ["the", "of", "and", "a", "in", "to"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_vocabulary(rng):
+    # Made-up words built from syllables, 4 to 12 letters long
+    syllables = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["th", "st", "er", "an", "ing"]
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        if 4 <= len(word) <= 12:
+            words.add(word)
+    return sorted(words)
+
+
+def make_titles(rng, vocabulary):
+    # 2-6 word titles, with some common words mixed in like real titles
+    titles = set()
+    while len(titles) < TITLE_COUNT:
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(2, 5))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(COMMON_WORDS))
+        titles.add(" ".join(words).title())
+    return list(titles)
+
+
+def add_typos(rng, title, typos):
+    # Make a few random single letter mistakes (change, delete, insert or swap)
+    letters = list(title.lower())
+    for _ in range(typos):
+        position = rng.randrange(len(letters))
+        kind = rng.randrange(4)
+        if kind == 0:
+            letters[position] = rng.choice(LETTERS)
+        elif kind == 1 and len(letters) > 1:
+            del letters[position]
+        elif kind == 2:
+            letters.insert(position, rng.choice(LETTERS))
+        elif position + 1 < len(letters):
+            letters[position], letters[position + 1] = letters[position + 1], letters[position]
+    return "".join(letters)
+
+
+def main():
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    titles = make_titles(rng, vocabulary)
+    books = [Book(100_000 + i, title, "Author", "Fiction", 9.99) for i, title in enumerate(titles)]
+
+    start = time.perf_counter()
+    index = FuzzyTitleIndex.from_books(books)
+    build_time = time.perf_counter() - start
+
+    times = []
+    found = 0
+    for _ in range(SEARCHES):
+        book = rng.choice(books)
+        search = add_typos(rng, book.title, rng.randint(1, 2))
+
+        start = time.perf_counter()
+        results = index.search(search, limit=5)
+        times.append(time.perf_counter() - start)
+
+        if any(result_book is book for _, result_book in results):
+            found += 1
+
+    times.sort()
+    print(f"Fuzzy title search over {TITLE_COUNT:,} titles ({len(vocabulary):,} word vocabulary)")
+    print("=" * 50)
+    print(f"Build index:     {build_time:8.2f} s")
+    print(f"Searches:        {SEARCHES:8,} (1-2 typos each)")
+    print(f"Found original:  {found / SEARCHES:8.1%} in top 5")
+    print(f"Median:          {times[len(times) // 2] * 1000:8.2f} ms")
+    print(f"99th percentile: {times[int(len(times) * 0.99)] * 1000:8.2f} ms")
+    print(f"Slowest:         {times[-1] * 1000:8.2f} ms")
+    print("-" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Benchmark for the self-resizing HashTable
+# Shows that find_book stays flat as the number of books grows from 10 to 1,000,000
+# Run from the project folder:  python -m benchmarks.hash_table_benchmark
+
+import random
+import time
+
+from models.book import Book
+from data_structures.hash_table import HashTable
+
+# Number of books to test with
+BOOK_COUNTS = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Number of lookups to time at each size
+LOOKUPS = 10_000
+
+
+def build_table(book_count, **table_options):
+    """
+    Create a hash table filled with book_count fake books
+    """
+    table = HashTable(**table_options)
+
+    for book_id in range(book_count):
+        table.add_book(Book(book_id, f"Title {book_id}", "Author", "Genre", 9.99))
+
+    return table
+
+
+def time_lookups(table, book_count):
+    """
+    Time LOOKUPS random find_book calls and return the average in microseconds
+    """
+    ids = [random.randrange(book_count) for _ in range(LOOKUPS)]
+
+    start = time.perf_counter()
+    for book_id in ids:
+        table.find_book(book_id)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / LOOKUPS * 1_000_000
+
+
+def main():
+    print("HashTable find_book latency")
+    print("=" * 60)
+    print(f"{'Books':>10} | {'Resizing (us)':>14} | {'Buckets':>9} | {'Fixed size=10 (us)':>18}")
+    print("-" * 60)
+
+    for book_count in BOOK_COUNTS:
+        resizing = build_table(book_count)
+        resizing_time = time_lookups(resizing, book_count)
+
+        # The old fixed-size table gets very slow, so only test it on the smaller sizes
+        if book_count <= 10_000:
+            fixed = build_table(book_count, max_load_factor=float("inf"))
+            fixed_time = f"{time_lookups(fixed, book_count):18.2f}"
+        else:
+            fixed_time = f"{'(skipped)':>18}"
+
+        print(f"{book_count:>10} | {resizing_time:14.2f} | {resizing.size:>9} | {fixed_time}")
+
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
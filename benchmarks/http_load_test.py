@@ -0,0 +1,168 @@
+# Load test for the HTTP service (server.http_service)
+# Starts the service on a catalogue of made-up books (in a separate process, so the test client
+# doesn't slow it down), then many connections send a mix of requests as fast as they can:
+#   80% look up a book by ID, 10% word search, 5% a page of the sorted list, 5% change a price
+# Each run is repeated with pipelining (several requests sent before reading the answers).
+# Reports requests per second and the 50th / 99th percentile time to get an answer.
+#
+# Run from the project folder:
+#   python -m benchmarks.http_load_test
+#   python -m benchmarks.http_load_test --url 127.0.0.1:8080     (test a server that is already running,
+#                                                                  read-only requests)
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from models.book import Book
+from data_structures.inventory import Inventory
+from storage.catalogue_store import CatalogueStore
+
+BOOK_COUNT = 100_000
+FIRST_ID = 100_000
+CONNECTIONS = 50
+REQUESTS_PER_CONNECTION = 400
+PIPELINE_DEPTHS = (1, 8)
+
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+SEARCH_WORDS = ["fantasy", "mystery", "author 12", "number 4242", "fiction or romance"]
+
+
+def make_catalogue(path):
+    books = (Book(FIRST_ID + i, f"Title number {i}", f"Author {i % 5_000}", GENRES[i % len(GENRES)],
+                  5.0 + (i % 5_000) / 100)
+             for i in range(BOOK_COUNT))
+    store = CatalogueStore(path)
+    store.save(Inventory.from_books(books))
+    store.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_request(rng, writes):
+    # One random request from the mix, as bytes
+    book_id = FIRST_ID + rng.randrange(BOOK_COUNT)
+    choice = rng.random()
+    if choice < 0.80:
+        return f"GET /books/{book_id} HTTP/1.1\r\nHost: bookstore\r\n\r\n".encode()
+    if choice < 0.90:
+        query = rng.choice(SEARCH_WORDS).replace(" ", "+")
+        return f"GET /search?q={query}&limit=20 HTTP/1.1\r\nHost: bookstore\r\n\r\n".encode()
+    if choice < 0.95 or not writes:
+        offset = rng.randrange(BOOK_COUNT)
+        return f"GET /books?sort=title&offset={offset}&limit=20 HTTP/1.1\r\nHost: bookstore\r\n\r\n".encode()
+
+    body = f'{{"price": {rng.randrange(500, 5000) / 100}}}'.encode()
+    return (f"PATCH /books/{book_id} HTTP/1.1\r\nHost: bookstore\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def read_response(reader):
+    # Read one response and return its status code
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(lines[0].split()[1])
+
+
+async def run_connection(host, port, depth, writes, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(REQUESTS_PER_CONNECTION // depth):
+            # Send depth requests in one go, then read the answers (they come back in order)
+            writer.write(b"".join(make_request(rng, writes) for _ in range(depth)))
+            sent = time.perf_counter()
+            await writer.drain()
+            for _ in range(depth):
+                status = await read_response(reader)
+                latencies.append(time.perf_counter() - sent)
+                if status >= 400:
+                    errors.append(status)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, depth, writes):
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(host, port, depth, writes, seed, latencies, errors)
+                           for seed in range(CONNECTIONS)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+async def wait_for_server(host, port, process):
+    # Keep trying to connect until the server has loaded the catalogue
+    while True:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Server stopped before it was ready")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+
+
+def report(depth, elapsed, latencies, errors):
+    count = len(latencies)
+    print(f"{depth:5}  {count:9,}  {count / elapsed:9,.0f}  {latencies[count // 2] * 1000:8.2f}"
+          f"  {latencies[int(count * 0.99)] * 1000:8.2f}  {latencies[-1] * 1000:8.2f}  {len(errors):6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the bookstore HTTP service")
+    parser.add_argument("--url", help="host:port of a running server (default: start one)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        process = None
+        if args.url:
+            host, _, port = args.url.rpartition(":")
+            port = int(port)
+        else:
+            host, port = "127.0.0.1", free_port()
+            catalogue = os.path.join(folder, "load_test.catalogue")
+            make_catalogue(catalogue)
+            process = subprocess.Popen([sys.executable, "-m", "server.http_service", "--host", host,
+                                        "--port", str(port), "--catalogue", catalogue],
+                                       stdout=subprocess.DEVNULL)
+
+        try:
+            asyncio.run(wait_for_server(host, port, process))
+            print(f"HTTP load test: {CONNECTIONS} connections x {REQUESTS_PER_CONNECTION} requests "
+                  f"({BOOK_COUNT:,} books)")
+            print("=" * 64)
+            print(f"{'Depth':>5}  {'Requests':>9}  {'Req/s':>9}  {'p50 ms':>8}  {'p99 ms':>8}  {'Max ms':>8}  {'Errors':>6}")
+            for depth in PIPELINE_DEPTHS:
+                elapsed, latencies, errors = asyncio.run(run_load(host, port, depth, writes=process is not None))
+                report(depth, elapsed, latencies, errors)
+            print("-" * 64)
+            print("Depth = requests sent on a connection before reading the answers (pipelining)")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
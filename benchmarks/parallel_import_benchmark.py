@@ -0,0 +1,70 @@
+# Benchmark for importing a big CSV file on one process vs several (storage.book_io)
+# Reports the read/check time and the total import time (read + building the inventory)
+# for each number of worker processes, and the speedup over one process.
+# Only reading and checking rows runs in parallel - the inventory is built in the main process,
+# so the total import can't get faster than the time that takes.
+# Extra workers only help with more than one CPU - on a single CPU they make the import slower.
+# Run from the project folder:  python -m benchmarks.parallel_import_benchmark
+
+import os
+import tempfile
+import time
+
+from models.book import Book
+from data_structures.inventory import Inventory
+from storage.book_io import TransferReport, export_books, read_books, read_books_parallel
+
+BOOK_COUNT = 1_000_000
+
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+
+
+def read(path, workers, report):
+    if workers == 1:
+        return read_books(path, report)
+    return read_books_parallel(path, report, workers=workers)
+
+
+def time_import(path, workers):
+    # (seconds to read and check every row, seconds for the whole import)
+    # The books are streamed straight into Inventory.from_books, the same as import_books does
+    start = time.perf_counter()
+    count = sum(1 for _ in read(path, workers, TransferReport()))
+    read_time = time.perf_counter() - start
+
+    report = TransferReport()
+    start = time.perf_counter()
+    inventory = Inventory.from_books(read(path, workers, report))
+    total_time = time.perf_counter() - start
+
+    assert count == inventory.size == BOOK_COUNT and report.rejected == 0
+    return read_time, total_time
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpu_count})
+
+    books = (Book(100_000 + i, f"Title number {i}", f"Author {i % 5_000}", GENRES[i % len(GENRES)],
+                  5.0 + (i % 5_000) / 100, in_stock=i % 7 != 0)
+             for i in range(BOOK_COUNT))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "feed.csv")
+        export_books(books, path)
+        file_size = os.path.getsize(path)
+
+        results = {workers: time_import(path, workers) for workers in worker_counts}
+
+    base_read, base_total = results[1]
+    print(f"Import of {BOOK_COUNT:,} rows ({file_size / 1_000_000:.0f} MB CSV), {cpu_count} CPUs")
+    print("=" * 64)
+    print(f"{'Workers':>7}  {'Read':>8}  {'Rows/s':>10}  {'Speedup':>7}  {'Total':>8}  {'Speedup':>7}")
+    for workers, (read_time, total_time) in results.items():
+        print(f"{workers:7}  {read_time:7.2f}s  {BOOK_COUNT / read_time:10,.0f}  {base_read / read_time:6.2f}x"
+              f"  {total_time:7.2f}s  {base_total / total_time:6.2f}x")
+    print("-" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Benchmark for saving and re-opening a large catalogue snapshot
+# Run from the project folder:  python -m benchmarks.snapshot_benchmark
+
+import os
+import tempfile
+import time
+
+from models.book import Book
+from data_structures.inventory import Inventory
+from storage.catalogue_store import CatalogueStore
+from storage.mapped_catalogue import MappedCatalogue
+
+BOOK_COUNT = 1_000_000
+
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+
+
+def main():
+    books = (Book(100_000 + i, f"Title number {i}", f"Author {i % 5_000}", GENRES[i % len(GENRES)],
+                  5.0 + (i % 5_000) / 100)
+             for i in range(BOOK_COUNT))
+    inventory = Inventory.from_books(books)
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = CatalogueStore(os.path.join(folder, "benchmark.catalogue"))
+
+        start = time.perf_counter()
+        store.save(inventory)
+        save_time = time.perf_counter() - start
+        file_size = os.path.getsize(store.path)
+        store.close()
+
+        start = time.perf_counter()
+        reopened = CatalogueStore(store.path).open()
+        open_time = time.perf_counter() - start
+
+        # Read-only memory-mapped mode - nothing is loaded until it is looked up
+        start = time.perf_counter()
+        with MappedCatalogue(store.path) as mapped:
+            mapped_open_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(0, BOOK_COUNT, BOOK_COUNT // 1_000):
+                mapped.get(100_000 + i)
+                mapped.get_by_title(f"Title number {i}")
+            mapped_lookup_time = (time.perf_counter() - start) / 2_000
+
+        # An emptied catalogue must save and re-open too
+        empty_store = CatalogueStore(os.path.join(folder, "empty.catalogue"))
+        empty_store.save(Inventory())
+        empty_store.close()
+        empty_ok = CatalogueStore(empty_store.path).open().size == 0
+
+    print(f"Snapshot of {BOOK_COUNT:,} books")
+    print("=" * 40)
+    print(f"File size:  {file_size / 1_000_000:8.1f} MB")
+    print(f"Save:       {save_time:8.2f} s")
+    print(f"Open:       {open_time:8.2f} s")
+    print(f"Books back: {reopened.size:8,}")
+    print(f"Open (mmap):{mapped_open_time:8.4f} s")
+    print(f"mmap lookup:{mapped_lookup_time * 1_000_000:8.1f} us")
+    print(f"Empty save: {'ok' if empty_ok else 'FAILED':>8}")
+    print("-" * 40)
+
+
+if __name__ == "__main__":
+    main()
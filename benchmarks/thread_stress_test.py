@@ -0,0 +1,171 @@
+# Stress test for ThreadSafeInventory
+# Many threads hammer one inventory with a mix of lookups, searches, loops over the books,
+# adds, edits and deletes at the same time. Afterwards every structure is checked
+# to make sure they still hold exactly the same books and are in order.
+#
+# Run from the project folder:
+#   python -m benchmarks.thread_stress_test
+#   python -m benchmarks.thread_stress_test --unsafe     (same test on the plain Inventory, no locking)
+
+import argparse
+from itertools import islice
+import random
+import sys
+import threading
+import time
+
+from models.book import Book
+from data_structures.inventory import Inventory
+from data_structures.thread_safe_inventory import ThreadSafeInventory
+
+BOOK_COUNT = 20_000
+THREADS = 16
+OPERATIONS_PER_THREAD = 2_000
+WRITE_SHARE = 0.2       # Fraction of operations that change the inventory
+
+GENRES = ["Fantasy", "Fiction", "Historical Fiction", "Science Fiction", "Mystery", "Romance"]
+
+
+def make_book(book_id, rng):
+    return Book(book_id, f"Title {book_id} {rng.randrange(1000)}", f"Author {book_id % 500}",
+                rng.choice(GENRES), rng.randrange(100, 5000) / 100)
+
+
+def worker(inventory, seed, counts, errors):
+    rng = random.Random(seed)
+    next_id = 1_000_000 * (seed + 1)    # Each thread adds books with its own IDs
+    try:
+        for _ in range(OPERATIONS_PER_THREAD):
+            choice = rng.random()
+            book_id = rng.randrange(1, BOOK_COUNT + 1)
+
+            if choice < WRITE_SHARE / 3:
+                next_id += 1
+                inventory.add(make_book(next_id, rng))
+                counts["add"] += 1
+            elif choice < WRITE_SHARE * 2 / 3:
+                inventory.update(book_id, title=f"Renamed {book_id} {rng.randrange(1000)}",
+                                 price=rng.randrange(100, 5000) / 100, genre=rng.choice(GENRES))
+                counts["update"] += 1
+            elif choice < WRITE_SHARE:
+                inventory.remove(book_id)
+                counts["remove"] += 1
+            elif choice < 0.60:
+                inventory.get(book_id)
+                counts["get"] += 1
+            elif choice < 0.70:
+                list(islice(inventory.prefix(f"title {rng.randrange(100)}"), 50))
+                counts["prefix"] += 1
+            elif choice < 0.80:
+                start = rng.randrange(BOOK_COUNT)
+                list(inventory.slice(start, start + 50))
+                counts["slice"] += 1
+            elif choice < 0.90:
+                inventory.search(rng.choice(GENRES), limit=20)
+                counts["search"] += 1
+            elif choice < 0.98:
+                inventory.find(genre=rng.choice(GENRES), max_price=10)
+                counts["find"] += 1
+            else:
+                # Whole-catalogue loop (like drawing every page of the book list)
+                sum(1 for _ in inventory)
+                counts["iterate"] += 1
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+
+
+def check_consistency(inventory):
+    """
+    Problems found in the structures (empty list = all fine)
+    """
+    problems = []
+    list_books = []
+    node = inventory.linked_list.head
+    previous = None
+    while node is not None and len(list_books) <= inventory.linked_list.size:
+        if node.prev is not previous:
+            problems.append(f"Linked list back link broken at book {node.data.id}")
+        list_books.append(node.data)
+        previous, node = node, node.next
+
+    size = len(list_books)
+    if size != inventory.linked_list.size:
+        problems.append(f"Linked list has {size} books but size says {inventory.linked_list.size}")
+    if inventory.hash_table.count != size:
+        problems.append(f"Hash table has {inventory.hash_table.count} books, linked list {size}")
+    if inventory.tree.size != size:
+        problems.append(f"Tree has {inventory.tree.size} books, linked list {size}")
+
+    for book in list_books:
+        if inventory.hash_table.find_book(book.id) is not book:
+            problems.append(f"Book {book.id} missing from the hash table")
+        if inventory.tree.search_by_title(book.title) is not book:
+            problems.append(f"Book {book.id} ({book.title}) missing from the tree")
+
+    titles = [book.title.lower() for book in inventory.tree.iter_sorted()]
+    if titles != sorted(titles) or len(titles) != size:
+        problems.append("Tree is out of order")
+    if inventory.tree.root is not None and inventory.tree.root.count != size:
+        problems.append(f"Tree root counts {inventory.tree.root.count} books, linked list {size}")
+
+    for field, index in inventory._all_indexes():
+        if index.size != size:
+            problems.append(f"{type(index).__name__} ({field}) has {index.size} books, linked list {size}")
+    for book in list_books:
+        if book not in inventory.author_index.find(book.author):
+            problems.append(f"Book {book.id} missing from the author index")
+            break
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress test the thread-safe inventory")
+    parser.add_argument("--unsafe", action="store_true", help="use the plain Inventory (no locking)")
+    args = parser.parse_args(argv)
+
+    # Switch threads much more often than usual, so badly timed switches actually happen
+    sys.setswitchinterval(0.00001)
+
+    rng = random.Random(1)
+    inventory_class = Inventory if args.unsafe else ThreadSafeInventory
+    inventory = inventory_class.from_books(make_book(book_id, rng) for book_id in range(1, BOOK_COUNT + 1))
+    inventory.text_index    # Built up front so it is kept up to date (and checked) too
+
+    counts = {name: 0 for name in ("get", "prefix", "slice", "search", "find", "iterate",
+                                   "add", "update", "remove")}
+    thread_counts = [dict(counts) for _ in range(THREADS)]
+    errors = []
+    threads = [threading.Thread(target=worker, args=(inventory, seed, thread_counts[seed], errors))
+               for seed in range(THREADS)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    for thread_count in thread_counts:
+        for name, count in thread_count.items():
+            counts[name] += count
+    total = sum(counts.values())
+    problems = check_consistency(inventory)
+
+    print(f"{inventory_class.__name__} stress test: {THREADS} threads, {total:,} operations, "
+          f"{BOOK_COUNT:,} books to start")
+    print("=" * 60)
+    print("  ".join(f"{name} {count:,}" for name, count in counts.items()))
+    print(f"Time:        {elapsed:8.2f} s ({total / elapsed:,.0f} operations/s)")
+    print(f"Books now:   {inventory.size:8,}")
+    print(f"Errors:      {len(errors):8}")
+    for error in errors[:5]:
+        print(f"  {error}")
+    print(f"Problems:    {len(problems):8}")
+    for problem in problems[:10]:
+        print(f"  {problem}")
+    print("-" * 60)
+    print("PASS" if not errors and not problems else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,43 @@
 # Basic GUI Window for Bookstore Application
 
+# Import os for building the catalogue file path
+import os
+
+# islice takes just the first page of results from a search
+from itertools import islice
+
+# Import queue and a thread pool so images are decoded without freezing the window
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
 # Import tkinter - Python's built-in GUI library
 import tkinter as tk
 from tkinter import filedialog  # For file browser dialog
 
 # Import my classes from Part 1
 from models.book import Book
-from data_structures.linked_list import DoubleLinkedList
-from data_structures.hash_table import HashTable
-from data_structures.binary_tree import BinaryTree
+from data_structures.inventory import Inventory
 
-# Import my image validation utility (uses Pillow library)
+# Import the storage layer so the catalogue is saved between runs
+from storage.catalogue_store import CatalogueStore
+# Import the CSV / JSON Lines importer and exporter (reads and writes one row at a time)
+from storage.book_io import export_books, import_books
+
+# Import my image validation utility (reads just the image file header)
 from utils.image_validator import validate_image
 
+# Import the thumbnail cache so cover images are only resized once
+from utils.thumbnail_cache import ThumbnailCache
+
+# Catalogue file is kept next to this script (edits are also logged to bookstore.catalogue.log)
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bookstore.catalogue")
+
+# Resized cover thumbnails are saved here so they don't need to be made again next time
+THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".thumbnails")
+
+# Books added to a non-empty catalogue per step of an import (the window handles its events in between)
+IMPORT_CHUNK_SIZE = 2000
+
 class BookstoreGUI:
     """
     Main class for my bookstore GUI application
@@ -44,13 +69,63 @@ class BookstoreGUI:
         self.accent_color = "#2c5f7d"
 
         # Initialize data structures from Part 1
-        # These are the same structures I used in main.py
-        self.inventory = DoubleLinkedList()  # For storing books in order
-        self.quick_lookup = HashTable()      # For fast ID-based searches
-        self.tree_lookup = BinaryTree()      # For alphabetical sorting/searching
+        # The Inventory class owns the same three structures I used in main.py
+        # and keeps them in sync whenever a book is added, edited or deleted
+        self.catalogue = Inventory()
+
+        # Open the saved catalogue if there is one (this also recovers edits made before a crash)
+        # Otherwise start with some sample books and save them
+        self.store = CatalogueStore(CATALOGUE_PATH)
+        if self.store.exists():
+            self.catalogue = self.store.open()
+        else:
+            self.load_sample_books()
+            self.store.attach(self.catalogue)
+            self.store.save()
 
-        # Add some sample books
-        self.load_sample_books()
+        # Save a fresh snapshot when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Cover thumbnails (80 pixels tall), kept in memory and in THUMBNAIL_DIR
+        self.thumbnail_cache = ThumbnailCache(height=80, cache_dir=THUMBNAIL_DIR)
+
+        # Worker threads for decoding/resizing covers and validating images
+        # Finished jobs are put on finished_jobs and picked up by the main thread
+        self.worker_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cover-worker")
+        self.finished_jobs = queue.Queue()
+        self.root.after(50, self._poll_background_jobs)
+
+        # Grey box shown where a cover will appear while it is still loading
+        self.placeholder_image = tk.PhotoImage(width=53, height=80)
+        self.placeholder_image.put("#d0d0d0", to=(0, 0, 53, 80))
+
+        # Cover jobs for the books currently shown (cancelled when the list is redrawn)
+        self.pending_covers = []
+
+        # Store image references so they don't get garbage collected
+        # This is important - tkinter needs to keep the images in memory
+        self.current_images = {}    # cover name -> PhotoImage
+        self.row_covers = {}        # book_id -> cover name shown in that book's row
+
+        # File import running in the background (see import_file)
+        # While it runs, books can't be added, edited or deleted
+        self.import_running = False
+        self.import_save_job = None     # Snapshot save at the end of an import (waited for on close)
+
+        # Book list paging - only one page of books is drawn at a time
+        self.page_size = 50
+        self.page_start_id = None   # ID of the first book on the current page (None = start of list)
+        self.page_number = 1
+        self.visible_ids = []       # IDs of the books on the current page
+        self.showing_books = False  # False while the instructions are shown instead
+        self.sorted_view = False    # True = pages in alphabetical order (binary tree) instead of the order added
+        self.sorted_position = 0    # Alphabetical position of the first book on the page (sorted view)
+        self.current_filter = None  # (author, genre, min price, max price) of the last filter
+        self.search_query = ""      # Text in the search box when it was last searched
+        self.search_job = None      # Pending after() call for the type-ahead search
+        self.redraw_results = None  # Function that redraws the search/filter results being shown (None = not shown)
+        self.view_generation = 0    # Goes up every time the text area is cleared
+        self.cover_counter = 0      # Used to give each cover a unique name
 
         # Header section
         header_frame = tk.Frame(self.root, bg=self.accent_color)
@@ -61,7 +136,7 @@ class BookstoreGUI:
         welcome_label.pack(pady=12)
 
         # Book count label
-        self.book_count_label = tk.Label(self.root, text=f"Books loaded: {self.inventory.size}",
+        self.book_count_label = tk.Label(self.root, text=f"Books loaded: {self.catalogue.size}",
                                         font=("Arial", 10), bg=self.bg_color)
         self.book_count_label.pack(pady=(0, 8))
 
@@ -81,14 +156,68 @@ class BookstoreGUI:
                                        padx=20, pady=6, relief="flat", cursor="hand2")
         instructions_button.pack(side="left", padx=5)
 
+        # Previous/Next page buttons for the book list
+        previous_button = tk.Button(button_frame, text="< Prev", command=self.previous_page,
+                                   font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                                   padx=10, pady=6, relief="flat", cursor="hand2")
+        previous_button.pack(side="left", padx=5)
+
+        next_button = tk.Button(button_frame, text="Next >", command=self.next_page,
+                               font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                               padx=10, pady=6, relief="flat", cursor="hand2")
+        next_button.pack(side="left", padx=5)
+
+        # Switch between the order books were added and alphabetical order
+        self.sort_button = tk.Button(button_frame, text="Sort A-Z", command=self.toggle_sorted_view,
+                                    font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                                    padx=10, pady=6, relief="flat", cursor="hand2")
+        self.sort_button.pack(side="left", padx=5)
+
+        # Jump straight to a page number
+        tk.Label(button_frame, text="Page:", font=("Arial", 10), bg=self.bg_color).pack(side="left", padx=(10, 3))
+        self.page_entry = tk.Entry(button_frame, font=("Arial", 10), width=6, relief="solid", borderwidth=1)
+        self.page_entry.pack(side="left")
+        self.page_entry.bind("<Return>", lambda event: self.go_to_page())
+
+        go_button = tk.Button(button_frame, text="Go", command=self.go_to_page,
+                             font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                             padx=8, pady=6, relief="flat", cursor="hand2")
+        go_button.pack(side="left", padx=5)
+
+        # Load books from / save books to a CSV or JSON Lines file
+        # (kept so they can be switched off while an import is running)
+        self.import_button = tk.Button(button_frame, text="Import...", command=self.import_file,
+                                      font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                                      padx=10, pady=6, relief="flat", cursor="hand2")
+        self.import_button.pack(side="left", padx=(15, 5))
+
+        self.export_button = tk.Button(button_frame, text="Export...", command=self.export_file,
+                                      font=("Arial", 10), bg=self.button_bg, fg=self.button_fg,
+                                      padx=10, pady=6, relief="flat", cursor="hand2")
+        self.export_button.pack(side="left", padx=5)
+
+        # Filter bar (author / genre / price) above the book list
+        self.create_filter_frame()
+
         # Text area with frame
         text_frame = tk.Frame(self.root, bg=self.bg_color)
         text_frame.pack(padx=20, pady=(0, 10), fill="both", expand=True)
 
+        scrollbar = tk.Scrollbar(text_frame)
+        scrollbar.pack(side="right", fill="y")
+
         self.text_area = tk.Text(text_frame, height=15, width=80,
                                 font=("Courier New", 9), relief="solid",
-                                borderwidth=1, padx=10, pady=10)
+                                borderwidth=1, padx=10, pady=10,
+                                yscrollcommand=scrollbar.set)
         self.text_area.pack(fill="both", expand=True)
+        scrollbar.config(command=self.text_area.yview)
+
+        # Scrolling past the end of a page moves on to the next page
+        # (<MouseWheel> on Windows/macOS, <Button-4>/<Button-5> on Linux)
+        self.text_area.bind("<MouseWheel>", self._on_scroll)
+        self.text_area.bind("<Button-4>", self._on_scroll)
+        self.text_area.bind("<Button-5>", self._on_scroll)
 
         # Show initial instructions
         self.show_instructions()
@@ -109,66 +238,526 @@ class BookstoreGUI:
             Book(23456, "The Great Gatsby", "F. Scott Fitzgerald", "Historical Fiction", 24.99)
         ]
 
-        # Add each book to all data structures
-        for book in sample_books:
-            # Add to linked list (maintains insertion order)
-            self.inventory.add_book(book)
-
-            # Add to hash table (fast ID lookup)
-            self.quick_lookup.add_book(book)
-
-            # Add to binary tree (alphabetical sorting)
-            self.tree_lookup.add_book(book)
+        # Build all data structures in one go with the bulk loaders
+        # (much faster than adding books one at a time for big catalogues)
+        self.catalogue = Inventory.from_books(sample_books)
 
     def view_books(self):
         """
-        Display all books from the linked list in the text area
+        Display the books from the linked list in the text area, one page at a time
         This is called when the View Books button is clicked
         Now displays book cover images alongside the book details
+        Covers are loaded on worker threads and appear as they finish
+        Only the current page is drawn, so this stays fast with a huge inventory
         """
-        # Clear the text area first
-        self.text_area.delete(1.0, tk.END)
+        self.showing_books = True
+        self.redraw_results = None
+        self.render_page()
+
+    def render_page(self):
+        """
+        Draw the current page of books (starting at page_start_id) into the text area
+        """
+        self._clear_rows()
+
+        self._update_count_label()
 
         # Check if there are any books
-        if self.inventory.size == 0:
+        if self.catalogue.size == 0:
             self.text_area.insert(tk.END, "No books in inventory")
+            self.page_start_id = None
+            self.page_number = 1
+            self.sorted_position = 0
+            return
+
+        if self.sorted_view:
+            self._render_sorted_page()
             return
 
+        # Find the first book on this page (go back to the start if that book was deleted)
+        node = self.catalogue.linked_list.get_node(self.page_start_id) if self.page_start_id is not None else None
+        if node is None:
+            node = self.catalogue.linked_list.head
+            self.page_number = 1
+        self.page_start_id = node.data.id
+
         # Display books from linked list (maintains insertion order)
-        self.text_area.insert(tk.END, "Books in Inventory:\n\n")
+        self.text_area.insert(tk.END, self._page_header(), ("header",))
 
-        current_node = self.inventory.head
-        book_number = 1
+        # Walk forward through the list for one page only
+        while node is not None and len(self.visible_ids) < self.page_size:
+            self._insert_row(tk.END, node.data, len(self.visible_ids) + 1)
+            self.visible_ids.append(node.data.id)
+            node = node.next
 
-        # Store image references so they don't get garbage collected
-        # This is important - tkinter needs to keep the images in memory
-        if not hasattr(self, 'current_images'):
-            self.current_images = []
+        self.text_area.yview_moveto(0)
+
+    def _clear_rows(self):
+        # Clear the text area (and stop loading covers for the old page)
+        self._cancel_pending_covers()
+        self.text_area.delete(1.0, tk.END)
+        for tag in self.text_area.tag_names():
+            if tag.startswith(("row", "num")):
+                self.text_area.tag_delete(tag)
+
+        # Forget the image references for the old page (see current_images in __init__)
         self.current_images.clear()
+        self.row_covers.clear()
+        self.visible_ids = []       # IDs of the books on this page, top to bottom
 
-        while current_node is not None:
-            book = current_node.data
+    def _render_sorted_page(self):
+        # Alphabetical page - the tree finds the book at sorted_position in O(log n),
+        # so any page is as quick to show as the first one
+        last_page_start = (self.catalogue.size - 1) // self.page_size * self.page_size
+        self.sorted_position = max(0, min(self.sorted_position, last_page_start))
+        self.page_number = self.sorted_position // self.page_size + 1
 
-            # Try to load and display the cover image if available
-            if book.image_path:
-                photo = self.load_book_image(book.image_path)
-                if photo:
-                    # Insert the image into the text area
-                    self.text_area.image_create(tk.END, image=photo)
-                    self.current_images.append(photo)  # Keep reference so it displays
-                    self.text_area.insert(tk.END, "  ")  # Add space after image
+        self.text_area.insert(tk.END, self._page_header(), ("header",))
 
-            # Display basic book information next to the image
-            book_info = f"{book_number}. {book}\n"
-            book_info += f"   Genre: {book.genre}, Price: ${book.price}\n\n"
+        for book in self.catalogue.slice(self.sorted_position, self.sorted_position + self.page_size):
+            self._insert_row(tk.END, book, self.sorted_position + len(self.visible_ids) + 1)
+            self.visible_ids.append(book.id)
 
-            self.text_area.insert(tk.END, book_info)
+        self.text_area.yview_moveto(0)
 
-            current_node = current_node.next
-            book_number += 1
+    def _page_header(self):
+        # Heading line at the top of the book list
+        page_count = max(1, -(-self.catalogue.size // self.page_size))     # Round up
+        order = "A-Z" if self.sorted_view else "order added"
+        return (f"Books in Inventory ({order}, page {self.page_number} of {page_count}, "
+                f"{self.page_size} per page):\n\n")
 
+    def _insert_row(self, index, book, book_number):
+        """
+        Insert one book's row at index
+        The row is tagged "row<id>" so it can be replaced or removed later without redrawing the page
+        """
+        row_tag = f"row{book.id}"
+
+        # row_start stays before the row, row_insert moves along as each part is inserted
+        self.text_area.mark_set("row_start", index)
+        self.text_area.mark_gravity("row_start", "left")
+        self.text_area.mark_set("row_insert", index)
+
+        # Show the cover image if available (placeholder first, real cover when loaded)
+        if book.image_path:
+            self.insert_cover(book.image_path, "row_insert", book.id)
+
+        # Display basic book information next to the image
+        # The number has its own tag so it can be changed when a row above is removed
+        self.text_area.insert("row_insert", f"{book_number}.", (f"num{book.id}", row_tag))
+        book_info = f" {book}\n"
+        book_info += f"   Genre: {book.genre}, Price: ${book.price}\n\n"
+        self.text_area.insert("row_insert", book_info, (row_tag,))
+
+        self.text_area.tag_add(row_tag, "row_start", "row_insert")
+
+    def _remove_row(self, book_id):
+        # Delete one book's row (and forget its cover image)
+        row_tag = f"row{book_id}"
+        if self.text_area.tag_ranges(row_tag):
+            self.text_area.delete(f"{row_tag}.first", f"{row_tag}.last")
+        self.text_area.tag_delete(row_tag, f"num{book_id}")
+        self.current_images.pop(self.row_covers.pop(book_id, None), None)
+
+    def _renumber_rows(self, start):
+        # Fix the numbers of the rows from position start onwards
+        for position in range(start, len(self.visible_ids)):
+            num_tag = f"num{self.visible_ids[position]}"
+            if self.text_area.tag_ranges(num_tag):
+                index = self.text_area.index(f"{num_tag}.first")
+                self.text_area.delete(f"{num_tag}.first", f"{num_tag}.last")
+                self.text_area.insert(index, f"{position + 1}.", (num_tag, f"row{self.visible_ids[position]}"))
+
+    def _update_count_label(self):
         # Update book count label
-        self.book_count_label.config(text=f"Books loaded: {self.inventory.size}")
+        self.book_count_label.config(text=f"Books loaded: {self.catalogue.size}")
+
+    def next_page(self):
+        """
+        Show the next page of books
+        """
+        if not self.showing_books or not self.visible_ids:
+            return
+
+        if self.sorted_view:
+            if self.sorted_position + self.page_size < self.catalogue.size:
+                self.sorted_position += self.page_size
+                self.render_page()
+            return
+
+        # The book after the last one on this page starts the next page
+        last_node = self.catalogue.linked_list.get_node(self.visible_ids[-1])
+        if last_node is None or last_node.next is None:
+            return      # Already on the last page
+
+        self.page_start_id = last_node.next.data.id
+        self.page_number += 1
+        self.render_page()
+
+    def previous_page(self):
+        """
+        Show the previous page of books
+        """
+        if not self.showing_books:
+            return
+
+        if self.sorted_view:
+            if self.sorted_position > 0:
+                self.sorted_position -= self.page_size
+                self.render_page()
+            return
+
+        if self.page_start_id is None:
+            return
+
+        # Walk back one page from the first book on this page
+        node = self.catalogue.linked_list.get_node(self.page_start_id)
+        if node is None or node.prev is None:
+            return      # Already on the first page
+
+        for _ in range(self.page_size):
+            if node.prev is None:
+                break
+            node = node.prev
+
+        self.page_start_id = node.data.id
+        self.page_number = max(1, self.page_number - 1)
+        self.render_page()
+
+    def toggle_sorted_view(self):
+        """
+        Switch the book list between the order books were added and alphabetical order
+        """
+        self.sorted_view = not self.sorted_view
+        self.sort_button.config(text="Order Added" if self.sorted_view else "Sort A-Z")
+
+        # Start from the first page of the new order
+        self.sorted_position = 0
+        self.page_start_id = None
+        self.page_number = 1
+        self.view_books()
+
+    def go_to_page(self):
+        """
+        Jump to the page number typed in the Page box
+        """
+        try:
+            page = int(self.page_entry.get())
+        except ValueError:
+            self.show_message("Error", "Page must be a whole number")
+            return
+
+        page_count = max(1, -(-self.catalogue.size // self.page_size))
+        page = max(1, min(page, page_count))
+
+        if self.sorted_view:
+            # Alphabetical order - the tree can go straight to any position
+            self.sorted_position = (page - 1) * self.page_size
+        else:
+            # Order added - walk along the linked list to the first book of that page
+            node = self.catalogue.linked_list.head
+            for _ in range((page - 1) * self.page_size):
+                if node is None or node.next is None:
+                    break
+                node = node.next
+            self.page_start_id = node.data.id if node is not None else None
+            self.page_number = page
+
+        self.view_books()
+
+    def _on_scroll(self, event):
+        """
+        Scrolling past the bottom of a page loads the next page (and past the top the previous one)
+        """
+        scrolling_down = event.num == 5 or event.delta < 0
+        top, bottom = self.text_area.yview()
+
+        if scrolling_down and bottom >= 1.0:
+            self.next_page()
+        elif not scrolling_down and top <= 0.0:
+            self.previous_page()
+
+    def on_book_added(self, book):
+        """
+        Show a newly added book without redrawing the page
+        New books go at the end of the linked list, so they only appear if this is the last page
+        """
+        self._update_count_label()
+        if self.redraw_results is not None:
+            self.redraw_results()      # The new book may or may not match the filter
+            return
+        if not self.showing_books:
+            return
+        if self.sorted_view:
+            self.render_page()          # It goes wherever its title fits - just redraw this page
+            return
+
+        if not self.visible_ids:
+            self.render_page()
+            return
+
+        last_node = self.catalogue.linked_list.get_node(self.visible_ids[-1])
+        if len(self.visible_ids) < self.page_size and last_node is not None and last_node.next is not None \
+                and last_node.next.data is book:
+            self._insert_row(tk.END, book, len(self.visible_ids) + 1)
+            self.visible_ids.append(book.id)
+
+    def on_book_updated(self, book):
+        """
+        Redraw only the row of an edited book (if it is on this page)
+        """
+        if self.redraw_results is not None:
+            self.redraw_results()      # The edit may have changed whether it matches
+            return
+        if self.showing_books and self.sorted_view:
+            self.render_page()          # A new title can move it to another position
+            return
+        if not self.showing_books or book.id not in self.visible_ids:
+            return
+
+        row_tag = f"row{book.id}"
+        index = self.text_area.index(f"{row_tag}.first")
+        self._remove_row(book.id)
+        self._insert_row(index, book, self.visible_ids.index(book.id) + 1)
+
+    def before_book_removed(self, book_id):
+        """
+        Called just before a book is deleted
+        If it starts the current page, the page now starts at the book after it
+        """
+        if self.sorted_view or self.page_start_id != book_id:
+            return
+
+        node = self.catalogue.linked_list.get_node(book_id)
+        if node is not None and node.next is not None:
+            self.page_start_id = node.next.data.id
+
+        # Deleting the only book on the last page - go back to the page before
+        elif node is not None and node.prev is not None:
+            node = node.prev
+            for _ in range(self.page_size - 1):
+                if node.prev is None:
+                    break
+                node = node.prev
+            self.page_start_id = node.data.id
+            self.page_number = max(1, self.page_number - 1)
+
+    def on_book_removed(self, book_id):
+        """
+        Remove a deleted book's row and pull the next book up to keep the page full
+        """
+        self._update_count_label()
+        if self.redraw_results is not None:
+            self.redraw_results()
+            return
+        if self.showing_books and self.sorted_view:
+            self.render_page()          # Books after it all move up one position
+            return
+        if not self.showing_books or book_id not in self.visible_ids:
+            return
+
+        position = self.visible_ids.index(book_id)
+        self._remove_row(book_id)
+        self.visible_ids.pop(position)
+
+        # Page is now empty (deleted the only book on it) - draw whichever page it moved to
+        if not self.visible_ids:
+            self.render_page()
+            return
+
+        self._renumber_rows(position)
+
+        # Bring in the book that follows the page so it stays full
+        last_node = self.catalogue.linked_list.get_node(self.visible_ids[-1])
+        if last_node is not None and last_node.next is not None:
+            next_book = last_node.next.data
+            self._insert_row(tk.END, next_book, len(self.visible_ids) + 1)
+            self.visible_ids.append(next_book.id)
+
+    def create_filter_frame(self):
+        """
+        Create the search/filter bar above the book list
+        Search finds words anywhere in the title/author/genre as you type (word index),
+        the filters find books by author, genre and price (the inventory's secondary indexes)
+        """
+        filter_frame = tk.Frame(self.root, bg=self.bg_color)
+        filter_frame.pack(padx=20, pady=(0, 10))
+
+        tk.Label(filter_frame, text="Search:", font=("Arial", 9), bg=self.bg_color).pack(side="left")
+        self.search_entry = tk.Entry(filter_frame, font=("Arial", 9), width=20, relief="solid", borderwidth=1)
+        self.search_entry.pack(side="left", padx=(3, 15))
+        self.search_entry.bind("<KeyRelease>", self._on_search_typed)
+
+        tk.Label(filter_frame, text="Author:", font=("Arial", 9), bg=self.bg_color).pack(side="left")
+        self.filter_author_entry = tk.Entry(filter_frame, font=("Arial", 9), width=16, relief="solid", borderwidth=1)
+        self.filter_author_entry.pack(side="left", padx=(3, 10))
+
+        tk.Label(filter_frame, text="Genre:", font=("Arial", 9), bg=self.bg_color).pack(side="left")
+        self.filter_genre_entry = tk.Entry(filter_frame, font=("Arial", 9), width=14, relief="solid", borderwidth=1)
+        self.filter_genre_entry.pack(side="left", padx=(3, 10))
+
+        tk.Label(filter_frame, text="Price from $", font=("Arial", 9), bg=self.bg_color).pack(side="left")
+        self.filter_min_entry = tk.Entry(filter_frame, font=("Arial", 9), width=7, relief="solid", borderwidth=1)
+        self.filter_min_entry.pack(side="left", padx=(3, 3))
+
+        tk.Label(filter_frame, text="under $", font=("Arial", 9), bg=self.bg_color).pack(side="left")
+        self.filter_max_entry = tk.Entry(filter_frame, font=("Arial", 9), width=7, relief="solid", borderwidth=1)
+        self.filter_max_entry.pack(side="left", padx=(3, 10))
+
+        filter_button = tk.Button(filter_frame, text="Filter", command=self.filter_books,
+                                 font=("Arial", 9), bg=self.button_bg, fg=self.button_fg,
+                                 padx=12, pady=3, relief="flat", cursor="hand2")
+        filter_button.pack(side="left", padx=3)
+
+        clear_button = tk.Button(filter_frame, text="Clear", command=self.clear_filter,
+                                font=("Arial", 9), bg="#6b6b6b", fg="white",
+                                padx=12, pady=3, relief="flat", cursor="hand2")
+        clear_button.pack(side="left", padx=3)
+
+    def _on_search_typed(self, event):
+        """
+        Called on every key press in the search box
+        The search waits until typing pauses for a moment, so fast typing doesn't redraw on every letter
+        """
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(150, self.search_titles)
+
+    def search_titles(self):
+        """
+        Search for the words typed in the search box
+        """
+        self.search_job = None
+        query = self.search_entry.get().strip()
+
+        if not query:
+            # Search box emptied - go back to the full list (unless something else is showing)
+            if self.redraw_results == self.show_search_results:
+                self.view_books()
+            return
+
+        self.search_query = query
+        self.redraw_results = self.show_search_results
+        self.show_search_results()
+
+    def show_search_results(self):
+        """
+        Draw the best matches for search_query (one page of them)
+        1. Books with ALL the words in their title/author/genre (word index), best first
+           Words joined with "or" (e.g. "gatsby or farm") find books with ANY of them instead
+        2. If none - titles starting with the text (the last word may still be half typed)
+        3. If none - titles that are only a few typos away (fuzzy search)
+        4. If none - books with ANY of the words
+        5. If none - the titles around where it would be alphabetically (nearest match)
+        """
+        query = self.search_query
+        words = query.split()
+        other_words = [word for word in words if word.lower() != "or"]
+        match_all = len(other_words) == len(words) or not other_words
+        if not match_all:
+            query = " ".join(other_words)
+
+        matches = self.catalogue.search(query, match_all=match_all, limit=self.page_size)
+        heading = f"Best matches for '{self.search_query}'"
+
+        if not matches:
+            matches = list(islice(self.catalogue.prefix(query), self.page_size))
+            heading = f"Titles starting with '{query}'"
+
+        if not matches:
+            matches = [book for _, book in self.catalogue.fuzzy_search(query, limit=self.page_size)]
+            heading = f"No exact matches for '{query}' - did you mean"
+
+        if not matches and match_all:
+            matches = self.catalogue.search(query, match_all=False, limit=self.page_size)
+            heading = f"Books with some of the words in '{query}'"
+
+        if not matches:
+            nearest = self.catalogue.nearest(query)
+            heading = f"No matches for '{query}' - nearest titles"
+            if nearest is not None:
+                matches = list(islice(self.catalogue.range(nearest.title), self.page_size))
+
+        if len(matches) == self.page_size:
+            heading += f" (first {self.page_size})"
+        self._show_results(heading, matches, "No books in inventory")
+
+    def filter_books(self):
+        """
+        Read the filter bar and show the matching books
+        Empty boxes are ignored, e.g. just Genre = Fantasy and under $ = 20
+        """
+        author = self.filter_author_entry.get().strip() or None
+        genre = self.filter_genre_entry.get().strip() or None
+
+        try:
+            min_text = self.filter_min_entry.get().strip()
+            max_text = self.filter_max_entry.get().strip()
+            min_price = float(min_text) if min_text else None
+            max_price = float(max_text) if max_text else None
+        except ValueError:
+            self.show_message("Error", "Prices must be numbers")
+            return
+
+        if author is None and genre is None and min_price is None and max_price is None:
+            self.view_books()       # Nothing to filter by - show every book
+            return
+
+        self.current_filter = (author, genre, min_price, max_price)
+        self.redraw_results = self.show_filtered_books
+        self.show_filtered_books()
+
+    def clear_filter(self):
+        """
+        Empty the search/filter bar and go back to the full book list
+        """
+        for entry in (self.search_entry, self.filter_author_entry, self.filter_genre_entry,
+                      self.filter_min_entry, self.filter_max_entry):
+            entry.delete(0, tk.END)
+        self.view_books()
+
+    def show_filtered_books(self):
+        """
+        Draw the books matching current_filter (first page_size of them)
+        """
+        author, genre, min_price, max_price = self.current_filter
+        matches = self.catalogue.find(author=author, genre=genre, min_price=min_price, max_price=max_price)
+
+        # Describe the filter in the heading, e.g. "Genre: Fantasy, under $20.00"
+        parts = []
+        if author is not None:
+            parts.append(f"Author: {author}")
+        if genre is not None:
+            parts.append(f"Genre: {genre}")
+        if min_price is not None:
+            parts.append(f"from ${min_price:.2f}")
+        if max_price is not None:
+            parts.append(f"under ${max_price:.2f}")
+
+        heading = f"Books matching {', '.join(parts)} ({len(matches)} found"
+        if len(matches) > self.page_size:
+            heading += f", showing first {self.page_size}"
+        heading += ")"
+
+        self._show_results(heading, matches[:self.page_size], "No books match this filter")
+
+        print(f"[FILTER] {', '.join(parts)}: {len(matches)} books")
+
+    def _show_results(self, heading, books, empty_message):
+        # Draw a list of search/filter results in place of the normal paged list
+        self.showing_books = False
+        self._clear_rows()
+
+        self.text_area.insert(tk.END, heading + ":\n\n", ("header",))
+        if not books:
+            self.text_area.insert(tk.END, empty_message)
+
+        for book in books:
+            self._insert_row(tk.END, book, len(self.visible_ids) + 1)
+            self.visible_ids.append(book.id)
+
+        self.text_area.yview_moveto(0)
 
     def create_add_book_frame(self):
         """
@@ -301,8 +890,11 @@ class BookstoreGUI:
         Display instructions in the text area
         Can be called at startup or when the user clicks Show Instructions button
         """
-        # Clear the text area first
+        # Clear the text area first (and stop loading covers for the old list)
+        self._cancel_pending_covers()
         self.text_area.delete(1.0, tk.END)
+        self.showing_books = False
+        self.redraw_results = None
 
         instructions = """Welcome to the Bookstore Inventory System
 
@@ -310,6 +902,8 @@ Getting Started:
 
   1. View Books - Click 'View Books' to see all books in inventory
      (includes cover images if you've added them!)
+     Books are shown 50 at a time - use '< Prev' / 'Next >' or keep scrolling
+     Click 'Sort A-Z' to list them alphabetically, or type a page number and click 'Go'
 
   2. Add a New Book - Fill in the book details in the top section
      (fields marked with * are required), then click 'Add Book'
@@ -320,6 +914,14 @@ Getting Started:
   4. Delete a Book - Enter the Book ID in the bottom section and click 'Delete Book'
      (you'll get a confirmation before it's deleted)
 
+  5. Find Books - Start typing in the 'Search' box to see matching books straight away
+     (any words from the title, author or genre, e.g. 'gatsby' or 'orwell farm'),
+     or fill in Author / Genre / Price and click 'Filter' (e.g. Fantasy under $20)
+
+  6. Import / Export - Click 'Import...' to add books from a .csv or .jsonl file
+     (columns: book_id, title, author, genre, price, in_stock, image_path),
+     or 'Export...' to save every book to one
+
 Tips:
   - Use the 'Browse...' button to select a cover image for your book
   - Click 'Clear All Fields' to reset the form
@@ -352,46 +954,52 @@ Tips:
                 self.show_message("Error", "Price cannot be negative")
                 return
 
-            # Validate cover image if provided (using Pillow library)
-            if image_path:
-                is_valid, message = validate_image(image_path)
-                if not is_valid:
-                    self.show_message("Error", f"Image validation failed: {message}")
-                    print(f"[ERROR] Image validation: {message}")
-                    return
-                else:
-                    print(f"[INFO] Image validated: {message}")
-
             # Check if book ID already exists using my hash table
-            if self.quick_lookup.find_book(book_id):
+            if self.catalogue.get(book_id):
                 self.show_message("Error", f"Book with ID {book_id} already exists")
                 return
 
-            # Create new book object with optional image path
-            new_book = Book(book_id, title, author, genre, price, image_path=image_path if image_path else None)
-
-            # Add to all three data structures
-            self.inventory.add_book(new_book)
-            self.quick_lookup.add_book(new_book)
-            self.tree_lookup.add_book(new_book)
-
-            # Update the GUI
-            self.clear_entries()
-            self.view_books()
-
-            # Show success message
-            self.show_message("Success", f"Book '{title}' added successfully!")
+            # Titles must be unique too because the binary tree is sorted by title
+            if self.catalogue.get_by_title(title):
+                self.show_message("Error", f"A book titled '{title}' already exists")
+                return
 
-            # Log for testing/debugging
-            print(f"[ADD] Book added: ID={book_id}, Title='{title}'")
-            if image_path:
-                print(f"[ADD] Cover image: {image_path}")
+            # Validate cover image if provided (in the background), then finish adding the book
+            self.validate_image_then(image_path,
+                                     lambda: self._save_new_book(book_id, title, author, genre, price, image_path))
 
         except ValueError as e:
             # This catches errors when converting to int or float
             self.show_message("Error", "Invalid input. Check ID and Price is a number")
             print(f"[ERROR] Failed to add book: {e}")
 
+    def _save_new_book(self, book_id, title, author, genre, price, image_path):
+        """
+        Second half of add_book - runs once the cover image has been validated
+        """
+        if self._import_busy():
+            return
+
+        # Create new book object with optional image path
+        new_book = Book(book_id, title, author, genre, price, image_path=image_path if image_path else None)
+
+        # Add to all three data structures (the inventory undoes everything if one fails)
+        if not self.catalogue.add(new_book):
+            self.show_message("Error", f"Book '{title}' could not be added")
+            return
+
+        # Update the GUI (only the new row is drawn, not the whole list)
+        self.clear_entries()
+        self.on_book_added(new_book)
+
+        # Show success message
+        self.show_message("Success", f"Book '{title}' added successfully!")
+
+        # Log for testing/debugging
+        print(f"[ADD] Book added: ID={book_id}, Title='{title}'")
+        if image_path:
+            print(f"[ADD] Cover image: {image_path}")
+
     def load_book_for_edit(self):
         """
         Load an existing book's details into the input fields for editing
@@ -402,7 +1010,7 @@ Tips:
             book_id = int(self.select_id_entry.get())
             
             # Use hash table to find the book quickly
-            book = self.quick_lookup.find_book(book_id)
+            book = self.catalogue.get(book_id)
             
             if book is None:
                 # Book not found
@@ -466,139 +1074,182 @@ Tips:
                 self.show_message("Error", "Price cannot be negative")
                 return
 
-            # Validate cover image if provided (using Pillow library)
-            if new_image_path:
-                is_valid, message = validate_image(new_image_path)
-                if not is_valid:
-                    self.show_message("Error", f"Image validation failed: {message}")
-                    print(f"[ERROR] Image validation: {message}")
-                    return
-                else:
-                    print(f"[INFO] Image validated: {message}")
-
-            # Find the existing book in hash table
-            old_book = self.quick_lookup.find_book(book_id)
-
-            if old_book is None:
-                self.show_message("Error", "Book no longer exists in inventory")
-                return
+            # Validate cover image if provided (in the background), then finish editing the book
+            self.validate_image_then(new_image_path,
+                                     lambda: self._save_edited_book(book_id, new_title, new_author,
+                                                                    new_genre, new_price, new_image_path))
 
-            # Store old title for binary tree update (since tree is sorted by title)
-            old_title = old_book.title
-
-            # Update the book object with new values
-            # updating the object updates it everywhere
-            old_book.title = new_title
-            old_book.author = new_author
-            old_book.genre = new_genre
-            old_book.price = new_price
-            old_book.image_path = new_image_path if new_image_path else None
-
-            # Special handling for binary tree if title changed
-            # Tree needs reorganising if the sort key (title) changed
-            if old_title != new_title:
-                # Remove old entry and add with new title
-                # maintains proper alphabetical ordering
-                self.tree_lookup.root = self._remove_from_tree(self.tree_lookup.root, old_title)
-                self.tree_lookup.add_book(old_book)
-                print(f"[EDIT] Book title changed, reorganized in binary tree")
-
-            # Clear the selection and input fields
-            self.clear_entries()
-            self.select_id_entry.delete(0, tk.END)
+        except ValueError as e:
+            self.show_message("Error", "Invalid input. Please check ID and Price are numbers")
+            print(f"[ERROR] Failed to edit book: {e}")
 
-            # Re-enable the ID field for next operation
-            self.id_entry.config(state='normal')
+    def _save_edited_book(self, book_id, new_title, new_author, new_genre, new_price, new_image_path):
+        """
+        Second half of edit_book - runs once the cover image has been validated
+        """
+        if self._import_busy():
+            return
 
-            # Refresh the display
-            self.view_books()
+        # Find the existing book in hash table
+        old_book = self.catalogue.get(book_id)
 
-            # Show success message
-            self.show_message("Success", f"Book '{new_title}' updated successfully!")
+        if old_book is None:
+            self.show_message("Error", "Book no longer exists in inventory")
+            return
 
-            # Log for testing
-            print(f"[EDIT] Book updated: ID={book_id}, New Title='{new_title}'")
-            if new_image_path:
-                print(f"[EDIT] Cover image: {new_image_path}")
+        # Update the book with new values
+        # The inventory also moves it in the binary tree if the title (sort key) changed
+        updated = self.catalogue.update(book_id,
+                                        title=new_title,
+                                        author=new_author,
+                                        genre=new_genre,
+                                        price=new_price,
+                                        image_path=new_image_path if new_image_path else None)
+
+        if not updated:
+            self.show_message("Error", f"A book titled '{new_title}' already exists")
+            return
 
-        except ValueError as e:
-            self.show_message("Error", "Invalid input. Please check ID and Price are numbers")
-            print(f"[ERROR] Failed to edit book: {e}")
+        # Clear the selection and input fields
+        self.clear_entries()
+        self.select_id_entry.delete(0, tk.END)
+
+        # Re-enable the ID field for next operation
+        self.id_entry.config(state='normal')
+
+        # Redraw just this book's row
+        self.on_book_updated(old_book)
+
+        # Show success message
+        self.show_message("Success", f"Book '{new_title}' updated successfully!")
 
-    def _remove_from_tree(self, node, title):
+        # Log for testing
+        print(f"[EDIT] Book updated: ID={book_id}, New Title='{new_title}'")
+        if new_image_path:
+            print(f"[EDIT] Cover image: {new_image_path}")
+
+    def validate_image_then(self, image_path, on_valid):
         """
-        remove a node from binary tree by title
+        Validate a cover image on a worker thread, then call on_valid() back on the main thread
+        If there is no image on_valid() runs straight away
         """
-        if node is None:
-            return node
-        
-        # Navigate to find the node to remove
-        if title < node.data.title:
-            node.left = self._remove_from_tree(node.left, title)
-        elif title > node.data.title:
-            node.right = self._remove_from_tree(node.right, title)
-        else:
-            # Found the node to remove
-            # Case 1: No children (leaf node)
-            if node.left is None and node.right is None:
-                return None
-            
-            # Case 2: One child
-            if node.left is None:
-                return node.right
-            if node.right is None:
-                return node.left
-            
-            # Case 3: Two children
-            # Find the minimum node in right subtree
-            min_node = self._find_min(node.right)
-            node.data = min_node.data
-            node.right = self._remove_from_tree(node.right, min_node.data.title)
-        
-        return node
+        if not image_path:
+            on_valid()
+            return
+
+        def finished(future):
+            try:
+                is_valid, message = future.result()
+            except Exception as e:
+                is_valid, message = False, str(e)
+
+            if not is_valid:
+                self.show_message("Error", f"Image validation failed: {message}")
+                print(f"[ERROR] Image validation: {message}")
+                return
+
+            print(f"[INFO] Image validated: {message}")
+            on_valid()
+
+        self.run_in_background(validate_image, finished, image_path)
 
-    def _find_min(self, node):
+    def run_in_background(self, work, on_done, *args):
         """
-        Find the leftmost (minimum) node in a tree
-        Used by the remove function
+        Run work(*args) on the worker thread pool
+        When it finishes, on_done(future) is called on the Tk main thread (see _poll_background_jobs)
         """
-        current = node
-        while current.left is not None:
-            current = current.left
-        return current
+        future = self.worker_pool.submit(work, *args)
 
-    def load_book_image(self, image_path):
+        # This callback runs on the worker thread, so it only puts the job on the queue
+        # (tkinter must only be used from the main thread)
+        future.add_done_callback(lambda finished: self.finished_jobs.put((on_done, finished)))
+        return future
+
+    def _poll_background_jobs(self):
         """
-        Load a book cover image and resize it for display in the text area
-        Returns a PhotoImage object that tkinter can display
-        Uses Pillow to resize, then converts to PhotoImage
+        Hand finished background jobs back to the main thread
+        Runs every 50ms using root.after
         """
         try:
-            # Import PIL for image resizing
-            from PIL import Image, ImageTk
-
-            # Open the image using Pillow
-            img = Image.open(image_path)
-
-            # Resize to thumbnail size (80 pixels tall, width proportional)
-            # This keeps images small and consistent in the display
-            thumbnail_height = 80
-            aspect_ratio = img.width / img.height
-            thumbnail_width = int(thumbnail_height * aspect_ratio)
+            while True:
+                try:
+                    on_done, future = self.finished_jobs.get_nowait()
+                except queue.Empty:
+                    break
+
+                # Skip jobs that were cancelled (e.g. covers for a list that has been redrawn)
+                if future.cancelled():
+                    continue
+
+                # One broken callback must not stop the jobs after it (or the polling) from running
+                try:
+                    on_done(future)
+                except Exception as e:
+                    print(f"[ERROR] Background job callback failed: {type(e).__name__}: {e}")
+        finally:
+            self.root.after(50, self._poll_background_jobs)
+
+    def insert_cover(self, image_path, index, book_id):
+        """
+        Insert a book cover into the text area at index
+        A grey placeholder is shown straight away while a worker thread loads the real thumbnail
+        """
+        # Give every cover in the text area its own name so it can be swapped later
+        self.cover_counter += 1
+        name = f"cover{self.cover_counter}"
+        self.row_covers[book_id] = name
+
+        self.text_area.image_create(index, image=self.placeholder_image, name=name)
+        self.text_area.insert(index, "  ", (f"row{book_id}",))  # Add space after image
+
+        # Load the thumbnail in the background (the cache only resizes each cover once)
+        generation = self.view_generation
+        future = self.run_in_background(self.thumbnail_cache.get,
+                                        lambda finished: self._show_cover(finished, name, generation, image_path),
+                                        image_path)
+        self.pending_covers.append(future)
+
+    def _show_cover(self, future, name, generation, image_path):
+        """
+        Swap a placeholder for the finished thumbnail (runs on the main thread)
+        """
+        # The list was redrawn since this cover was requested - its placeholder is gone
+        if generation != self.view_generation:
+            return
 
-            # Resize the image using LANCZOS for good quality
-            img_resized = img.resize((thumbnail_width, thumbnail_height), Image.Resampling.LANCZOS)
+        try:
+            # Import PIL for converting to a tkinter image
+            from PIL import ImageTk
 
             # Convert to PhotoImage so tkinter can use it
-            photo = ImageTk.PhotoImage(img_resized)
-
-            return photo
+            # (this part has to happen on the main thread)
+            photo = ImageTk.PhotoImage(future.result())
 
         except Exception as e:
-            # If image can't be loaded, just skip it
+            # If image can't be loaded, just remove the placeholder
             # This could happen if file was moved or deleted
             print(f"[WARNING] Could not load image {image_path}: {e}")
-            return None
+            try:
+                self.text_area.delete(name)
+            except tk.TclError:
+                pass    # The row was edited or deleted while the cover was loading
+            return
+
+        try:
+            self.text_area.image_configure(name, image=photo)
+        except tk.TclError:
+            return      # The row was edited or deleted while the cover was loading
+
+        self.current_images[name] = photo  # Keep reference so it displays
+
+    def _cancel_pending_covers(self):
+        """
+        Stop loading covers for the list that is about to be cleared
+        """
+        for future in self.pending_covers:
+            future.cancel()
+        self.pending_covers.clear()
+        self.view_generation += 1
 
     def browse_image(self):
         """
@@ -623,6 +1274,130 @@ Tips:
             self.image_entry.insert(0, file_path)
             print(f"[BROWSE] Image selected: {file_path}")
 
+    def import_file(self):
+        """
+        Add the books from a CSV or JSON Lines file to the catalogue
+        Rows with missing or bad values are skipped and counted
+        The import runs in the background so the window keeps working (see _import_read)
+        The books are built into a separate inventory first, then moved into the catalogue
+        """
+        if self.import_running:
+            return
+
+        file_path = filedialog.askopenfilename(
+            title="Import Books",
+            filetypes=[("Book files", "*.csv *.jsonl"), ("CSV files", "*.csv"),
+                       ("JSON Lines files", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+
+        self._set_import_running(True)
+        print(f"[IMPORT] Reading {file_path}...")
+
+        # Step 1 (worker thread): read the file and bulk build a separate inventory from it
+        # It doesn't touch self.catalogue, so the window can keep showing and searching books meanwhile
+        self.run_in_background(import_books, lambda finished: self._import_read(finished, file_path), file_path)
+
+    def _set_import_running(self, running):
+        self.import_running = running
+        state = "disabled" if running else "normal"
+        self.import_button.config(state=state)
+        self.export_button.config(state=state)
+
+    def _import_busy(self):
+        # True (and tells the user) if books can't be changed right now because an import is running
+        if self.import_running:
+            self.show_message("Please Wait", "An import is still running - try again when it has finished")
+            return True
+        return False
+
+    def _import_read(self, future, file_path):
+        """
+        Step 2 (main thread): put the imported books into the catalogue
+        """
+        try:
+            imported, report = future.result()
+        except Exception as e:
+            self._set_import_running(False)
+            self.show_message("Import Failed", f"Could not import {os.path.basename(file_path)}: {e}")
+            return
+
+        # An empty catalogue just takes over the bulk built structures (instant)
+        if self.catalogue.replace_structures(imported):
+            self._import_save(report, file_path)
+            return
+
+        # Otherwise the books are added a chunk at a time between window events, so the window never freezes
+        # The change log is switched off meanwhile - a snapshot is saved at the end instead of a line per book
+        self.store.detach()
+        self._import_merge(iter(imported), report, file_path)
+
+    def _import_merge(self, books, report, file_path):
+        added = 0
+        for book in islice(books, IMPORT_CHUNK_SIZE):
+            if not self.catalogue.add(book):
+                report.duplicates += 1      # ID or title already in the catalogue
+            added += 1
+
+        if added == IMPORT_CHUNK_SIZE:
+            self.root.after(1, self._import_merge, books, report, file_path)
+        else:
+            self._import_save(report, file_path)
+
+    def _import_save(self, report, file_path):
+        """
+        Step 3 (worker thread): save a snapshot straight away instead of leaving every imported book
+        in the change log. Saving only reads the catalogue, and no books can be changed until it finishes
+        """
+        self.import_save_job = self.run_in_background(
+            self.store.save, lambda finished: self._import_finished(finished, report, file_path), self.catalogue)
+
+    def _import_finished(self, future, report, file_path):
+        self.import_save_job = None
+        self.store.attach(self.catalogue)   # Back to writing every change to the log
+        self._set_import_running(False)
+
+        print(f"[IMPORT] {file_path}: {report.summary()}")
+        for row_number, message in report.errors:
+            print(f"[IMPORT] Row {row_number}: {message}")
+
+        self.page_start_id = None
+        self.page_number = 1
+        self.view_books()
+
+        message = (f"Imported {report.rows - report.rejected - report.duplicates:,} books "
+                   f"({report.rejected:,} bad rows, {report.duplicates:,} duplicates), "
+                   f"file read in {report.elapsed:.1f} s")
+        try:
+            future.result()
+        except OSError as e:
+            # The books are imported - they are saved again when the window is closed
+            self.show_message("Import Finished", f"{message}, but the catalogue could not be saved: {e}")
+            return
+        self.show_message("Import Finished", message)
+
+    def export_file(self):
+        """
+        Save every book to a CSV or JSON Lines file (chosen by the file extension)
+        """
+        file_path = filedialog.asksaveasfilename(
+            title="Export Books",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl")]
+        )
+        if not file_path:
+            return
+
+        try:
+            report = export_books(self.catalogue, file_path)
+        except (OSError, ValueError) as e:
+            self.show_message("Export Failed", f"Could not export to {os.path.basename(file_path)}: {e}")
+            return
+
+        print(f"[EXPORT] {file_path}: {report.summary()}")
+        self.show_message("Export Finished", f"Exported {report.rows:,} books in {report.elapsed:.1f} s")
+
     def clear_entries(self):
         """
         Clear all entry fields and reset ID field state
@@ -662,6 +1437,28 @@ Tips:
         popup.transient(self.root)
         popup.grab_set()
 
+    def on_close(self):
+        """
+        Save the catalogue and close the window
+        Every edit is already in the change log, so this just compacts it into the snapshot
+        """
+        # Don't write the snapshot while an import is still writing it
+        if self.import_save_job is not None:
+            try:
+                self.import_save_job.result()
+            except OSError:
+                pass
+
+        try:
+            self.store.save(self.catalogue)
+            print(f"[SAVE] Catalogue saved: {self.catalogue.size} books")
+        except OSError as e:
+            print(f"[ERROR] Could not save catalogue: {e}")
+        finally:
+            self.store.close()
+            self.worker_pool.shutdown(wait=False, cancel_futures=True)
+            self.root.destroy()
+
     def run(self):
         """
         Start the GUI application
@@ -681,7 +1478,7 @@ Tips:
             book_id = int(self.delete_id_entry.get())
 
             # check if the book exists using hash table
-            book = self.quick_lookup.find_book(book_id)
+            book = self.catalogue.get(book_id)
 
             if book is None:
                 self.show_message("Error", f"No book found with ID {book_id}")
@@ -735,9 +1532,13 @@ Tips:
         """
         Actually delete the book from all data structures after confirmation
         """
+        if self._import_busy():
+            popup_window.destroy()
+            return
+
         try:
             # Get book details before deletion for logging
-            book = self.quick_lookup.find_book(book_id)
+            book = self.catalogue.get(book_id)
             
             if book is None:
                 self.show_message("Error", "Book no longer exists")
@@ -747,19 +1548,16 @@ Tips:
             # Store book details for success message
             book_title = book.title
             
-            # Remove from hash table
-            delete_success = self.quick_lookup.remove_book(book_id)
+            # Move the page start off this book while it is still in the list
+            self.before_book_removed(book_id)
+
+            # Remove from hash table, linked list and binary tree in one step
+            delete_success = self.catalogue.remove(book_id)
             
             if not delete_success:
-                self.show_message("Error", "Failed to delete from hash table")
+                self.show_message("Error", "Failed to delete book from inventory")
                 popup_window.destroy()
                 return
-        
-            # Remove from linked list
-            self.delete_from_linked_list(book_id)
-            
-            # Remove from binary tree (by title)
-            self.tree_lookup.root = self._remove_from_tree(self.tree_lookup.root, book_title)
             
             # Close confirmation popup
             popup_window.destroy()
@@ -767,15 +1565,15 @@ Tips:
             # Clear the delete ID field
             self.delete_id_entry.delete(0, tk.END)
             
-            # Refresh the display
-            self.view_books()
+            # Remove just this book's row from the display
+            self.on_book_removed(book_id)
             
             # Show success message
             self.show_message("Success", f"Book '{book_title}' has been deleted from inventory")
             
             # Log for testing
             print(f"[DELETE] Book deleted: ID={book_id}, Title='{book_title}'")
-            print(f"[DELETE] Remaining books in inventory: {self.inventory.size}")
+            print(f"[DELETE] Remaining books in inventory: {self.catalogue.size}")
             
         except Exception as e:
             self.show_message("Error", f"Failed to delete book: {str(e)}")
@@ -783,49 +1581,6 @@ Tips:
             print(f"[ERROR] Exception during deletion: {e}")
 
 
-    def delete_from_linked_list(self, book_id):
-        """
-        Remove a book from the double linked list by ID
-        Handles all the pointer adjustments for double linking
-        """
-        current = self.inventory.head
-        
-        while current is not None:
-            if current.data.book_id == book_id:
-                # Found the node to delete
-                
-                # If deleting the head node
-                if current == self.inventory.head:
-                    self.inventory.head = current.next
-                    if self.inventory.head:
-                        self.inventory.head.prev = None
-                    else:
-                        # List is now empty
-                        self.inventory.tail = None
-                
-                # If deleting the tail node
-                elif current == self.inventory.tail:
-                    self.inventory.tail = current.prev
-                    if self.inventory.tail:
-                        self.inventory.tail.next = None
-                
-                # If deleting a middle node
-                else:
-                    current.prev.next = current.next
-                    current.next.prev = current.prev
-                
-                # Decrease the size
-                self.inventory.size -= 1
-                
-                print(f"[DELETE] Book removed from linked list. New size: {self.inventory.size}")
-                return True
-            
-            current = current.next
-        
-        print(f"[WARNING] Book ID {book_id} not found in linked list")
-        return False
-
-  
     def clear_all_fields(self):
         """
         Clear all input fields including the delete and select fields
@@ -0,0 +1,3 @@
+# Data structures package
+# set_verbose(True) turns on the debug messages from add_book/remove_book
+from data_structures.debug_log import set_verbose
@@ -1,102 +1,492 @@
+from data_structures.debug_log import log_event
+
+
 class TreeNode:
+    # __slots__ saves memory and makes nodes faster to create (there is one node per book)
+    __slots__ = ("book", "key", "left", "right", "height", "count")
+
     def __init__(self, book):
         self.book = book        # The book stored in this node
+        self.key = book.title.lower()   # Lower case title, worked out once instead of on every comparison
         self.left = None        # Left child (books that come "before" this one)
         self.right = None       # Right child (books that come "after" this one)
+        self.height = 1         # Height of this node's subtree (used by the balanced tree)
+        self.count = 1          # Number of books in this node's subtree (used to find the k-th book)
 
 class BinaryTree:
-    def __init__(self):
+    def __init__(self, balanced=False):
         self.root = None        # Points to the top node of the tree
         self.size = 0           # Track how many books are in the tree
+
+        # balanced=True turns this into an AVL tree
+        # After every insert/delete the tree rotates nodes so it never becomes lopsided,
+        # which keeps searches fast even if books are added in alphabetical order
+        self.balanced = balanced
+
+
+
+    @classmethod
+    def from_books(cls, books, balanced=False):
+        # Build a tree from many books in one go (e.g. loading the whole catalogue at startup)
+        # Books are sorted by title once, then the middle book of each run becomes the parent,
+        # so the tree comes out perfectly balanced without comparing titles on every insert
+
+        # Python's sort is very fast on data that is already sorted (like our nightly import)
+        sorted_books = sorted(books, key=lambda book: book.title.lower())
+
+        # Remove duplicate titles (first one wins, same as add_book)
+        unique_books = []
+        last_title = None
+        for book in sorted_books:
+            title = book.title.lower()
+            if title != last_title:
+                unique_books.append(book)
+                last_title = title
+
+        return cls.from_sorted_books(unique_books, balanced=balanced)
+
+
+
+    @classmethod
+    def from_sorted_books(cls, books, balanced=False):
+        # Same as from_books, but the books must already be in title order with no duplicate titles
+        # (e.g. read back from a saved catalogue), so no sorting is needed at all - O(n)
+        books = books if isinstance(books, list) else list(books)
+        tree = cls(balanced=balanced)
+        tree.root = tree._build_from_sorted(books, 0, len(books))
+        tree.size = len(books)
+        log_event("tree_bulk_load", "Bulk loaded {count} books into tree", count=tree.size)
+        return tree
+
+
+
+    def _build_from_sorted(self, books, start, end):
+        # Build a balanced subtree from books[start:end] and return its top node
+        # This only recurses about log2(n) levels deep (20 levels for 1M books), so it is safe
+        if start >= end:
+            return None
+
+        middle = (start + end) // 2
+        node = TreeNode(books[middle])
+        node.left = self._build_from_sorted(books, start, middle)
+        node.right = self._build_from_sorted(books, middle + 1, end)
+
+        # Left side is always the same height as the right side or one taller
+        if node.left is not None:
+            node.height = node.left.height + 1
+        node.count = end - start
+        return node
     
     def add_book(self, book):
         # If tree is empty, make this book the root
         if self.root is None:
             self.root = TreeNode(book)
             self.size += 1
-            print(f"Added '{book.title}' as root of tree")
-        else:
-            # Tree has books - find the right place to insert
-            self._insert_recursive(self.root, book)
-    
-    def _insert_recursive(self, current_node, book):
+            log_event("tree_add", "Added '{title}' as root of tree", title=book.title)
+            return True
 
-        # Compare book titles alphabetically
-        if book.title.lower() < current_node.book.title.lower():
+        # Tree has books - walk down from the root to find the right place to insert
+        # A loop is used instead of recursion so very tall trees can't hit Python's recursion limit
+        # path remembers every node we passed so the balanced tree can fix them on the way back up
+        title = book.title.lower()
+        current_node = self.root
+        path = []
 
-            # New book comes before current book - go left
-            if current_node.left is None:
+        while True:
+            path.append(current_node)
+
+            # Compare book titles alphabetically
+            if title < current_node.key:
+
+                # New book comes before current book - go left
+                if current_node.left is None:
+
+                    # Found empty spot on the left
+                    current_node.left = TreeNode(book)
+                    log_event("tree_add", "Added '{title}' to left of '{parent}'",
+                              title=book.title, parent=current_node.book.title)
+                    break
 
-                # Found empty spot on the left
-                current_node.left = TreeNode(book)
-                self.size += 1
-                print(f"Added '{book.title}' to left of '{current_node.book.title}'")
-            else:
                 # Keep searching left
-                self._insert_recursive(current_node.left, book)
-        
-        elif book.title.lower() > current_node.book.title.lower():
+                current_node = current_node.left
 
-            # New book comes after current book - go right
-            if current_node.right is None:
+            elif title > current_node.key:
+
+                # New book comes after current book - go right
+                if current_node.right is None:
+
+                    # Found empty spot on the right
+                    current_node.right = TreeNode(book)
+                    log_event("tree_add", "Added '{title}' to right of '{parent}'",
+                              title=book.title, parent=current_node.book.title)
+                    break
 
-                # Found empty spot on the right
-                current_node.right = TreeNode(book)
-                self.size += 1
-                print(f"Added '{book.title}' to right of '{current_node.book.title}'")
-            else:
                 # Keep searching right
-                self._insert_recursive(current_node.right, book)
+                current_node = current_node.right
+
+            else:
+                # Book titles are the same - don't add duplicates
+                log_event("tree_duplicate", "Book '{title}' already exists in tree", title=book.title)
+                return False
+
+        # Every node we passed now has one more book below it
+        for node in path:
+            node.count += 1
+
+        self.size += 1
+        self._fix_path(path)
+        return True
+
+
+
+    def remove_book(self, title):
+        # Remove a book by title (case-insensitive, same as search_by_title)
+        # Returns True if a book was removed
+        search_title = title.lower()
+        current_node = self.root
+        path = []
+
+        # Navigate to find the node to remove
+        while current_node is not None:
+            node_title = current_node.key
+            if search_title == node_title:
+                break
+            path.append(current_node)
+            if search_title < node_title:
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+
+        if current_node is None:
+            log_event("tree_not_found", "Book '{title}' not found in tree", title=title)
+            return False
+
+        parent = path[-1] if path else None
+
+        # Case 1 and 2: No children or one child - replace node with its child
+        if current_node.left is None or current_node.right is None:
+            child = current_node.left if current_node.left is not None else current_node.right
+            self._replace_child(parent, current_node, child)
+
+        # Case 3: Two children
+        # Move the smallest book from the right subtree up into this node, then unlink that smallest node
         else:
-            # Book titles are the same - don't add duplicates
-            print(f"Book '{book.title}' already exists in tree")
-    
+            path.append(current_node)
+            min_parent = current_node
+            min_node = current_node.right
+            while min_node.left is not None:
+                path.append(min_node)
+                min_parent = min_node
+                min_node = min_node.left
+
+            current_node.book = min_node.book
+            current_node.key = min_node.key
+            self._replace_child(min_parent, min_node, min_node.right)
+
+        # Every node above the one that was unlinked now has one less book below it
+        for node in path:
+            node.count -= 1
+
+        self.size -= 1
+        self._fix_path(path)
+        log_event("tree_remove", "Removed '{title}' from tree", title=title)
+        return True
+
+
+
+    def _replace_child(self, parent, old_child, new_child):
+        # Point whatever linked to old_child (its parent, or the root) at new_child instead
+        if parent is None:
+            self.root = new_child
+        elif parent.left is old_child:
+            parent.left = new_child
+        else:
+            parent.right = new_child
+
+
+
+    def _fix_path(self, path):
+        # After an insert or delete, walk back up the nodes we passed (bottom to top)
+        # For the balanced tree this updates heights and rotates any lopsided nodes
+        if not self.balanced:
+            return
+
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            new_top = self._rebalance(node)
+
+            # A rotation gives this subtree a new top node - link it to the parent
+            if new_top is not node:
+                self._replace_child(path[i - 1] if i > 0 else None, node, new_top)
+
+
+
+    def _height(self, node):
+        # Empty subtrees have height 0
+        return node.height if node is not None else 0
+
+
+
+    def _update_height(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.count = 1 + self._count(node.left) + self._count(node.right)
+
+
+
+    def _count(self, node):
+        # Empty subtrees have no books
+        return node.count if node is not None else 0
+
+
+
+    def _rotate_left(self, node):
+        #     node              right
+        #        \              /
+        #       right   ->   node
+        #       /               \
+        #   middle             middle
+        right = node.right
+        node.right = right.left
+        right.left = node
+        self._update_height(node)
+        self._update_height(right)
+        return right
+
+
+
+    def _rotate_right(self, node):
+        #       node          left
+        #       /                \
+        #    left       ->       node
+        #       \                /
+        #      middle        middle
+        left = node.left
+        node.left = left.right
+        left.right = node
+        self._update_height(node)
+        self._update_height(left)
+        return left
+
+
+
+    def _rebalance(self, node):
+        # Update the height, then rotate if one side is more than 1 level taller than the other
+        self._update_height(node)
+        balance = self._height(node.left) - self._height(node.right)
+
+        # Left side too tall
+        if balance > 1:
+            # Left-right case: rotate the left child first
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+
+        # Right side too tall
+        if balance < -1:
+            # Right-left case: rotate the right child first
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+
+        return node
+
 
 
     def search_by_title(self, title):
-        # Start searching from the root
-        return self._search_recursive(self.root, title)
-    
+        # Start searching from the root and follow left/right links until found
+        search_title = title.lower()
+        current_node = self.root
 
+        while current_node is not None:
+            node_title = current_node.key
 
-    def _search_recursive(self, current_node, title):
-        # Base case: reached end of tree or found empty spot
-        if current_node is None:
+            # Compare titles
+            if search_title == node_title:
+                # Found the book!
+                return current_node.book
+            elif search_title < node_title:
+                # Search left side
+                current_node = current_node.left
+            else:
+                # Search right side
+                current_node = current_node.right
+
+        # Reached end of tree - book not found
+        return None
+
+
+
+    def iter_sorted(self):
+        # Generator that yields books one at a time in alphabetical order
+        # Nothing is copied into a list, so this can stream a huge catalogue (e.g. to an export file)
+        # In-order: left -> current -> right, using our own stack instead of recursion
+        stack = []
+        current_node = self.root
+
+        while stack or current_node is not None:
+            # First, go as far left as possible (earlier alphabetically)
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left
+
+            # Then, give back the current book
+            current_node = stack.pop()
+            yield current_node.book
+
+            # Finally, move on to the books on the right (later alphabetically)
+            current_node = current_node.right
+
+
+
+    def _nodes_from(self, start):
+        # Generator of nodes in alphabetical order, starting at the first key >= start (None = from the beginning)
+        # Only the nodes on the way down to start are visited before the first one comes out,
+        # so asking for the first few books is quick even in a huge tree
+
+        # Walk down to start, remembering every node that is >= start
+        # (those are the ones still to give back, smallest on top of the stack)
+        stack = []
+        current_node = self.root
+        while current_node is not None:
+            if start is None or current_node.key >= start:
+                stack.append(current_node)
+                current_node = current_node.left
+            else:
+                current_node = current_node.right      # Everything on the left is too early
+
+        return self._walk(stack)
+
+
+
+    def _walk(self, stack):
+        # Carry on an in-order walk from a stack of nodes still to visit (smallest on top)
+        while stack:
+            current_node = stack.pop()
+            yield current_node
+
+            # Next come the nodes on the right, starting with the leftmost one
+            current_node = current_node.right
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left
+
+
+
+    def range(self, start_title=None, end_title=None):
+        # Generator of books with start_title <= title < end_title in alphabetical order (case-insensitive)
+        # Leave either end as None to have no limit on that side
+        # (don't add or remove books while looping over it)
+        start = start_title.lower() if start_title is not None else None
+        end = end_title.lower() if end_title is not None else None
+
+        for node in self._nodes_from(start):
+            if end is not None and node.key >= end:
+                return
+            yield node.book
+
+
+
+    def prefix(self, prefix):
+        # Generator of books whose title starts with prefix, in alphabetical order (case-insensitive)
+        search_prefix = prefix.lower()
+        for node in self._nodes_from(search_prefix):
+            if not node.key.startswith(search_prefix):
+                return
+            yield node.book
+
+
+
+    def nearest(self, title):
+        # The book whose title comes first at or after title (alphabetically),
+        # or the last book if title is after every book - None if the tree is empty
+        # Handy for jumping to "where this title would be" when there is no exact match
+        search_title = title.lower()
+        current_node = self.root
+        after = None    # Smallest node >= title seen so far
+        before = None   # Largest node < title seen so far
+
+        while current_node is not None:
+            if current_node.key >= search_title:
+                after = current_node
+                current_node = current_node.left
+            else:
+                before = current_node
+                current_node = current_node.right
+
+        node = after if after is not None else before
+        return node.book if node is not None else None
+
+
+
+    def select(self, position):
+        # The book at a position in alphabetical order (0 = first), or None if there isn't one
+        # Uses the book counts in each node to skip whole subtrees - O(log n) for the balanced tree
+        if position < 0 or position >= self.size:
             return None
-        
 
-    
-        # Compare titles
-        if title.lower() == current_node.book.title.lower():
-            # Found the book!
-            return current_node.book
-        elif title.lower() < current_node.book.title.lower():
-            # Search left side
-            return self._search_recursive(current_node.left, title)
-        else:
-            # Search right side
-            return self._search_recursive(current_node.right, title)
-    
+        current_node = self.root
+        while current_node is not None:
+            left_count = self._count(current_node.left)
+            if position < left_count:
+                current_node = current_node.left
+            elif position == left_count:
+                return current_node.book
+            else:
+                position -= left_count + 1      # Skip the left subtree and this node
+                current_node = current_node.right
+        return None
+
+
+
+    def rank(self, title):
+        # Number of books whose title comes before title alphabetically (case-insensitive)
+        # For a title in the tree this is its position, so select(rank(title)) gives the book back
+        search_title = title.lower()
+        position = 0
+        current_node = self.root
+
+        while current_node is not None:
+            if search_title <= current_node.key:
+                current_node = current_node.left
+            else:
+                # This node and its whole left subtree come before the title
+                position += self._count(current_node.left) + 1
+                current_node = current_node.right
+        return position
+
+
+
+    def slice(self, start, stop=None):
+        # Generator of the books at positions start to stop - 1 in alphabetical order
+        # e.g. slice(40000, 40050) - finds position 40000 in O(log n), then walks forward
+        stop = self.size if stop is None else min(stop, self.size)
+        if start < 0 or start >= stop:
+            return
+
+        # Walk down to position start, remembering the nodes at or after it (like _nodes_from)
+        stack = []
+        current_node = self.root
+        position = start
+        while current_node is not None:
+            left_count = self._count(current_node.left)
+            if position <= left_count:
+                stack.append(current_node)
+                if position == left_count:
+                    break
+                current_node = current_node.left
+            else:
+                position -= left_count + 1
+                current_node = current_node.right
+
+        for node, _ in zip(self._walk(stack), range(stop - start)):
+            yield node.book
+
 
 
     def display_all_sorted(self):
         # Display books in alphabetical order
         print(f"Books in alphabetical order ({self.size} total):")
         print("-" * 50)
-        self._inorder_traversal(self.root)
+        for book in self.iter_sorted():
+            print(f"  {book}")
         print("-" * 50)
-    
-
-
-    def _inorder_traversal(self, current_node):
-        # In-order: left -> current -> right (gives alphabetical order)
-        if current_node is not None:
-
-            # First, visit all books on the left (earlier alphabetically)
-            self._inorder_traversal(current_node.left)
-
-            # Then, print the current book
-            print(f"  {current_node.book}")
-            
-            # Finally, visit all books on the right (later alphabetically)
-            self._inorder_traversal(current_node.right)
\ No newline at end of file
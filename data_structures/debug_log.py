@@ -0,0 +1,44 @@
+# Logging switch for the data structures package
+# add_book/remove_book used to print() every time, which made bulk loads very slow
+# Now they send a debug "event" here instead, which does nothing unless logging is turned on
+
+import logging
+import sys
+
+# One logger shared by the whole package
+logger = logging.getLogger("data_structures")
+logger.addHandler(logging.NullHandler())    # Stay silent unless the app sets up logging
+logger.setLevel(logging.WARNING)            # Debug events are off by default
+
+# Handler added by set_verbose() (kept so it can be removed again)
+_console_handler = None
+
+
+def set_verbose(enabled=True):
+    """
+    Turn the debug messages on or off
+    When on, every event is printed to the console like the old print() calls
+    """
+    global _console_handler
+
+    if enabled:
+        logger.setLevel(logging.DEBUG)
+        if _console_handler is None:
+            _console_handler = logging.StreamHandler(sys.stdout)
+            _console_handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(_console_handler)
+    else:
+        logger.setLevel(logging.WARNING)
+        if _console_handler is not None:
+            logger.removeHandler(_console_handler)
+            _console_handler = None
+
+
+def log_event(event, message, **fields):
+    """
+    Record a debug event, e.g. log_event("hash_add", "Added book ID {book_id}", book_id=12345)
+    The message is only formatted if debug logging is on, so this is cheap on hot paths
+    The event name and fields are attached to the log record for structured log handlers
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message.format(**fields), extra={"event": event, "fields": fields})
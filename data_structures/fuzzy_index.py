@@ -0,0 +1,225 @@
+from collections import Counter
+import heapq
+import re
+
+from data_structures.debug_log import log_event
+
+
+# Typo-tolerant title search - finds "The Great Gatsby" from "the graet gatsbby"
+#
+# Comparing the search against every title would be far too slow for a big catalogue,
+# so it works in two steps:
+#   1. Each word of the search is matched against the words used in titles, allowing a typo or two.
+#      Words are indexed by their letter pairs ("gatsby" -> ^g ga at ts sb by y$), and a word
+#      with k typos still shares all but 2k of its letter pairs, so only words sharing enough
+#      pairs are checked letter by letter.
+#   2. Titles containing those words are the candidates. Only the candidates sharing the most
+#      words with the search are compared letter by letter (edit distance) against the whole search.
+#
+# Like the other indexes, a book must be removed BEFORE its title is changed.
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Only this many candidate titles get the full (slow) letter-by-letter comparison
+CANDIDATE_LIMIT = 200
+
+# Words found in more titles than this are ignored when choosing candidates
+# (if the search has any rarer words) - "the" would make almost every title a candidate
+COMMON_WORD_LIMIT = 5000
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Levenshtein distance - the number of single letter inserts, deletes or changes to turn a into b
+    If max_distance is given, returns max_distance + 1 for anything further apart than that,
+    which is much faster (see below)
+    """
+    if a == b:
+        return 0
+    if max_distance is None:
+        max_distance = max(len(a), len(b))
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+
+    # Row i holds the distance from a[:i] to b[:j] for each j
+    # Only cells within max_distance of the diagonal can end up <= max_distance (a "band"),
+    # so the rest of each row is never worked out
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        letter_a = a[i - 1]
+        first = max(1, i - max_distance)
+        last = min(len(b), i + max_distance)
+
+        current = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        for j in range(first, last + 1):
+            current[j] = min(previous[j] + 1,                               # delete
+                             current[j - 1] + 1,                            # insert
+                             previous[j - 1] + (letter_a != b[j - 1]))      # change (free if same)
+
+        # Every cell in the band is already too far - it can only get worse
+        if min(current[first - 1:last + 1]) > max_distance:
+            return too_far
+        previous = current
+
+    return min(previous[-1], too_far)
+
+
+def word_tolerance(word):
+    # How many typos to allow in one word - short words allow fewer or they'd match everything
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return 2
+
+
+def letter_pairs(word):
+    # Letter pairs in a word, with ^ and $ marking the start and end: "cat" -> {"^c", "ca", "at", "t$"}
+    padded = "^" + word + "$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class FuzzyTitleIndex:
+    def __init__(self):
+        self._postings = {}         # word -> {book_id: book} for the books with that word in the title
+        self._pairs = {}            # (letter pair, word length) -> set of words of that length containing it
+        self._books = {}            # book_id -> book
+
+    @classmethod
+    def from_books(cls, books):
+        # Build an index from many books in one go
+        index = cls()
+        for book in books:
+            index.add_book(book)
+        log_event("fuzzy_index_built", "Built fuzzy title index: {count} books, {words} words",
+                  count=index.size, words=len(index._postings))
+        return index
+
+    @property
+    def size(self):
+        return len(self._books)
+
+    def add_book(self, book):
+        if book.id in self._books:
+            return False    # Already indexed
+
+        for word in set(_WORD_PATTERN.findall(book.title.lower())):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                self._add_word(word)
+            postings[book.id] = book
+
+        self._books[book.id] = book
+        return True
+
+    def remove_book(self, book):
+        if self._books.pop(book.id, None) is None:
+            log_event("index_not_found", "Book {book_id} not in fuzzy index", book_id=book.id)
+            return False
+
+        for word in set(_WORD_PATTERN.findall(book.title.lower())):
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            postings.pop(book.id, None)
+            if not postings:
+                # No title uses this word any more
+                del self._postings[word]
+                self._remove_word(word)
+        return True
+
+    def _add_word(self, word):
+        # Words are grouped by length too, so a search only counts words of a length that could match
+        for pair in letter_pairs(word):
+            key = (pair, len(word))
+            words = self._pairs.get(key)
+            if words is None:
+                self._pairs[key] = {word}
+            else:
+                words.add(word)
+
+    def _remove_word(self, word):
+        for pair in letter_pairs(word):
+            key = (pair, len(word))
+            words = self._pairs.get(key)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._pairs[key]
+
+    def similar_words(self, word, max_distance):
+        """
+        Title words within max_distance typos of word, as (distance, word) pairs
+        """
+        if max_distance == 0:
+            return [(0, word)] if word in self._postings else []
+
+        # Count the letter pairs each indexed word shares with this word
+        # Only words at most max_distance letters longer or shorter can be close enough
+        # (Counter.update does the counting loop in C, which is several times faster here)
+        pairs = letter_pairs(word)
+        lengths = range(max(1, len(word) - max_distance), len(word) + max_distance + 1)
+        shared = Counter()
+        for pair in pairs:
+            for length in lengths:
+                shared.update(self._pairs.get((pair, length), ()))
+
+        # Each typo can break at most 2 letter pairs, so anything sharing fewer can't be close enough
+        needed = len(pairs) - 2 * max_distance
+        results = []
+        for other_word, count in shared.items():
+            if count >= needed:
+                distance = edit_distance(word, other_word, max_distance)
+                if distance <= max_distance:
+                    results.append((distance, other_word))
+        return results
+
+    def _candidates(self, words):
+        # Books whose titles share the most (fuzzy matched) words with the search words
+        word_matches = []   # For each search word: the book dictionaries of every similar title word
+        for word in words:
+            matches = [self._postings[similar_word]
+                       for _, similar_word in self.similar_words(word, word_tolerance(word))]
+            if matches:
+                word_matches.append((sum(map(len, matches)), matches))
+
+        # Leave out very common words - if every word is common, just use the least common one
+        rare_matches = [matches for size, matches in word_matches if size <= COMMON_WORD_LIMIT]
+        if not rare_matches and word_matches:
+            rare_matches = [min(word_matches, key=lambda match: match[0])[1]]
+
+        # Count how many search words each book matched
+        counts = {}
+        for matches in rare_matches:
+            book_ids = matches[0] if len(matches) == 1 else set().union(*matches)
+            for book_id in book_ids:
+                counts[book_id] = counts.get(book_id, 0) + 1
+
+        best_ids = heapq.nlargest(CANDIDATE_LIMIT, counts, key=counts.get)
+        return [self._books[book_id] for book_id in best_ids]
+
+    def search(self, title, limit=5, max_distance=None):
+        """
+        The titles closest to title, as a list of (distance, book) with the closest first
+        Only titles within max_distance typos of the whole search are returned
+        (default: about one typo per 5 letters, and at least 2)
+        """
+        search_title = title.lower().strip()
+        if not search_title:
+            return []
+        if max_distance is None:
+            max_distance = max(2, len(search_title) // 5)
+
+        words = list(dict.fromkeys(_WORD_PATTERN.findall(search_title)))
+        results = []
+        for book in self._candidates(words):
+            distance = edit_distance(search_title, book.title.lower(), max_distance)
+            if distance <= max_distance:
+                results.append((distance, book.title.lower(), book))
+
+        # Closest first, then alphabetical
+        return [(distance, book) for distance, _, book in heapq.nsmallest(limit, results, key=lambda r: r[:2])]
@@ -1,8 +1,13 @@
+from data_structures.debug_log import log_event
+
+
 class HashTable:
-    def __init__(self, size=10):
+    def __init__(self, size=10, max_load_factor=0.75, min_load_factor=None, rehash_step=4):
         # size=10 is just a starting point for testing
         # The size affects performance - bigger = fewer collisions but more memory
+        # The table now grows by itself, so size is only the starting number of buckets
         self.size = size
+        self.initial_size = size
         
         # Create an array of empty lists
         # Each position will hold a list of books (handles collisions) # [[], [], [], .... 10 empty lists
@@ -10,6 +15,56 @@ class HashTable:
         
         # Keep track of total books stored
         self.count = 0
+
+        # Load factor = books / buckets (average chain length)
+        # Grow when it goes above max_load_factor
+        # Shrink when it goes below min_load_factor (None = never shrink)
+        self.max_load_factor = max_load_factor
+        self.min_load_factor = min_load_factor
+
+        # Incremental rehashing - instead of moving every book in one go (which would freeze the GUI),
+        # the old table is kept and a few buckets are moved across on each operation
+        self.rehash_step = rehash_step  # How many old buckets to move per operation
+        self._old_table = None          # Old bucket array while a resize is in progress
+        self._old_size = 0
+        self._migrate_index = 0         # Old buckets below this index have already been moved
+
+    @classmethod
+    def from_books(cls, books, max_load_factor=0.75, min_load_factor=None):
+        # Build a hash table from many books in one go (e.g. loading the whole catalogue at startup)
+        # The table is sized for all the books up front, so it never has to resize while loading
+        books = list(books)
+        size = max(10, int(len(books) / max_load_factor) + 1)
+        table = cls(size, max_load_factor=max_load_factor, min_load_factor=min_load_factor)
+        table.initial_size = 10     # Still allowed to shrink back down if books are removed later
+
+        for book in books:
+            bucket = table.table[book.id % size]
+
+            # Skip duplicate IDs (first one wins, same as add_book)
+            for existing_book in bucket:
+                if existing_book.id == book.id:
+                    break
+            else:
+                bucket.append(book)
+                table.count += 1
+
+        log_event("hash_bulk_load", "Bulk loaded {count} books into hash table ({size} positions)",
+                  count=table.count, size=size)
+        return table
+
+    @classmethod
+    def from_buckets(cls, buckets, max_load_factor=0.75, min_load_factor=None):
+        # Rebuild a hash table from a list of buckets that were already worked out
+        # (e.g. read back from a saved catalogue), so no book needs to be hashed again
+        # buckets[i] must hold exactly the books whose ID % len(buckets) == i
+        table = cls(len(buckets), max_load_factor=max_load_factor, min_load_factor=min_load_factor)
+        table.initial_size = 10
+        table.table = buckets
+        table.count = sum(len(bucket) for bucket in buckets)
+        log_event("hash_bulk_load", "Bulk loaded {count} books into hash table ({size} positions)",
+                  count=table.count, size=table.size)
+        return table
     
     def _hash_function(self, book_id):
         # underscore means this is a "private" method (internal use)
@@ -19,31 +74,100 @@ class HashTable:
         # book_id 67890 → 67890 % 10 = 0 (to position 0)
         return book_id % self.size
     
+    def _find_bucket(self, book_id):
+        # Returns (bucket list, index) for where this book ID lives right now
+        # During a resize a book is either still in its old bucket or already moved to the new table
+        if self._old_table is not None:
+            old_index = book_id % self._old_size
+            if old_index >= self._migrate_index:
+                return self._old_table[old_index], old_index
+
+        index = self._hash_function(book_id)
+        return self.table[index], index
+
+    def _rehash_some(self):
+        # Move the next few buckets from the old table into the new one
+        if self._old_table is None:
+            return
+
+        stop = min(self._migrate_index + self.rehash_step, self._old_size)
+        for old_index in range(self._migrate_index, stop):
+            for book in self._old_table[old_index]:
+                self.table[book.id % self.size].append(book)
+            self._old_table[old_index] = None   # Let the old list be garbage collected
+
+        self._migrate_index = stop
+
+        # Finished moving everything - drop the old table
+        if self._migrate_index >= self._old_size:
+            self._old_table = None
+            self._old_size = 0
+            self._migrate_index = 0
+
+    def _finish_rehash(self):
+        # Move all remaining buckets straight away (used before starting another resize)
+        while self._old_table is not None:
+            self._rehash_some()
+
+    def _start_resize(self, new_size):
+        # Only one resize can be in progress at a time
+        self._finish_rehash()
+
+        # Keep the old buckets and start moving them across bit by bit
+        self._old_table = self.table
+        self._old_size = self.size
+        self._migrate_index = 0
+
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+
+    def _check_load_factor(self):
+        # Grow (double) or shrink (halve) the table if the load factor is out of range
+        load_factor = self.count / self.size
+
+        if load_factor > self.max_load_factor:
+            self._start_resize(self.size * 2)
+
+        elif (self.min_load_factor is not None
+              and load_factor < self.min_load_factor
+              and self.size // 2 >= self.initial_size):
+            self._start_resize(self.size // 2)
+
+    def load_factor(self):
+        # Average number of books per bucket
+        return self.count / self.size
+
     def add_book(self, book):
+        # Do a little bit of any resize that is in progress
+        self._rehash_some()
+
         # Determine which array position this book belongs
-        index = self._hash_function(book.id)
+        bucket, index = self._find_bucket(book.id)
         
         # Check if this book ID already exists at this position
-        for existing_book in self.table[index]:
+        for existing_book in bucket:
             if existing_book.id == book.id:
-                print(f"Book ID {book.id} already exists in hash table")
+                log_event("hash_duplicate", "Book ID {book_id} already exists in hash table", book_id=book.id)
                 return False
         
         # Add the book to the list
         # If position 5 empty: [] becomes [book]
         # If position 5 contains book: [book1] becomes [book1, book2]
-        self.table[index].append(book)
+        bucket.append(book)
         self.count += 1
-        print(f"Added book ID {book.id} to hash position {index}")
+        log_event("hash_add", "Added book ID {book_id} to hash position {index}", book_id=book.id, index=index)
+
+        # Grow the table if the chains are getting too long
+        self._check_load_factor()
         return True
     
 
     def find_book(self, book_id):
         # Calculate where the book should be
-        index = self._hash_function(book_id)
+        bucket, _ = self._find_bucket(book_id)
         
         # Search through books at this position
-        for book in self.table[index]:
+        for book in bucket:
             if book.id == book_id:
                 return book
         
@@ -51,21 +175,30 @@ class HashTable:
         return None
     
     def remove_book(self, book_id):
+        # Do a little bit of any resize that is in progress
+        self._rehash_some()
+
         # Calculate position
-        index = self._hash_function(book_id)
+        bucket, _ = self._find_bucket(book_id)
         
         # Search and remove
-        for i, book in enumerate(self.table[index]):
+        for i, book in enumerate(bucket):
             if book.id == book_id:
-                removed_book = self.table[index].pop(i)
+                removed_book = bucket.pop(i)
                 self.count -= 1
-                print(f"Removed book: {removed_book}")
+                log_event("hash_remove", "Removed book: {book}", book=removed_book)
+
+                # Shrink the table if it is mostly empty (only if min_load_factor is set)
+                self._check_load_factor()
                 return True
         
-        print(f"Book ID {book_id} not found in hash table")
+        log_event("hash_not_found", "Book ID {book_id} not found in hash table", book_id=book_id)
         return False
     
     def display_all(self):
+        # Finish any resize first so every book is in the current table
+        self._finish_rehash()
+
         print(f"Hash Table Contents ({self.count} books):")
 
         #search through each table position
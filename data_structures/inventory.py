@@ -0,0 +1,383 @@
+from data_structures.debug_log import log_event
+from data_structures.linked_list import DoubleLinkedList
+from data_structures.hash_table import HashTable
+from data_structures.binary_tree import BinaryTree
+from data_structures.secondary_index import FieldIndex, PriceIndex
+from data_structures.text_index import TextIndex
+from data_structures.fuzzy_index import FuzzyTitleIndex
+
+
+# Inventory keeps the linked list, hash table and binary tree in sync
+# (plus the author, genre and price indexes used for searching)
+# Every change goes through here, so all the structures always hold the same books
+# If one structure fails part way through a change, the others are put back (rollback)
+class Inventory:
+    # Book fields that update() is allowed to change (the ID never changes)
+    EDITABLE_FIELDS = ("title", "author", "genre", "price", "in_stock", "image_path")
+
+    def __init__(self, balanced=True):
+        self.linked_list = DoubleLinkedList()           # Books in insertion order
+        self.hash_table = HashTable()                   # Fast lookup by ID
+        self.tree = BinaryTree(balanced=balanced)       # Alphabetical lookup by title
+
+        # Secondary indexes - all books by an author/genre, or in a price range
+        self.author_index = FieldIndex("author")
+        self.genre_index = FieldIndex("genre")
+        self.price_index = PriceIndex()
+
+        # Word search and typo-tolerant title indexes - only built the first time they are used
+        # (see text_index and fuzzy_index)
+        self._text_index = None
+        self._fuzzy_index = None
+
+        # Functions to call after every successful change, e.g. to save it to disk
+        # Each one is called as listener(action, book, changes) where action is "add", "update" or "remove"
+        self._listeners = []
+
+    @classmethod
+    def from_books(cls, books, balanced=True):
+        # Build an inventory from many books in one go using the bulk loaders
+        # Books with an ID or title that was already seen are skipped (first one wins),
+        # so every structure ends up with exactly the same books
+        seen_ids = set()
+        seen_titles = set()
+        unique_books = []
+
+        for book in books:
+            title = book.title.lower()
+            if book.id in seen_ids or title in seen_titles:
+                continue
+            seen_ids.add(book.id)
+            seen_titles.add(title)
+            unique_books.append(book)
+
+        return cls.from_structures(DoubleLinkedList.from_books(unique_books),
+                                   HashTable.from_books(unique_books),
+                                   BinaryTree.from_books(unique_books, balanced=balanced))
+
+    @classmethod
+    def from_structures(cls, linked_list, hash_table, tree):
+        # Wrap three structures that were already built with the same books
+        inventory = cls(balanced=tree.balanced)
+        inventory.linked_list = linked_list
+        inventory.hash_table = hash_table
+        inventory.tree = tree
+
+        # The secondary indexes aren't saved, so they are built from the books here
+        books = list(inventory)
+        inventory.author_index = FieldIndex.from_books(books, "author")
+        inventory.genre_index = FieldIndex.from_books(books, "genre")
+        inventory.price_index = PriceIndex.from_books(books)
+        return inventory
+
+    @property
+    def size(self):
+        # Number of books in the inventory
+        return self.linked_list.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # Loop over books in insertion order (same order as the linked list)
+        current_node = self.linked_list.head
+        while current_node is not None:
+            yield current_node.data
+            current_node = current_node.next
+
+    def add_listener(self, listener):
+        # Register a function to be told about every change
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def replace_structures(self, other):
+        """
+        Take over every structure of other (e.g. one just bulk built with from_books),
+        keeping this object and its listeners. Only done while this inventory is empty
+        Returns True if replaced, False if this inventory already has books
+        The listeners aren't told about the books (save a snapshot afterwards)
+        """
+        if self.size != 0:
+            return False
+
+        for name in ("linked_list", "hash_table", "tree", "author_index", "genre_index", "price_index"):
+            setattr(self, name, getattr(other, name))
+
+        # Built again from the new books the next time they are used
+        self._text_index = None
+        self._fuzzy_index = None
+        return True
+
+    def _secondary_indexes(self):
+        # (book field, index) for each secondary index
+        return (("author", self.author_index), ("genre", self.genre_index), ("price", self.price_index))
+
+    @property
+    def text_index(self):
+        # Building the word index means splitting every title/author/genre into words,
+        # which takes a few seconds for a huge catalogue, so it waits until the first search
+        if self._text_index is None:
+            self._text_index = TextIndex.from_books(self)
+            log_event("text_index_built", "Built word search index for {count} books", count=self._text_index.size)
+        return self._text_index
+
+    @property
+    def fuzzy_index(self):
+        # Built on first use, same as text_index
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyTitleIndex.from_books(self)
+        return self._fuzzy_index
+
+    def _all_indexes(self):
+        # Secondary indexes plus the search indexes that have been built
+        # (None as the field means "changes when the title, author or genre changes")
+        indexes = list(self._secondary_indexes())
+        if self._text_index is not None:
+            indexes.append((None, self._text_index))
+        if self._fuzzy_index is not None:
+            indexes.append(("title", self._fuzzy_index))
+        return indexes
+
+    def _index_add_step(self, index, book):
+        # (do, undo) step that adds a book to a secondary index
+        # (a function, so each step keeps its own index - a lambda in a loop would share the last one)
+        return (lambda: index.add_book(book), lambda: index.remove_book(book))
+
+    def _index_remove_step(self, index, book):
+        return (lambda: index.remove_book(book), lambda: index.add_book(book))
+
+    def _notify(self, action, book, changes=None):
+        for listener in self._listeners:
+            listener(action, book, changes)
+
+    def _run_steps(self, steps):
+        # Run a list of (do, undo) steps in order
+        # Each do() returns True if it worked. If one returns False (or raises an error),
+        # the undo() of every step that already worked is run in reverse order
+        done = []
+        try:
+            for do, undo in steps:
+                if not do():
+                    break
+                done.append(undo)
+            else:
+                return True
+
+        except Exception:
+            for undo in reversed(done):
+                undo()
+            raise
+
+        for undo in reversed(done):
+            undo()
+        return False
+
+    def get(self, book_id):
+        # Find a book by ID (hash table)
+        return self.hash_table.find_book(book_id)
+
+    def get_by_title(self, title):
+        # Find a book by title, case-insensitive (binary tree)
+        return self.tree.search_by_title(title)
+
+    def books_after(self, book_id=None, count=None):
+        # Up to count books in the order they were added, starting after book_id (None = from the start)
+        # e.g. one page of the book list - None if book_id isn't in the inventory
+        if book_id is None:
+            node = self.linked_list.head
+        else:
+            node = self.linked_list.get_node(book_id)
+            if node is None:
+                return None
+            node = node.next
+
+        books = []
+        while node is not None and (count is None or len(books) < count):
+            books.append(node.data)
+            node = node.next
+        return books
+
+    def range(self, start_title=None, end_title=None):
+        # Books in alphabetical order with start_title <= title < end_title (case-insensitive)
+        # Leave either end as None to have no limit on that side
+        return self.tree.range(start_title, end_title)
+
+    def prefix(self, prefix):
+        # Books whose title starts with prefix, in alphabetical order (e.g. for type-ahead search)
+        return self.tree.prefix(prefix)
+
+    def nearest(self, title):
+        # The book at or just after title alphabetically (see BinaryTree.nearest)
+        return self.tree.nearest(title)
+
+    def select(self, position):
+        # The book at a position in alphabetical order (0 = first)
+        return self.tree.select(position)
+
+    def rank(self, title):
+        # Position of a title in alphabetical order (number of titles before it)
+        return self.tree.rank(title)
+
+    def slice(self, start, stop=None):
+        # Books at positions start to stop - 1 in alphabetical order, e.g. one page of a sorted list
+        return self.tree.slice(start, stop)
+
+    def by_author(self, author):
+        # All books by an author (case-insensitive)
+        return self.author_index.find(author)
+
+    def by_genre(self, genre):
+        # All books in a genre (case-insensitive)
+        return self.genre_index.find(genre)
+
+    def by_price(self, min_price=None, max_price=None):
+        # Books with min_price <= price < max_price, cheapest first
+        return self.price_index.range(min_price, max_price)
+
+    def search(self, query, match_all=True, limit=None):
+        # Books containing the words in query (in the title, author or genre), best matches first
+        # match_all=False finds books with ANY of the words instead of all of them
+        return self.text_index.search(query, match_all=match_all, limit=limit)
+
+    def fuzzy_search(self, title, limit=5, max_distance=None):
+        # Titles closest to title allowing for typos, as (number of typos, book) with the closest first
+        return self.fuzzy_index.search(title, limit=limit, max_distance=max_distance)
+
+    def find(self, author=None, genre=None, min_price=None, max_price=None):
+        """
+        Books matching every filter given, e.g. find(genre="Fantasy", max_price=20)
+        Starts from whichever index gives the fewest books and checks the other filters on those,
+        so it never has to look at every book
+        """
+        candidates = []     # (number of books, function that gives those books)
+        if author is not None:
+            candidates.append((self.author_index.count(author), lambda: self.by_author(author)))
+        if genre is not None:
+            candidates.append((self.genre_index.count(genre), lambda: self.by_genre(genre)))
+        if min_price is not None or max_price is not None:
+            candidates.append((self.price_index.count(min_price, max_price),
+                               lambda: self.by_price(min_price, max_price)))
+
+        if not candidates:
+            return list(self)   # No filters - every book
+
+        _, smallest = min(candidates, key=lambda candidate: candidate[0])
+        author_key = author.lower() if author is not None else None
+        genre_key = genre.lower() if genre is not None else None
+
+        results = []
+        for book in smallest():
+            if author_key is not None and book.author.lower() != author_key:
+                continue
+            if genre_key is not None and book.genre.lower() != genre_key:
+                continue
+            if min_price is not None and book.price < min_price:
+                continue
+            if max_price is not None and book.price >= max_price:
+                continue
+            results.append(book)
+        return results
+
+    def add(self, book):
+        # Add a new book to all three structures
+        # Returns False if the ID or title is already taken
+        if self.hash_table.find_book(book.id) is not None:
+            log_event("inventory_duplicate_id", "Book ID {book_id} already exists", book_id=book.id)
+            return False
+
+        if self.tree.search_by_title(book.title) is not None:
+            log_event("inventory_duplicate_title", "Book '{title}' already exists", title=book.title)
+            return False
+
+        steps = [
+            (lambda: self.linked_list.add_book(book), lambda: self.linked_list.remove_book(book.id)),
+            (lambda: self.hash_table.add_book(book), lambda: self.hash_table.remove_book(book.id)),
+            (lambda: self.tree.add_book(book), lambda: self.tree.remove_book(book.title)),
+        ]
+        for _, index in self._all_indexes():
+            steps.append(self._index_add_step(index, book))
+
+        added = self._run_steps(steps)
+
+        if added:
+            log_event("inventory_add", "Added book: {book}", book=book)
+            self._notify("add", book)
+        return added
+
+    def update(self, book_id, **changes):
+        # Change some fields of an existing book, e.g. update(12345, price=9.99, title="New Title")
+        # Returns False if the book doesn't exist or the new title is already used by another book
+        for field in changes:
+            if field not in self.EDITABLE_FIELDS:
+                raise ValueError(f"Cannot update field '{field}'")
+
+        book = self.hash_table.find_book(book_id)
+        if book is None:
+            log_event("inventory_not_found", "Book ID {book_id} not found", book_id=book_id)
+            return False
+
+        old_values = {field: getattr(book, field) for field in changes}
+
+        def apply_changes():
+            for field, value in changes.items():
+                setattr(book, field, value)
+            return True
+
+        def restore_values():
+            for field, value in old_values.items():
+                setattr(book, field, value)
+
+        old_title = book.title
+        new_title = changes.get("title", old_title)
+
+        # Structures sorted/grouped by a field that is changing have to move the book
+        # It has to come out BEFORE the value changes, otherwise the structure can't find it
+        remove_steps = []
+        add_steps = []
+
+        # The tree is sorted by title, so a new title means moving the book in the tree
+        if new_title.lower() != old_title.lower():
+            if self.tree.search_by_title(new_title) is not None:
+                log_event("inventory_duplicate_title", "Book '{title}' already exists", title=new_title)
+                return False
+
+            remove_steps.append((lambda: self.tree.remove_book(old_title), lambda: self.tree.add_book(book)))
+            add_steps.append((lambda: self.tree.add_book(book), lambda: self.tree.remove_book(new_title)))
+
+        text_changed = any(field in changes and changes[field] != old_values[field]
+                           for field in ("title", "author", "genre"))
+        for field, index in self._all_indexes():
+            if (field is None and text_changed) or (field in changes and changes[field] != old_values[field]):
+                remove_steps.append(self._index_remove_step(index, book))
+                add_steps.append(self._index_add_step(index, book))
+
+        updated = self._run_steps(remove_steps + [(apply_changes, restore_values)] + add_steps)
+
+        if updated:
+            log_event("inventory_update", "Updated book: {book}", book=book)
+            self._notify("update", book, changes)
+        return updated
+
+    def remove(self, book_id):
+        # Remove a book from all three structures
+        # Returns False if the book doesn't exist
+        book = self.hash_table.find_book(book_id)
+        if book is None:
+            log_event("inventory_not_found", "Book ID {book_id} not found", book_id=book_id)
+            return False
+
+        # The linked list goes last because putting a book back can't restore its old position
+        steps = [self._index_remove_step(index, book) for _, index in self._all_indexes()]
+        steps += [
+            (lambda: self.tree.remove_book(book.title), lambda: self.tree.add_book(book)),
+            (lambda: self.hash_table.remove_book(book_id), lambda: self.hash_table.add_book(book)),
+            (lambda: self.linked_list.remove_book(book_id), lambda: self.linked_list.add_book(book)),
+        ]
+        removed = self._run_steps(steps)
+
+        if removed:
+            log_event("inventory_remove", "Removed book: {book}", book=book)
+            self._notify("remove", book)
+        return removed
@@ -1,5 +1,11 @@
+from data_structures.debug_log import log_event
+
+
 # Node class represents one book in linked list
 class Node:
+    # __slots__ saves memory and makes nodes faster to create (there is one node per book)
+    __slots__ = ("data", "prev", "next")
+
     def __init__(self, data):
         self.data = data    # The actual book object stored in node
         self.prev = None    # Pointer to the previous node in the list
@@ -11,12 +17,48 @@ class DoubleLinkedList:
         self.head = None    # Points to the first node in the list
         self.tail = None    # Points to the last node in the list
         self.size = 0       # Track how many books stored
+
+        # Dictionary of book_id -> Node so we can jump straight to a book's node
+        # This makes remove, move to front and find by ID instant instead of walking the whole list
+        self._nodes = {}
     
 
 
 
+    # Build a list from many books in one go (e.g. loading the whole catalogue at startup)
+    @classmethod
+    def from_books(cls, books):
+        linked_list = cls()
+        previous_node = None
+
+        # Link each new node to the one before it in a single pass
+        for book in books:
+            # Skip duplicate IDs (first one wins, same as add_book)
+            if book.id in linked_list._nodes:
+                continue
+
+            new_node = Node(book)
+            if previous_node is None:
+                linked_list.head = new_node     # First book becomes the head
+            else:
+                previous_node.next = new_node
+                new_node.prev = previous_node
+            previous_node = new_node
+            linked_list._nodes[book.id] = new_node
+            linked_list.size += 1
+
+        linked_list.tail = previous_node        # Last book becomes the tail
+        return linked_list
+
+
+
     # Add new book to list
     def add_book(self, book):
+        # Don't add the same book ID twice
+        if book.id in self._nodes:
+            log_event("list_duplicate", "Book ID {book_id} already exists in list", book_id=book.id)
+            return False
+
         # Create a new node and link it
         new_node = Node(book)
         
@@ -32,56 +74,94 @@ class DoubleLinkedList:
 
             self.tail = new_node    # Update tail to point to our new book (now the last one)
 
+        self._nodes[book.id] = new_node     # Remember where this book's node is
         self.size += 1      # Increase book Count
+        log_event("list_add", "Added book: {book}", book=book)
+        return True
     
 
 
 
+    # Find a book by ID without walking the list
+    def find_book(self, book_id):
+        node = self._nodes.get(book_id)
+        return node.data if node is not None else None
+
+
+
+
+    # Get the node holding a book (e.g. to start walking the list from that book)
+    def get_node(self, book_id):
+        return self._nodes.get(book_id)
+
+
+
+
+    # Unlink a node from the list (doesn't change size or the ID dictionary)
+    def _unlink(self, node):
+
+        # Previous book (or head if this was the first book) now skips over this node
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+
+        # Next book (or tail if this was the last book) now points back past this node
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+
+        # If it was the only book, head and tail are both None now (empty list)
+        node.prev = None
+        node.next = None
+
+
+
+
     # Remove book by ID
     def remove_book(self, book_id):
         
         # Check if the list is empty
         if self.head is None:
-            print("No books stored")
+            log_event("list_empty", "No books stored")
+            return False
 
-        # Start from the first book (head) and go through list
-        current_node = self.head
+        # Look up the node directly instead of searching from the head
+        current_node = self._nodes.pop(book_id, None)
 
-        # While loop until end find book with matching ID
-        while current_node is not None:
-            if current_node.data.id == book_id:     # found book
-
-                # Removes if only the one book in list
-                if self.head == self.tail:
-                    self.head: None
-                    self.tail: None
-
-                # Removes if first book but more there are more after. Changes node head to next book
-                elif current_node == self.head:
-                    self.head = current_node.next
-                    self.head.prev = None
-
-                #Removes if last book but are more befroe. Changes node tail to previous book
-                elif current_node == self.tail:
-                    self.tail = current_node.prev
-                    self.tail.next = None
-
-                #Removes book fom anywhere in the middle of list. Changes head and tail to previous and next
-                else:
-                    current_node.prev.next = current_node.next
-                    current_node.next.prev = current_node.prev
-
-                #Update book count
-                self.size -= 1
-                print(f"Removed book: {current_node.data}")
-                return True
-            
-            #move to next book in list
-            current_node = current_node.next
+        #if book wasn't found
+        if current_node is None:
+            log_event("list_not_found", "Book {book_id} not found", book_id=book_id)
+            return False
+
+        # Because the list is doubly linked the node can be unlinked straight away
+        self._unlink(current_node)
+
+        #Update book count
+        self.size -= 1
+        log_event("list_remove", "Removed book: {book}", book=current_node.data)
+        return True
+
+
+
+
+    # Move a book to the front of the list (e.g. most recently viewed)
+    def move_to_front(self, book_id):
+        node = self._nodes.get(book_id)
+        if node is None:
+            return False
+
+        # Already at the front - nothing to do
+        if node is self.head:
+            return True
 
-            #if book wasn't found
-        print(f"Book {book_id} not found")
-        return False
+        # Take it out of its current place and link it in before the old head
+        self._unlink(node)
+        node.next = self.head
+        self.head.prev = node
+        self.head = node
+        return True
 
 
 
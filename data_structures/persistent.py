@@ -0,0 +1,421 @@
+# Persistent (immutable) versions of the title tree and the ID hash table
+#
+# "Persistent" means a change never alters the old version - it makes a new version instead:
+#   titles2 = titles.with_book(book)     # titles is exactly as it was
+# That sounds expensive, but only the nodes on the path to the change are copied (about log n of them);
+# everything else is shared between the old and new versions ("structural sharing").
+# So keeping an old version around costs memory only for the parts that have changed since.
+#
+# Nodes are never changed after they are made, so any number of threads can read any version
+# without locks while another thread makes new versions.
+
+# ---- Title tree (AVL tree, like BinaryTree, but every change copies the path instead) ----
+
+
+class _TreeNode:
+    __slots__ = ("key", "book", "left", "right", "height", "count")
+
+    def __init__(self, key, book, left, right):
+        self.key = key          # Lower case title
+        self.book = book
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else 0, right.height if right else 0)
+        self.count = 1 + (left.count if left else 0) + (right.count if right else 0)
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+def _count(node):
+    return node.count if node is not None else 0
+
+
+def _balanced(key, book, left, right):
+    # New node for key with these children, rotated if one side is more than one level taller
+    # (same four cases as BinaryTree._rebalance, but making new nodes instead of moving links)
+    if _height(left) > _height(right) + 1:
+        if _height(left.left) >= _height(left.right):
+            # Left-left: rotate right
+            return _TreeNode(left.key, left.book, left.left, _TreeNode(key, book, left.right, right))
+        # Left-right: the left child's right child comes to the top
+        middle = left.right
+        return _TreeNode(middle.key, middle.book,
+                         _TreeNode(left.key, left.book, left.left, middle.left),
+                         _TreeNode(key, book, middle.right, right))
+
+    if _height(right) > _height(left) + 1:
+        if _height(right.right) >= _height(right.left):
+            # Right-right: rotate left
+            return _TreeNode(right.key, right.book, _TreeNode(key, book, left, right.left), right.right)
+        # Right-left
+        middle = right.left
+        return _TreeNode(middle.key, middle.book,
+                         _TreeNode(key, book, left, middle.left),
+                         _TreeNode(right.key, right.book, middle.right, right.right))
+
+    return _TreeNode(key, book, left, right)
+
+
+def _tree_insert(node, key, book):
+    # Copy of the subtree with key -> book added (or replaced)
+    if node is None:
+        return _TreeNode(key, book, None, None)
+    if key < node.key:
+        return _balanced(node.key, node.book, _tree_insert(node.left, key, book), node.right)
+    if key > node.key:
+        return _balanced(node.key, node.book, node.left, _tree_insert(node.right, key, book))
+    return _TreeNode(key, book, node.left, node.right)
+
+
+def _tree_remove_first(node):
+    # (first node, copy of the subtree without it)
+    if node.left is None:
+        return node, node.right
+    first, left = _tree_remove_first(node.left)
+    return first, _balanced(node.key, node.book, left, node.right)
+
+
+def _tree_remove(node, key):
+    # Copy of the subtree without key (the same subtree if key isn't in it)
+    if node is None:
+        return None
+    if key < node.key:
+        left = _tree_remove(node.left, key)
+        return node if left is node.left else _balanced(node.key, node.book, left, node.right)
+    if key > node.key:
+        right = _tree_remove(node.right, key)
+        return node if right is node.right else _balanced(node.key, node.book, node.left, right)
+
+    # Found it - join the two sides, using the first book on the right as the new top
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    first, right = _tree_remove_first(node.right)
+    return _balanced(first.key, first.book, node.left, right)
+
+
+def _tree_from_sorted(books, keys, start, end):
+    # Balanced tree from books[start:end] (already in title order) - O(n), like BinaryTree._build_from_sorted
+    if start >= end:
+        return None
+    middle = (start + end) // 2
+    return _TreeNode(keys[middle], books[middle],
+                     _tree_from_sorted(books, keys, start, middle),
+                     _tree_from_sorted(books, keys, middle + 1, end))
+
+
+class PersistentTree:
+    """
+    Books in title order (case-insensitive, one book per title) that never changes once made
+    with_book/without_title return a new tree and leave this one as it was
+    """
+    __slots__ = ("root",)
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def from_sorted_books(cls, books):
+        # Build from books already in title order with no repeated titles (e.g. BinaryTree.iter_sorted())
+        books = books if isinstance(books, list) else list(books)
+        keys = [book.title.lower() for book in books]
+        return cls(_tree_from_sorted(books, keys, 0, len(books)))
+
+    @property
+    def size(self):
+        return _count(self.root)
+
+    def __len__(self):
+        return self.size
+
+    def with_book(self, book):
+        return PersistentTree(_tree_insert(self.root, book.title.lower(), book))
+
+    def without_title(self, title):
+        root = _tree_remove(self.root, title.lower())
+        return self if root is self.root else PersistentTree(root)
+
+    def search_by_title(self, title):
+        key = title.lower()
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node.book
+            node = node.left if key < node.key else node.right
+        return None
+
+    def _nodes_from(self, start):
+        # Nodes in title order from the first key >= start (None = from the beginning)
+        stack = []
+        node = self.root
+        while node is not None:
+            if start is None or node.key >= start:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def iter_sorted(self):
+        for node in self._nodes_from(None):
+            yield node.book
+
+    def range(self, start_title=None, end_title=None):
+        # Books with start_title <= title < end_title (either end None = no limit)
+        end = end_title.lower() if end_title is not None else None
+        for node in self._nodes_from(start_title.lower() if start_title is not None else None):
+            if end is not None and node.key >= end:
+                return
+            yield node.book
+
+    def prefix(self, prefix):
+        search_prefix = prefix.lower()
+        for node in self._nodes_from(search_prefix):
+            if not node.key.startswith(search_prefix):
+                return
+            yield node.book
+
+    def _select_node(self, position):
+        # Node at a position in title order (0 = first), using the counts to skip whole subtrees
+        if position < 0 or position >= self.size:
+            return None
+        node = self.root
+        while True:
+            left_count = _count(node.left)
+            if position < left_count:
+                node = node.left
+            elif position == left_count:
+                return node
+            else:
+                position -= left_count + 1
+                node = node.right
+
+    def select(self, position):
+        node = self._select_node(position)
+        return node.book if node is not None else None
+
+    def slice(self, start, stop=None):
+        # Books at positions start to stop - 1 in title order
+        first = self._select_node(start)
+        if first is None:
+            return
+        remaining = self.size - start if stop is None else stop - start
+        for node in self._nodes_from(first.key):
+            if remaining <= 0:
+                return
+            yield node.book
+            remaining -= 1
+
+
+# ---- ID lookup (hash array mapped trie) ----
+#
+# A 32-way tree indexed by the bits of the key's hash, 5 bits per level:
+# the root picks a child by bits 0-4, the next level by bits 5-9, and so on.
+# Each node only stores the children that exist, plus a 32 bit "bitmap" of which ones they are,
+# so a sparse node stays small. A million IDs need only about 4 levels,
+# so a change copies about 4 small nodes.
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+
+
+class _HashNode:
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap, entries):
+        self.bitmap = bitmap        # Bit i set = there is an entry for hash digit i
+        self.entries = entries      # Tuple, in digit order - each is (key, value) or a deeper _HashNode
+
+
+class _Collision:
+    # Keys whose whole hash is the same (only possible for unusual keys) - kept in a small tuple
+    __slots__ = ("pairs",)
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+
+def _hash(key):
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _position(bitmap, bit):
+    # Where the entry for bit is in the entries tuple = number of bits set below it
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+def _pair_node(pair1, hash1, pair2, hash2, shift):
+    # Smallest subtree holding two pairs whose hashes agree on every digit before shift
+    if shift >= _HASH_BITS:
+        return _Collision((pair1, pair2))
+    digit1 = (hash1 >> shift) & _MASK
+    digit2 = (hash2 >> shift) & _MASK
+    if digit1 == digit2:
+        return _HashNode(1 << digit1, (_pair_node(pair1, hash1, pair2, hash2, shift + _BITS),))
+    if digit1 > digit2:
+        pair1, pair2 = pair2, pair1
+    return _HashNode((1 << digit1) | (1 << digit2), (pair1, pair2))
+
+
+def _hash_set(node, key, key_hash, value, shift):
+    # (copy of node with key -> value, True if key is new)
+    if type(node) is _Collision:
+        pairs = [pair for pair in node.pairs if pair[0] != key]
+        added = len(pairs) == len(node.pairs)
+        return _Collision(tuple(pairs) + ((key, value),)), added
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    position = _position(node.bitmap, bit)
+    entries = node.entries
+
+    if not node.bitmap & bit:
+        return _HashNode(node.bitmap | bit, entries[:position] + ((key, value),) + entries[position:]), True
+
+    entry = entries[position]
+    if type(entry) is tuple:
+        if entry[0] == key:
+            new_entry, added = (key, value), False
+        else:
+            new_entry = _pair_node(entry, _hash(entry[0]), (key, value), key_hash, shift + _BITS)
+            added = True
+    else:
+        new_entry, added = _hash_set(entry, key, key_hash, value, shift + _BITS)
+    return _HashNode(node.bitmap, entries[:position] + (new_entry,) + entries[position + 1:]), added
+
+
+def _hash_remove(node, key, key_hash, shift):
+    # Copy of node without key (the same node if key isn't in it, None if nothing is left)
+    if type(node) is _Collision:
+        pairs = tuple(pair for pair in node.pairs if pair[0] != key)
+        if len(pairs) == len(node.pairs):
+            return node
+        return pairs[0] if len(pairs) == 1 else _Collision(pairs)
+
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    position = _position(node.bitmap, bit)
+    entry = node.entries[position]
+
+    if type(entry) is tuple:
+        if entry[0] != key:
+            return node
+        new_entry = None
+    else:
+        new_entry = _hash_remove(entry, key, key_hash, shift + _BITS)
+        if new_entry is entry:
+            return node
+        # A subtree left holding a single pair is replaced by the pair itself
+        if type(new_entry) is _HashNode and len(new_entry.entries) == 1 and type(new_entry.entries[0]) is tuple:
+            new_entry = new_entry.entries[0]
+
+    if new_entry is None:
+        if node.bitmap == bit:
+            return None
+        return _HashNode(node.bitmap & ~bit, node.entries[:position] + node.entries[position + 1:])
+    return _HashNode(node.bitmap, node.entries[:position] + (new_entry,) + node.entries[position + 1:])
+
+
+def _hash_from_pairs(pairs, shift):
+    # Build a subtree from (hash, key, value) triples whose hashes agree before shift - no copying
+    if len(pairs) == 1:
+        return pairs[0][1:]
+    if shift >= _HASH_BITS:
+        return _Collision(tuple(pair[1:] for pair in pairs))
+
+    groups = {}
+    for pair in pairs:
+        groups.setdefault((pair[0] >> shift) & _MASK, []).append(pair)
+
+    bitmap = 0
+    entries = []
+    for digit in sorted(groups):
+        bitmap |= 1 << digit
+        entries.append(_hash_from_pairs(groups[digit], shift + _BITS))
+    return _HashNode(bitmap, tuple(entries))
+
+
+def _hash_items(node):
+    if type(node) is tuple:
+        yield node
+    elif type(node) is _Collision:
+        yield from node.pairs
+    else:
+        for entry in node.entries:
+            yield from _hash_items(entry)
+
+
+class PersistentHashMap:
+    """
+    Dictionary that never changes once made - with_item/without return a new map
+    Used to look books up by ID in a snapshot
+    """
+    __slots__ = ("_root", "size")
+
+    def __init__(self, root=None, size=0):
+        self._root = root if root is not None else _HashNode(0, ())
+        self.size = size
+
+    @classmethod
+    def from_items(cls, items):
+        # Build from (key, value) pairs in one go (keys must be unique)
+        pairs = [(_hash(key), key, value) for key, value in items]
+        if len(pairs) < 2:
+            # The root always has to be a node, even for a single pair
+            return cls().with_item(*pairs[0][1:]) if pairs else cls()
+        return cls(_hash_from_pairs(pairs, 0), len(pairs))
+
+    def __len__(self):
+        return self.size
+
+    def get(self, key, default=None):
+        key_hash = _hash(key)
+        node = self._root
+        shift = 0
+        while True:
+            bit = 1 << ((key_hash >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            entry = node.entries[_position(node.bitmap, bit)]
+            if type(entry) is tuple:
+                return entry[1] if entry[0] == key else default
+            if type(entry) is _Collision:
+                for pair_key, value in entry.pairs:
+                    if pair_key == key:
+                        return value
+                return default
+            node = entry
+            shift += _BITS
+
+    def __contains__(self, key):
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def with_item(self, key, value):
+        root, added = _hash_set(self._root, key, _hash(key), value, 0)
+        return PersistentHashMap(root, self.size + added)
+
+    def without(self, key):
+        root = _hash_remove(self._root, key, _hash(key), 0)
+        if root is self._root:
+            return self
+        return PersistentHashMap(root, self.size - 1)
+
+    def items(self):
+        # (key, value) pairs in no particular order
+        return _hash_items(self._root)
+
+    def values(self):
+        for _, value in self.items():
+            yield value
@@ -0,0 +1,106 @@
+import threading
+
+
+# Reader-writer lock - any number of threads can read at the same time,
+# but a thread that changes something gets the lock to itself
+#
+#   lock = ReadWriteLock()
+#   with lock.read():       # many threads can be in here at once
+#       ...
+#   with lock.write():      # only one thread, and no readers
+#       ...
+#
+# Writers go first: once a writer is waiting, new readers wait too,
+# otherwise a steady stream of readers could keep a writer waiting forever.
+#
+# A thread can take the lock again while it already holds it (e.g. a read inside a write,
+# or a method that reads calling another method that reads). The one thing it can't do is
+# ask for the write lock while holding only the read lock - two threads doing that would
+# wait for each other forever, so it raises an error instead.
+
+
+class _Held:
+    # Lets "with lock.read():" call acquire/release without making a new object each time
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, *exception):
+        self._release()
+
+
+class ReadWriteLock:
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = {}              # thread ID -> how many times it holds the read lock
+        self._writer = None             # thread ID holding the write lock
+        self._write_count = 0           # How many times the writer holds it
+        self._waiting_writers = 0
+
+        self._read_context = _Held(self.acquire_read, self.release_read)
+        self._write_context = _Held(self.acquire_write, self.release_write)
+
+    def read(self):
+        return self._read_context
+
+    def write(self):
+        return self._write_context
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me or me in self._readers:
+                # Already inside - waiting for a writer now would mean waiting for ourselves
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            count = self._readers.get(me)
+            if count is None:
+                raise RuntimeError("Read lock released by a thread that doesn't hold it")
+
+            if count > 1:
+                self._readers[me] = count - 1
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._condition.notify_all()    # A writer may be waiting for the last reader
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_count += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Can't ask for the write lock while holding the read lock")
+
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_count = 1
+
+    def release_write(self):
+        with self._condition:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Write lock released by a thread that doesn't hold it")
+
+            self._write_count -= 1
+            if self._write_count == 0:
+                self._writer = None
+                self._condition.notify_all()    # Let the waiting readers (or the next writer) in
@@ -0,0 +1,204 @@
+from bisect import bisect_left
+from itertools import islice
+
+from data_structures.debug_log import log_event
+
+
+# Secondary indexes - find books by something other than their ID or title
+# without walking the whole linked list.
+#
+#   FieldIndex("genre")  - hash table of value -> books with that value (e.g. every Fantasy book)
+#   PriceIndex()         - books kept sorted by price (in blocks), so a price range is found by binary search
+#
+# The Inventory keeps these up to date on every add/update/remove.
+# They look up a book's value when it is added or removed, so a book must be removed
+# BEFORE one of its indexed fields is changed (same as the title tree).
+
+
+class FieldIndex:
+    def __init__(self, field):
+        self.field = field      # Book property this index is for, e.g. "author"
+
+        # value (lower case) -> {book_id: book}
+        # An inner dictionary (not a list) so one book can be removed instantly
+        self._books = {}
+        self.size = 0
+
+    @classmethod
+    def from_books(cls, books, field):
+        # Build an index from many books in one go
+        index = cls(field)
+        for book in books:
+            index.add_book(book)
+        return index
+
+    def _key(self, value):
+        # Searches ignore upper/lower case, same as titles
+        return value.lower() if isinstance(value, str) else value
+
+    def add_book(self, book):
+        key = self._key(getattr(book, self.field))
+        books = self._books.get(key)
+        if books is None:
+            books = self._books[key] = {}
+        elif book.id in books:
+            return False    # Already indexed
+
+        books[book.id] = book
+        self.size += 1
+        return True
+
+    def remove_book(self, book):
+        key = self._key(getattr(book, self.field))
+        books = self._books.get(key)
+        if books is None or books.pop(book.id, None) is None:
+            log_event("index_not_found", "Book {book_id} not in {field} index",
+                      book_id=book.id, field=self.field)
+            return False
+
+        # Don't keep empty entries for values no book has any more
+        if not books:
+            del self._books[key]
+        self.size -= 1
+        return True
+
+    def find(self, value):
+        # All books with this value (case-insensitive), in the order they were added
+        return list(self._books.get(self._key(value), {}).values())
+
+    def count(self, value):
+        # Number of books with this value, without building a list
+        return len(self._books.get(self._key(value), ()))
+
+    def values(self):
+        # Every value used by at least one book (lower case)
+        return list(self._books)
+
+
+# Books per block in the PriceIndex (a block is split in two when it reaches twice this)
+PRICE_BLOCK_SIZE = 1000
+
+
+class PriceIndex:
+    # Books sorted by (price, book_id), stored as a list of small sorted blocks
+    # One big sorted list would need list.insert/del on every add/edit/delete, which moves
+    # every entry after it (O(n) - about a millisecond per change at 1M books).
+    # With blocks only one block of at most 2 * PRICE_BLOCK_SIZE entries moves, so a change costs
+    # O(log n + block size) and is the same speed whatever the size of the catalogue.
+    def __init__(self):
+        # Three lists kept in the same order:
+        #   _blocks[i]      = sorted keys (price, book_id) - compared by bisect
+        #   _block_books[i] = the books, same order as the keys
+        #   _maxes[i]       = the last (biggest) key in block i, to find the right block by bisect
+        # book_id breaks ties so every key is unique and a book can be found exactly
+        self._blocks = []
+        self._block_books = []
+        self._maxes = []
+        self._size = 0
+
+    @classmethod
+    def from_books(cls, books):
+        # Build the index with one sort instead of one insert per book
+        index = cls()
+        pairs = sorted((((book.price, book.id), book) for book in books), key=lambda pair: pair[0])
+        for start in range(0, len(pairs), PRICE_BLOCK_SIZE):
+            block = pairs[start:start + PRICE_BLOCK_SIZE]
+            index._blocks.append([key for key, _ in block])
+            index._block_books.append([book for _, book in block])
+            index._maxes.append(block[-1][0])
+        index._size = len(pairs)
+        return index
+
+    @property
+    def size(self):
+        return self._size
+
+    def _locate(self, key):
+        # (block number, position in block) of the first key >= key
+        # (len(self._blocks), 0) if every key is smaller
+        block_number = bisect_left(self._maxes, key)
+        if block_number == len(self._blocks):
+            return block_number, 0
+        return block_number, bisect_left(self._blocks[block_number], key)
+
+    def add_book(self, book):
+        key = (book.price, book.id)
+        if not self._blocks:
+            self._blocks.append([key])
+            self._block_books.append([book])
+            self._maxes.append(key)
+            self._size = 1
+            return True
+
+        block_number, position = self._locate(key)
+        if block_number == len(self._blocks):
+            # Bigger than everything - goes on the end of the last block
+            block_number -= 1
+            position = len(self._blocks[block_number])
+        keys = self._blocks[block_number]
+        if position < len(keys) and keys[position] == key:
+            return False    # Already indexed
+
+        keys.insert(position, key)
+        self._block_books[block_number].insert(position, book)
+        self._maxes[block_number] = keys[-1]
+        self._size += 1
+
+        # Split a block that has grown too big, so inserts stay cheap
+        if len(keys) >= 2 * PRICE_BLOCK_SIZE:
+            books = self._block_books[block_number]
+            self._blocks[block_number:block_number + 1] = [keys[:PRICE_BLOCK_SIZE], keys[PRICE_BLOCK_SIZE:]]
+            self._block_books[block_number:block_number + 1] = [books[:PRICE_BLOCK_SIZE],
+                                                                books[PRICE_BLOCK_SIZE:]]
+            self._maxes[block_number:block_number + 1] = [keys[PRICE_BLOCK_SIZE - 1], keys[-1]]
+        return True
+
+    def remove_book(self, book):
+        key = (book.price, book.id)
+        block_number, position = self._locate(key)
+        if (block_number == len(self._blocks) or position == len(self._blocks[block_number])
+                or self._blocks[block_number][position] != key):
+            log_event("index_not_found", "Book {book_id} not in price index", book_id=book.id)
+            return False
+
+        keys = self._blocks[block_number]
+        del keys[position]
+        del self._block_books[block_number][position]
+        self._size -= 1
+
+        # Drop empty blocks so finding a block never lands on one
+        if keys:
+            self._maxes[block_number] = keys[-1]
+        else:
+            del self._blocks[block_number]
+            del self._block_books[block_number]
+            del self._maxes[block_number]
+        return True
+
+    def _bounds(self, min_price, max_price):
+        # (block, position) of the first book with price >= min_price and the first with price >= max_price
+        # (-inf as the book_id makes the search land before every book at exactly that price)
+        start = (0, 0) if min_price is None else self._locate((min_price, float("-inf")))
+        end = (len(self._blocks), 0) if max_price is None else self._locate((max_price, float("-inf")))
+        return start, max(start, end)
+
+    def range(self, min_price=None, max_price=None):
+        # Books with min_price <= price < max_price, cheapest first
+        # Leave either end as None to have no limit on that side
+        (block_number, position), (end_block, end_position) = self._bounds(min_price, max_price)
+        while block_number < end_block:
+            yield from islice(self._block_books[block_number], position, None)
+            block_number += 1
+            position = 0
+        if block_number < len(self._blocks):
+            yield from islice(self._block_books[block_number], position, end_position)
+
+    def count(self, min_price=None, max_price=None):
+        # Number of books in a price range (two binary searches plus the sizes of the blocks in between)
+        (block_number, position), (end_block, end_position) = self._bounds(min_price, max_price)
+        if block_number == end_block:
+            return end_position - position
+        total = len(self._blocks[block_number]) - position + end_position
+        for middle in range(block_number + 1, end_block):
+            total += len(self._blocks[middle])
+        return total
@@ -0,0 +1,183 @@
+from data_structures.debug_log import log_event
+from data_structures.persistent import PersistentHashMap, PersistentTree
+from data_structures.thread_safe_inventory import ThreadSafeInventory
+from models.book import Book
+
+
+# Inventory with instant read-only snapshots, for long reports that shouldn't hold up edits
+#
+#   inventory = SnapshotInventory.from_books(books)
+#   snapshot = inventory.snapshot()          # O(1) - just hands out the current version
+#   export_books(snapshot.iter_sorted(), "report.csv")
+#   # ... meanwhile other threads keep adding/editing/removing books in inventory,
+#   # but snapshot still shows the catalogue exactly as it was when it was taken
+#
+# Next to the normal structures it keeps a persistent title tree and ID map (data_structures.persistent).
+# Every change makes a new version of those by copying only the path to the change,
+# so an old snapshot shares almost everything with the current one and only costs memory
+# for what has changed since it was taken.
+#
+# For this to work a Book object must never change once a snapshot can see it,
+# so update() makes a new Book with the changes and swaps it into every structure
+# (the old object is left as it was). Look a book up again after updating it.
+
+
+class InventorySnapshot:
+    """
+    The catalogue at one moment in time - never changes, so it can be read from any thread without locks
+    Books can be looked up by ID or title, or listed in title order
+    """
+    __slots__ = ("_books", "_titles")
+
+    def __init__(self, books=None, titles=None):
+        self._books = books if books is not None else PersistentHashMap()     # book_id -> book
+        self._titles = titles if titles is not None else PersistentTree()     # title -> book
+
+    @classmethod
+    def from_sorted_books(cls, books):
+        # Build from books in title order (e.g. BinaryTree.iter_sorted())
+        books = list(books)
+        return cls(PersistentHashMap.from_items((book.id, book) for book in books),
+                   PersistentTree.from_sorted_books(books))
+
+    @property
+    def size(self):
+        return self._books.size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # Books in title order
+        return self._titles.iter_sorted()
+
+    def with_book(self, book):
+        # New snapshot with this book added
+        return InventorySnapshot(self._books.with_item(book.id, book), self._titles.with_book(book))
+
+    def without_book(self, book):
+        # New snapshot without this book
+        return InventorySnapshot(self._books.without(book.id), self._titles.without_title(book.title))
+
+    def get(self, book_id):
+        return self._books.get(book_id)
+
+    def get_by_title(self, title):
+        return self._titles.search_by_title(title)
+
+    def iter_sorted(self):
+        return self._titles.iter_sorted()
+
+    def range(self, start_title=None, end_title=None):
+        return self._titles.range(start_title, end_title)
+
+    def prefix(self, prefix):
+        return self._titles.prefix(prefix)
+
+    def select(self, position):
+        return self._titles.select(position)
+
+    def slice(self, start, stop=None):
+        return self._titles.slice(start, stop)
+
+    def display_all_sorted(self):
+        # Same output as BinaryTree.display_all_sorted
+        print(f"Books in alphabetical order ({self.size} total):")
+        print("-" * 50)
+        for book in self.iter_sorted():
+            print(f"  {book}")
+        print("-" * 50)
+
+
+class SnapshotInventory(ThreadSafeInventory):
+    def __init__(self, balanced=True):
+        super().__init__(balanced=balanced)
+        self._snapshot = InventorySnapshot()
+
+    @classmethod
+    def from_structures(cls, linked_list, hash_table, tree):
+        inventory = super().from_structures(linked_list, hash_table, tree)
+        inventory._snapshot = InventorySnapshot.from_sorted_books(tree.iter_sorted())
+        return inventory
+
+    @classmethod
+    def from_inventory(cls, inventory):
+        snapshot_inventory = super().from_inventory(inventory)
+        snapshot_inventory._snapshot = InventorySnapshot.from_sorted_books(snapshot_inventory.tree.iter_sorted())
+        return snapshot_inventory
+
+    def snapshot(self):
+        # The catalogue as it is right now - later changes never show up in it
+        # Each change replaces self._snapshot with a new version in one step, so this needs no lock
+        return self._snapshot
+
+    def replace_structures(self, other):
+        # The snapshot is built again from the new tree (one pass over the sorted titles)
+        with self.lock.write():
+            replaced = super().replace_structures(other)
+            if replaced:
+                self._snapshot = InventorySnapshot.from_sorted_books(self.tree.iter_sorted())
+            return replaced
+
+    def add(self, book):
+        with self.lock.write():
+            added = super().add(book)
+            if added:
+                self._snapshot = self._snapshot.with_book(book)
+            return added
+
+    def remove(self, book_id):
+        with self.lock.write():
+            book = self.hash_table.find_book(book_id)
+            removed = super().remove(book_id)
+            if removed:
+                self._snapshot = self._snapshot.without_book(book)
+            return removed
+
+    def update(self, book_id, **changes):
+        # Same as Inventory.update, except the book is replaced by a new Book object with the changes
+        # (snapshots taken before still have the old object, unchanged)
+        for field in changes:
+            if field not in self.EDITABLE_FIELDS:
+                raise ValueError(f"Cannot update field '{field}'")
+
+        with self.lock.write():
+            old_book = self.hash_table.find_book(book_id)
+            if old_book is None:
+                log_event("inventory_not_found", "Book ID {book_id} not found", book_id=book_id)
+                return False
+
+            values = {field: getattr(old_book, field) for field in self.EDITABLE_FIELDS}
+            values.update(changes)
+            new_book = Book(book_id, **values)
+
+            if (new_book.title.lower() != old_book.title.lower()
+                    and self.tree.search_by_title(new_book.title) is not None):
+                log_event("inventory_duplicate_title", "Book '{title}' already exists", title=new_book.title)
+                return False
+
+            # The linked list node stays where it is (keeps the book's place in the list), it just gets the new book
+            node = self.linked_list.get_node(book_id)
+
+            def put_in_list(book):
+                node.data = book
+                return True
+
+            # Every structure holds the book object itself, so the old one comes out of all of them
+            # and the new one goes in (rolled back if anything fails, same as Inventory)
+            steps = [self._index_remove_step(index, old_book) for _, index in self._all_indexes()]
+            steps += [
+                (lambda: self.tree.remove_book(old_book.title), lambda: self.tree.add_book(old_book)),
+                (lambda: self.hash_table.remove_book(book_id), lambda: self.hash_table.add_book(old_book)),
+                (lambda: self.tree.add_book(new_book), lambda: self.tree.remove_book(new_book.title)),
+                (lambda: self.hash_table.add_book(new_book), lambda: self.hash_table.remove_book(book_id)),
+                (lambda: put_in_list(new_book), lambda: put_in_list(old_book)),
+            ]
+            steps += [self._index_add_step(index, new_book) for _, index in self._all_indexes()]
+            updated = self._run_steps(steps)
+
+            if updated:
+                self._snapshot = self._snapshot.without_book(old_book).with_book(new_book)
+                log_event("inventory_update", "Updated book: {book}", book=new_book)
+                self._notify("update", new_book, changes)
+            return updated
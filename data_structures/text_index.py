@@ -0,0 +1,155 @@
+import heapq
+import math
+import re
+
+from data_structures.debug_log import log_event
+
+
+# Inverted index for searching words anywhere in a book's title, author or genre
+# Each word points to the books that contain it:
+#   "gatsby" -> {23456: 3}
+#   "farm"   -> {67890: 3}
+# so "farm" finds Animal Farm straight away instead of checking every title.
+#
+# Results are ranked: words in the title count more than words in the author or genre,
+# and rare words count more than common ones (e.g. "gatsby" matters more than "the").
+#
+# The words are read from the book when it is removed, so (like the other indexes)
+# a book must be removed BEFORE its title, author or genre is changed.
+
+# How much a match in each field is worth
+FIELD_WEIGHTS = (("title", 3), ("author", 2), ("genre", 1))
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenise(text):
+    # Split text into lower case words, e.g. "The Great Gatsby" -> ["the", "great", "gatsby"]
+    return _WORD_PATTERN.findall(text.lower())
+
+
+class TextIndex:
+    def __init__(self):
+        self._postings = {}     # word -> {book_id: weight}
+        self._books = {}        # book_id -> book
+
+    @classmethod
+    def from_books(cls, books):
+        # Build an index from many books in one go
+        # Same as add_book for each book, but with everything looked up once outside the loop
+        # (this runs once per book for the whole catalogue, so it is worth it)
+        index = cls()
+        postings_for = index._postings
+        all_books = index._books
+        book_weights = index._book_weights
+
+        for book in books:
+            book_id = book.id
+            if book_id in all_books:
+                continue
+            all_books[book_id] = book
+
+            for word, weight in book_weights(book).items():
+                postings = postings_for.get(word)
+                if postings is None:
+                    postings_for[word] = {book_id: weight}
+                else:
+                    postings[book_id] = weight
+        return index
+
+    @property
+    def size(self):
+        return len(self._books)
+
+    def _book_weights(self, book):
+        # word -> weight for one book (a word in several fields adds up)
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS:
+            for word in _WORD_PATTERN.findall(getattr(book, field).lower()):
+                weights[word] = weights.get(word, 0) + field_weight
+        return weights
+
+    def add_book(self, book):
+        if book.id in self._books:
+            return False    # Already indexed
+
+        weights = self._book_weights(book)
+        for word, weight in weights.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+            postings[book.id] = weight
+
+        self._books[book.id] = book
+        return True
+
+    def remove_book(self, book):
+        if book.id not in self._books:
+            log_event("index_not_found", "Book {book_id} not in text index", book_id=book.id)
+            return False
+
+        for word in self._book_weights(book):
+            postings = self._postings.get(word)
+            if postings is not None:
+                postings.pop(book.id, None)
+                if not postings:
+                    del self._postings[word]    # No book uses this word any more
+
+        del self._books[book.id]
+        return True
+
+    def search(self, query, match_all=True, limit=None):
+        """
+        Books containing the words in query, best matches first
+        match_all=True  - every word must be in the book (AND)
+        match_all=False - any of the words is enough (OR)
+        """
+        words = list(dict.fromkeys(tokenise(query)))    # Remove repeated words, keep order
+        if not words:
+            return []
+
+        word_postings = [self._postings.get(word, {}) for word in words]
+
+        if match_all:
+            # Start from the rarest word (fewest books) and keep only books that have every other word
+            word_postings.sort(key=len)
+            if not word_postings[0]:
+                return []
+            if len(word_postings) == 1:
+                candidates = word_postings[0]   # One word - every book with it matches, nothing to check
+            else:
+                candidates = [book_id for book_id in word_postings[0]
+                              if all(book_id in postings for postings in word_postings[1:])]
+
+        # Score = sum of (field weight x rarity) for each matching word
+        # Rarity (inverse document frequency) is high for words found in only a few books
+        total_books = len(self._books)
+        scores = {}
+        for postings in word_postings:
+            if not postings:
+                continue
+            rarity = math.log(1 + total_books / len(postings))
+            if match_all:
+                # Every candidate has every word, so no need to check
+                for book_id in candidates:
+                    scores[book_id] = scores.get(book_id, 0.0) + postings[book_id] * rarity
+            else:
+                # Any word is enough, so every book with this word is a candidate
+                for book_id, weight in postings.items():
+                    scores[book_id] = scores.get(book_id, 0.0) + weight * rarity
+
+        # Highest score first, then alphabetical by title
+        def rank(book_id):
+            return (-scores[book_id], self._books[book_id].title.lower())
+
+        if limit is None:
+            ranked = sorted(scores, key=rank)
+        else:
+            # With a limit only the best few are picked out (heap) instead of sorting every match,
+            # and only books scoring at least as well as the limit-th best need their titles compared
+            shortlist = scores
+            if len(scores) > limit > 0:
+                cutoff = heapq.nlargest(limit, scores.values())[-1]
+                shortlist = [book_id for book_id, score in scores.items() if score >= cutoff]
+            ranked = heapq.nsmallest(limit, shortlist, key=rank)
+        return [self._books[book_id] for book_id in ranked]
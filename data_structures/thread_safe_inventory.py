@@ -0,0 +1,197 @@
+import threading
+
+from data_structures.inventory import Inventory
+from data_structures.rw_lock import ReadWriteLock
+
+
+# Inventory that several threads can use at once (e.g. a server, or an import running in the background)
+# The plain Inventory has no locking, so two threads changing it at the same time - or one thread
+# deleting a book while another walks the list - can leave the structures broken.
+#
+# Every method takes a reader-writer lock: lookups and searches run side by side,
+# and an add/update/remove waits until they finish and then runs on its own.
+#
+#   inventory = ThreadSafeInventory.from_books(books)
+#   inventory = ThreadSafeInventory.from_inventory(store.open())   # same books, now with locking
+#
+# Loops (iter, range, prefix, slice) never hand out the live structures:
+#   - range/prefix/slice collect CHUNK_SIZE books at a time under the lock, then carry on
+#     after the last title seen, so a change between chunks can't break the loop
+#   - looping over the inventory, by_price and the other lists are copied under the lock
+# The structures themselves (linked_list, tree, ...) are still there to read,
+# but only use them directly while holding inventory.lock.read().
+# The books handed out are the real Book objects, so update() still changes them in place.
+
+# Books collected each time the lock is taken while looping through titles
+CHUNK_SIZE = 256
+
+
+class ThreadSafeInventory(Inventory):
+    def __init__(self, balanced=True):
+        super().__init__(balanced=balanced)
+        self.lock = ReadWriteLock()
+
+        # Only one thread builds a search index the first time it is needed
+        # (searches only hold the read lock, so two of them could try at the same time)
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def from_inventory(cls, inventory):
+        # Take over the structures of a plain inventory (e.g. one loaded by CatalogueStore.open())
+        # Its listeners (e.g. the change log) keep working - don't use the old object after this
+        safe_inventory = cls(balanced=inventory.tree.balanced)
+        for name, value in vars(inventory).items():
+            setattr(safe_inventory, name, value)
+        return safe_inventory
+
+    # ---- Building the search indexes ----
+
+    @property
+    def text_index(self):
+        if self._text_index is None:
+            with self._build_lock:
+                return super().text_index   # Builds it unless another thread just did
+        return self._text_index
+
+    @property
+    def fuzzy_index(self):
+        if self._fuzzy_index is None:
+            with self._build_lock:
+                return super().fuzzy_index
+        return self._fuzzy_index
+
+    # ---- Reading ----
+
+    def __iter__(self):
+        # Copy of the book list, so books can be added or removed while the caller loops
+        with self.lock.read():
+            books = list(super().__iter__())
+        return iter(books)
+
+    def add_listener(self, listener):
+        with self.lock.write():
+            super().add_listener(listener)
+
+    def remove_listener(self, listener):
+        with self.lock.write():
+            super().remove_listener(listener)
+
+    def get(self, book_id):
+        with self.lock.read():
+            return super().get(book_id)
+
+    def get_by_title(self, title):
+        with self.lock.read():
+            return super().get_by_title(title)
+
+    def books_after(self, book_id=None, count=None):
+        with self.lock.read():
+            return super().books_after(book_id, count)
+
+    def _titles_from(self, start_title, keep, count=None):
+        """
+        Generator of books in alphabetical order from start_title, while keep(book) is True
+        (and at most count books). The lock is taken once per chunk, and each chunk carries on
+        after the last title of the one before - titles are unique, so nothing is missed or repeated
+        """
+        after = None    # Title (lower case) of the last book handed out
+        while count is None or count > 0:
+            size = CHUNK_SIZE if count is None else min(CHUNK_SIZE, count)
+            books = []
+            finished = False
+            with self.lock.read():
+                for book in self.tree.range(after if after is not None else start_title):
+                    if book.title.lower() == after:
+                        continue    # Already handed out at the end of the last chunk
+                    if not keep(book):
+                        finished = True
+                        break
+                    books.append(book)
+                    if len(books) == size:
+                        break
+                else:
+                    finished = True     # Reached the end of the tree
+                if books:
+                    after = books[-1].title.lower()
+
+            yield from books
+            if finished:
+                return
+            if count is not None:
+                count -= len(books)
+
+    def range(self, start_title=None, end_title=None):
+        end = end_title.lower() if end_title is not None else None
+        return self._titles_from(start_title, lambda book: end is None or book.title.lower() < end)
+
+    def prefix(self, prefix):
+        search_prefix = prefix.lower()
+        return self._titles_from(prefix, lambda book: book.title.lower().startswith(search_prefix))
+
+    def slice(self, start, stop=None):
+        # The position is found once (when the loop starts), then it carries on by title
+        if start < 0 or (stop is not None and stop <= start):
+            return iter(())
+        with self.lock.read():
+            first = self.tree.select(start)
+            first_title = first.title if first is not None else None
+        if first_title is None:
+            return iter(())
+        count = None if stop is None else stop - start
+        return self._titles_from(first_title, lambda book: True, count)
+
+    def nearest(self, title):
+        with self.lock.read():
+            return super().nearest(title)
+
+    def select(self, position):
+        with self.lock.read():
+            return super().select(position)
+
+    def rank(self, title):
+        with self.lock.read():
+            return super().rank(title)
+
+    def by_author(self, author):
+        with self.lock.read():
+            return super().by_author(author)
+
+    def by_genre(self, genre):
+        with self.lock.read():
+            return super().by_genre(genre)
+
+    def by_price(self, min_price=None, max_price=None):
+        with self.lock.read():
+            return list(super().by_price(min_price, max_price))
+
+    def search(self, query, match_all=True, limit=None):
+        with self.lock.read():
+            return super().search(query, match_all=match_all, limit=limit)
+
+    def fuzzy_search(self, title, limit=5, max_distance=None):
+        with self.lock.read():
+            return super().fuzzy_search(title, limit=limit, max_distance=max_distance)
+
+    def find(self, author=None, genre=None, min_price=None, max_price=None):
+        with self.lock.read():
+            return super().find(author=author, genre=genre, min_price=min_price, max_price=max_price)
+
+    # ---- Changing ----
+    # Listeners (e.g. the change log) are called while the write lock is still held,
+    # so changes reach them in the same order they happened
+
+    def replace_structures(self, other):
+        with self.lock.write():
+            return super().replace_structures(other)
+
+    def add(self, book):
+        with self.lock.write():
+            return super().add(book)
+
+    def update(self, book_id, **changes):
+        with self.lock.write():
+            return super().update(book_id, **changes)
+
+    def remove(self, book_id):
+        with self.lock.write():
+            return super().remove(book_id)
@@ -3,31 +3,32 @@ from models.book import Book
 from data_structures.linked_list import DoubleLinkedList
 from data_structures.hash_table import HashTable
 from data_structures.binary_tree import BinaryTree
+from data_structures import set_verbose
 
 # Main function 
 def main():
-    # Initialize data structures
-    inventory = DoubleLinkedList()
-    quick_lookup = HashTable()  # Including Hash Table
-    tree_lookup = BinaryTree()  # Including Binary Tree
-    
+    # Show the debug messages from the data structures (they are silent by default)
+    set_verbose(True)
+
     # Test with sample books
     book1 = Book(12345, "Harry Potter", "J.K. Rowling", "Fantasy", 29.99)
     book2 = Book(67890, "Animal Farm", "George Orwell", "Fiction", 19.99)
     book3 = Book(23456, "The Great Gatsby", "F. Scott Fitzgerald", "Historical Fiction", 24.99)
+    sample_books = [book1, book2, book3]
     
     # Print header
     print("Bookstore Inventory")
     print("=" * 30)
     
+    # Initialize data structures using the bulk loaders (one pass each instead of one add per book)
+    inventory = DoubleLinkedList.from_books(sample_books)
+    quick_lookup = HashTable.from_books(sample_books)  # Including Hash Table
+    tree_lookup = BinaryTree.from_books(sample_books)  # Including Binary Tree (built balanced from sorted titles)
+    
     # TESTING BINARY TREE OUTPUT
     print("\n" + "=" * 30)
     print("Testing Binary Tree:")
     print("=" * 30)
-
-    tree_lookup.add_book(book1) # Harry Potter Becomes Root
-    tree_lookup.add_book(book2) # Animal Farm added to left of HP (Alphabetical order)
-    tree_lookup.add_book(book3) # The Great Gatsby goes right of HP (Alphabetical order)
     
     # Display hash table contents
     tree_lookup.display_all_sorted()
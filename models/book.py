@@ -1,16 +1,30 @@
 class Book:
+    # __slots__ tells Python exactly which properties a book has
+    # Without it every book carries its own dictionary (__dict__), which uses a lot of memory
+    # when there are millions of books. With __slots__ the values are stored in fixed spots instead.
+    __slots__ = ("book_id", "title", "author", "genre", "price", "in_stock", "image_path")
+
     # __init__ is the constructor - runs when we create a new book
     # self refers to the specific book object being created
     def __init__(self, book_id, title, author, genre, price, in_stock=True, image_path=None):
         # Store the data passed in as properties of this book object
         self.book_id = book_id      # Unique identifier
-        self.id = book_id           # Keep both for compatibility
         self.title = title
         self.author = author
         self.genre = genre
         self.price = price
         self.in_stock = in_stock    #defaults to True
         self.image_path = image_path  # Optional path to cover image file
+
+    # id is another name for book_id (kept for compatibility)
+    # It used to be stored twice - now it just reads book_id, so it can never get out of sync
+    @property
+    def id(self):
+        return self.book_id
+
+    @id.setter
+    def id(self, value):
+        self.book_id = value
     
     # __str__ defines what happens when we print() a book object
     def __str__(self):
@@ -19,4 +33,4 @@ class Book:
     
     # __repr__ is similar to __str__ but for debugging/development
     def __repr__(self):
-        return self.__str__()  # Just use the same format as __str__
\ No newline at end of file
+        return self.__str__()  # Just use the same format as __str__
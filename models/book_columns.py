@@ -0,0 +1,166 @@
+# Columnar (column-by-column) storage for very large catalogues
+# Instead of one Book object per book, each property is kept in its own array:
+#   ids    = [12345, 67890, ...]
+#   prices = [29.99, 19.99, ...]
+# Numbers go in compact array.array columns (8 bytes each instead of a full Python object),
+# and authors/genres are stored once and referred to by a small number (code).
+# BookView objects look like a Book but just point at a row in the columns.
+
+from array import array
+
+from models.book import Book
+
+
+class BookView:
+    # A lightweight stand-in for a Book - only stores which store and row it belongs to
+    # It has the same properties as Book, so it can go into the HashTable, BinaryTree, etc.
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    @property
+    def book_id(self):
+        return self._store.ids[self._row]
+
+    @property
+    def id(self):
+        return self._store.ids[self._row]
+
+    @property
+    def title(self):
+        return self._store.titles[self._row]
+
+    @title.setter
+    def title(self, value):
+        self._store.titles[self._row] = value
+
+    @property
+    def author(self):
+        return self._store.authors.value(self._row)
+
+    @author.setter
+    def author(self, value):
+        self._store.authors.set(self._row, value)
+
+    @property
+    def genre(self):
+        return self._store.genres.value(self._row)
+
+    @genre.setter
+    def genre(self, value):
+        self._store.genres.set(self._row, value)
+
+    @property
+    def price(self):
+        return self._store.prices[self._row]
+
+    @price.setter
+    def price(self, value):
+        self._store.prices[self._row] = value
+
+    @property
+    def in_stock(self):
+        return bool(self._store.in_stock[self._row])
+
+    @in_stock.setter
+    def in_stock(self, value):
+        self._store.in_stock[self._row] = 1 if value else 0
+
+    @property
+    def image_path(self):
+        return self._store.image_paths.get(self._row)
+
+    @image_path.setter
+    def image_path(self, value):
+        if value:
+            self._store.image_paths[self._row] = value
+        else:
+            self._store.image_paths.pop(self._row, None)
+
+    def to_book(self):
+        # Make a normal (independent) Book object with a copy of this row's values
+        return Book(self.book_id, self.title, self.author, self.genre, self.price,
+                    in_stock=self.in_stock, image_path=self.image_path)
+
+    # Print the same way as a Book
+    def __str__(self):
+        return f"ID: {self.id}, Title: {self.title}, Author: {self.author}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _CodedColumn:
+    # A column of repeated strings (like genre) stored as numbers
+    # "Fantasy" is saved once in values, and each row just stores its position (code)
+    def __init__(self, typecode):
+        self.values = []            # code -> string
+        self._codes = {}            # string -> code
+        self.rows = array(typecode) # one code per row
+
+    def _code_for(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def append(self, value):
+        self.rows.append(self._code_for(value))
+
+    def value(self, row):
+        return self.values[self.rows[row]]
+
+    def set(self, row, value):
+        self.rows[row] = self._code_for(value)
+
+
+class BookColumns:
+    # Stores many books as parallel arrays - row i of every column is the same book
+    def __init__(self):
+        self.ids = array("q")               # 64-bit whole numbers
+        self.titles = []                    # Titles are mostly unique, so a plain list
+        self.authors = _CodedColumn("I")    # Up to 4 billion different authors
+        self.genres = _CodedColumn("H")     # Up to 65,535 different genres
+        self.prices = array("d")            # 64-bit decimal numbers
+        self.in_stock = bytearray()         # 1 byte per book (1 = in stock)
+        self.image_paths = {}               # row -> path, only for books that have a cover
+
+    @classmethod
+    def from_books(cls, books):
+        # Build the columns from any books (Book objects or anything with the same properties)
+        store = cls()
+        for book in books:
+            store.append(book.book_id, book.title, book.author, book.genre, book.price,
+                         in_stock=book.in_stock, image_path=book.image_path)
+        return store
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        # Loop over a view of every row
+        for row in range(len(self.ids)):
+            yield BookView(self, row)
+
+    def append(self, book_id, title, author, genre, price, in_stock=True, image_path=None):
+        # Add one book to the end of every column and return a view of it
+        row = len(self.ids)
+        self.ids.append(book_id)
+        self.titles.append(title)
+        self.authors.append(author)
+        self.genres.append(genre)
+        self.prices.append(price)
+        self.in_stock.append(1 if in_stock else 0)
+        if image_path:
+            self.image_paths[row] = image_path
+        return BookView(self, row)
+
+    def view(self, row):
+        # Get a Book-like view of one row
+        if row < 0 or row >= len(self.ids):
+            raise IndexError(f"Row {row} out of range")
+        return BookView(self, row)
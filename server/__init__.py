@@ -0,0 +1 @@
+# Server package - the catalogue over HTTP for the web frontend
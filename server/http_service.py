@@ -0,0 +1,351 @@
+# HTTP/JSON service over the catalogue, for the web frontend
+# Uses only the standard library (asyncio), so it runs anywhere the GUI does.
+#
+#   GET    /books/12345                       one book (hash table)
+#   GET    /books?limit=50&after=12345        books in the order they were added, 50 after book 12345
+#   GET    /books?sort=title&offset=100       books in alphabetical order, from position 100 (tree)
+#   GET    /search?q=orwell+farm&limit=20     word search over title, author and genre (q=a+or+b for ANY word)
+#   GET    /search?title=harry                titles starting with "harry"
+#   POST   /books                             add a book (JSON body, same fields as a CSV import)
+#   PATCH  /books/12345                       change some fields (JSON body), PUT works too
+#   DELETE /books/12345                       delete a book
+#
+# Connections are kept open between requests (keep-alive), and a client may send several
+# requests without waiting for the answers (pipelining) - they are answered in order.
+# Everything runs on one thread (the event loop), so requests never change the inventory at the same time.
+#
+# Run from the project folder (close the GUI first - it has the catalogue open):
+#   python -m server.http_service --port 8080
+
+import argparse
+import asyncio
+from http import HTTPStatus
+import json
+import os
+import signal
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+from storage.book_io import book_from_row
+from storage.catalogue_store import CatalogueStore
+from storage.change_log import book_to_dict
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookstore.catalogue")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+MAX_HEADER_BYTES = 64 * 1024        # Request line + headers
+MAX_BODY_BYTES = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15             # Seconds an idle connection is kept open
+
+
+class RequestError(Exception):
+    # A request that can't be answered normally - becomes an error response with this status
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BookstoreService:
+    """
+    Works out the answer to each request - knows nothing about sockets, so it can be called directly
+    handle() returns (status, data) where data is turned into JSON (None = no body)
+    """
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+
+    def handle(self, method, target, body=b""):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            if parts == ["books"]:
+                if method == "GET":
+                    return self.list_books(query)
+                if method == "POST":
+                    return self.add_book(self._read_json(body))
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on /books")
+
+            if len(parts) == 2 and parts[0] == "books":
+                book_id = self._int(parts[1], "book ID")
+                if method == "GET":
+                    return self.get_book(book_id)
+                if method in ("PUT", "PATCH"):
+                    return self.update_book(book_id, self._read_json(body))
+                if method == "DELETE":
+                    return self.delete_book(book_id)
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on a book")
+
+            if parts == ["search"]:
+                if method != "GET":
+                    raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on /search")
+                return self.search(query)
+
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such page: {url.path}")
+
+        except RequestError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            # A bug, or e.g. the change log failing to write - answer this request with an error
+            # (instead of dropping the connection and any requests pipelined behind it)
+            print(f"[ERROR] {method} {target} failed: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+    def _int(self, text, name, minimum=None):
+        try:
+            value = int(text)
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a whole number") from None
+        if minimum is not None and value < minimum:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be at least {minimum}")
+        return value
+
+    def _read_json(self, body):
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return data
+
+    def _limit(self, query):
+        limit = self._int(query.get("limit", DEFAULT_PAGE_SIZE), "limit", minimum=1)
+        return min(limit, MAX_PAGE_SIZE)
+
+    def get_book(self, book_id):
+        book = self.inventory.get(book_id)
+        if book is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No book with ID {book_id}")
+        return HTTPStatus.OK, book_to_dict(book)
+
+    def list_books(self, query):
+        """
+        One page of books
+        sort=title: alphabetical, starting at position offset (tree, O(log n) to find the page)
+        otherwise: order added, starting after book ID after (linked list, no counting from the start)
+        """
+        limit = self._limit(query)
+        data = {"total": self.inventory.size}
+
+        if query.get("sort", "added") == "title":
+            offset = self._int(query.get("offset", 0), "offset", minimum=0)
+            books = list(self.inventory.slice(offset, offset + limit))
+            data["next_offset"] = offset + limit if offset + limit < self.inventory.size else None
+
+        elif query.get("sort", "added") == "added":
+            after = self._int(query["after"], "after") if "after" in query else None
+            # One extra book shows whether there is another page
+            books = self.inventory.books_after(after, limit + 1)
+            if books is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"No book with ID {after}")
+            data["next_after"] = books[limit - 1].id if len(books) > limit else None
+            books = books[:limit]
+
+        else:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "sort must be 'added' or 'title'")
+
+        data["books"] = [book_to_dict(book) for book in books]
+        return HTTPStatus.OK, data
+
+    def search(self, query):
+        limit = self._limit(query)
+        if query.get("title"):
+            books = []
+            for book in self.inventory.prefix(query["title"]):
+                books.append(book)
+                if len(books) == limit:
+                    break
+        elif query.get("q"):
+            # Same rule as the GUI search box: "or" between words finds books with ANY of them
+            words = query["q"].split()
+            match_all = "or" not in (word.lower() for word in words)
+            text = " ".join(word for word in words if word.lower() != "or")
+            books = self.inventory.search(text, match_all=match_all, limit=limit)
+        else:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Give q (words) or title (start of a title)")
+        return HTTPStatus.OK, {"books": [book_to_dict(book) for book in books]}
+
+    def add_book(self, data):
+        try:
+            book = book_from_row(data)
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+        if not self.inventory.add(book):
+            raise RequestError(HTTPStatus.CONFLICT, "A book with that ID or title already exists")
+        return HTTPStatus.CREATED, book_to_dict(book)
+
+    def update_book(self, book_id, data):
+        book = self.inventory.get(book_id)
+        if book is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No book with ID {book_id}")
+        if "book_id" in data and str(data["book_id"]) != str(book_id):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The book ID can't be changed")
+
+        unknown = set(data) - set(self.inventory.EDITABLE_FIELDS) - {"book_id"}
+        if unknown:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        # Check the book as it would be after the change, then only pass on the fields that were sent
+        try:
+            edited = book_from_row({**book_to_dict(book), **data})
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e)) from None
+        changes = {field: getattr(edited, field) for field in data if field != "book_id"}
+
+        if not self.inventory.update(book_id, **changes):
+            raise RequestError(HTTPStatus.CONFLICT, "Another book already has that title")
+        # Look the book up again - a SnapshotInventory replaces the Book object instead of changing it
+        return HTTPStatus.OK, book_to_dict(self.inventory.get(book_id))
+
+    def delete_book(self, book_id):
+        if not self.inventory.remove(book_id):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No book with ID {book_id}")
+        return HTTPStatus.NO_CONTENT, None
+
+
+def _response(status, data, keep_alive):
+    # Bytes for one HTTP response
+    status = HTTPStatus(status)
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+    body = b""
+    if data is not None:
+        body = json.dumps(data).encode("utf-8")
+        head += "Content-Type: application/json\r\n"
+    head += f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+async def _read_request(reader):
+    """
+    Read one request from the connection
+    Returns (method, target, version, headers, body), or None if the client closed the connection
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Connection closed in the middle of a request") from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers are too long") from None
+
+    lines = head.decode("latin-1").split("\r\n")
+    request_line = lines[0].split()
+    if len(request_line) != 3 or not request_line[2].startswith("HTTP/1."):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Bad request line")
+    method, target, version = request_line
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise RequestError(HTTPStatus.NOT_IMPLEMENTED, "Send a Content-Length instead of Transfer-Encoding")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Bad Content-Length") from None
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too big")
+
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version, headers, body
+
+
+async def serve_connection(service, reader, writer):
+    """
+    Answer requests on one connection until the client closes it (or asks to close it)
+    Pipelined requests are already waiting in the reader, so each is read and answered in turn
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as e:
+                # The rest of the connection can't be trusted after a broken request
+                writer.write(_response(e.status, {"error": e.message}, keep_alive=False))
+                break
+            if request is None:
+                break
+
+            method, target, version, headers, body = request
+            connection = headers.get("connection", "").lower()
+            if version == "HTTP/1.0":
+                keep_alive = connection == "keep-alive"
+            else:
+                keep_alive = connection != "close"
+
+            status, data = service.handle(method, target, body)
+            writer.write(_response(status, data, keep_alive))
+            # drain() only waits if the client isn't reading its answers fast enough
+            await writer.drain()
+            if not keep_alive:
+                break
+
+    except (asyncio.TimeoutError, ConnectionError):
+        pass    # Idle for too long, or the client went away
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def run_server(service, host="127.0.0.1", port=8080, ready=None):
+    """
+    Serve until cancelled
+    ready (optional) is called with the port number once the server is listening
+    """
+    server = await asyncio.start_server(lambda reader, writer: serve_connection(service, reader, writer),
+                                        host, port, limit=MAX_HEADER_BYTES)
+    port = server.sockets[0].getsockname()[1]
+    print(f"[SERVER] Listening on http://{host}:{port} ({service.inventory.size:,} books)")
+    if ready is not None:
+        ready(port)
+
+    # A kill (e.g. from a service manager) stops the server like Ctrl+C does, so the catalogue still gets saved
+    # (not available on Windows, where only Ctrl+C works)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the catalogue over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 = any free port")
+    parser.add_argument("--catalogue", default=CATALOGUE_PATH, help="catalogue snapshot file")
+    args = parser.parse_args(argv)
+
+    # Every change is written to the change log as it happens; a fresh snapshot is saved on the way out
+    store = CatalogueStore(args.catalogue)
+    inventory = store.open()
+
+    # Build the word search index now, instead of making the first search wait for it
+    inventory.text_index
+
+    try:
+        asyncio.run(run_server(BookstoreService(inventory), args.host, args.port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass    # Ctrl+C or a kill - save and stop
+    finally:
+        store.save(inventory)
+        store.close()
+        print(f"[SAVE] Catalogue saved: {inventory.size} books")
+
+
+if __name__ == "__main__":
+    main()
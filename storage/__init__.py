@@ -0,0 +1 @@
+# Storage package - saving and loading the catalogue to/from disk
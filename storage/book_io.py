@@ -0,0 +1,411 @@
+# Import and export books as CSV or JSON Lines files
+# Files are read and written one row at a time (generators), so a file of any size
+# can be imported or exported without ever holding the whole file in memory.
+#
+#   books = read_books("supplier_feed.csv")             # generator of Book objects
+#   inventory, report = import_books("supplier_feed.csv")
+#   report = export_books(inventory, "catalogue.jsonl")
+#
+# Command line (run from the project folder, with the GUI closed):
+#   python -m storage.book_io import supplier_feed.csv
+#   python -m storage.book_io import supplier_feed.csv --workers 8     (read on 8 processes)
+#   python -m storage.book_io export catalogue.csv --sorted
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import islice
+import json
+import os
+import time
+
+from data_structures.inventory import Inventory
+from models.book import Book
+from storage.catalogue_store import CatalogueStore
+from storage.change_log import book_to_dict
+
+# Column order for CSV files (same names as book_to_dict)
+FIELDS = ("book_id", "title", "author", "genre", "price", "in_stock", "image_path")
+
+# Words accepted for in_stock
+TRUE_WORDS = {"true", "yes", "y", "1"}
+FALSE_WORDS = {"false", "no", "n", "0"}
+
+# Only the first few bad rows are kept for the report (a broken file could have millions)
+MAX_ERRORS_KEPT = 100
+
+# Parallel imports cut a file into pieces of about this size (never smaller)
+# Small enough that only a few pieces' books are held in memory at once,
+# big enough that handing a piece to a worker process costs little next to reading it
+MIN_SHARD_BYTES = 4 * 1024 * 1024
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bookstore.catalogue")
+
+
+def file_format(path):
+    # "csv" or "jsonl" from the file extension
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Unknown file type '{extension}' - use .csv or .jsonl")
+
+
+class TransferReport:
+    # Counts and timing for one import or export
+    def __init__(self):
+        self.rows = 0           # Rows read (import) or written (export)
+        self.rejected = 0       # Rows that failed validation
+        self.duplicates = 0     # Valid books skipped because their ID or title was already used
+        self.errors = []        # (row number, message) for the first MAX_ERRORS_KEPT bad rows
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def reject(self, row_number, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append((row_number, message))
+
+    def merge(self, other, line_offset=0):
+        # Add the counts from a report for one piece of the file
+        # line_offset = number of lines before that piece, so its row numbers point at the whole file
+        self.rows += other.rows
+        self.rejected += other.rejected
+        self.duplicates += other.duplicates
+        room = MAX_ERRORS_KEPT - len(self.errors)
+        self.errors.extend((row_number + line_offset, message) for row_number, message in other.errors[:room])
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return end - self.start_time
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.rows:,} rows in {self.elapsed:.2f} s ({self.rows_per_second:,.0f} rows/s), "
+                f"{self.rejected:,} rejected, {self.duplicates:,} duplicates")
+
+
+def book_from_row(row):
+    """
+    Check one row (a dictionary of strings or JSON values) and make a Book from it
+    Raises ValueError with a message saying what is wrong
+    """
+    def text(field, required=True):
+        value = row.get(field)
+        value = "" if value is None else str(value).strip()
+        if required and not value:
+            raise ValueError(f"{field} is missing")
+        return value
+
+    try:
+        book_id = int(text("book_id"))
+    except ValueError:
+        raise ValueError(f"book_id must be a whole number, not '{row.get('book_id')}'") from None
+    if book_id <= 0:
+        raise ValueError("book_id must be positive")
+
+    try:
+        price = float(text("price"))
+    except ValueError:
+        raise ValueError("price must be a number") from None
+    if not price >= 0:     # Also catches NaN
+        raise ValueError("price can't be negative")
+
+    in_stock = row.get("in_stock", True)
+    if not isinstance(in_stock, bool):
+        word = text("in_stock", required=False).lower()
+        if word in TRUE_WORDS or word == "":
+            in_stock = True
+        elif word in FALSE_WORDS:
+            in_stock = False
+        else:
+            raise ValueError(f"in_stock must be true or false, not '{word}'")
+
+    return Book(book_id, text("title"), text("author"), text("genre"), price,
+                in_stock=in_stock, image_path=text("image_path", required=False) or None)
+
+
+def _lines(file, end):
+    # Lines of a file opened in binary mode, from where it is now up to byte position end
+    # (every line starting before end is included, so a shard always ends on a whole line)
+    position = file.tell()
+    for line in file:
+        if position >= end:
+            return
+        position += len(line)
+        yield line.decode("utf-8")
+
+
+def _rows_from_lines(lines, file_type, fieldnames=None, first_line=1):
+    """
+    Generator of (row number, row dictionary) from lines of a CSV or JSON Lines file
+    Lines that aren't a JSON object are passed on as None (they fail validation)
+    first_line is the line number of the first line, so errors point at the right place in the file
+    """
+    if file_type == "csv":
+        # Without fieldnames the first line is the header
+        reader = csv.DictReader(lines, fieldnames=fieldnames)
+        for row in reader:
+            # line_num counts lines read so far (a quoted value can span lines)
+            yield first_line + reader.line_num - 1, row
+    else:
+        for row_number, line in enumerate(lines, first_line):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row_number, row if isinstance(row, dict) else None
+
+
+def read_rows(path, file_type=None):
+    """
+    Generator of (row number, row dictionary) from a CSV or JSON Lines file
+    """
+    file_type = file_type or file_format(path)
+    with open(path, newline="", encoding="utf-8") as file:
+        yield from _rows_from_lines(file, file_type)
+
+
+def _books_from_rows(rows, report):
+    # Valid books from (row number, row) pairs - bad rows are counted in report and skipped
+    for row_number, row in rows:
+        report.rows += 1
+        if row is None:
+            report.reject(row_number, "not a JSON object")
+            continue
+        try:
+            yield book_from_row(row)
+        except ValueError as e:
+            report.reject(row_number, str(e))
+
+
+def read_books(path, report=None, file_type=None):
+    """
+    Generator of valid Book objects from a file
+    Bad rows are skipped and counted in report (if given)
+    """
+    report = report if report is not None else TransferReport()
+    yield from _books_from_rows(read_rows(path, file_type), report)
+    report.finish()
+
+
+def chunks(items, size):
+    # Generator of lists of up to size items, e.g. to add books 10,000 at a time
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def file_shards(path, shard_count, start=0):
+    """
+    Split a file (from byte position start) into up to shard_count byte ranges [start, end)
+    Every range begins at the start of a line
+    """
+    size = os.path.getsize(path)
+    shard_count = max(1, min(shard_count, (size - start) // MIN_SHARD_BYTES))
+
+    bounds = [start]
+    with open(path, "rb") as file:
+        for i in range(1, shard_count):
+            # Jump to roughly the right place, then on to the start of the next line
+            file.seek(start + (size - start) * i // shard_count - 1)
+            file.readline()
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _read_shard(path, file_type, fieldnames, start, end):
+    """
+    Runs in a worker process: read and check the rows in one byte range of the file
+    Returns (book tuples, report, number of lines in the range)
+    Books are sent back as tuples - pickling tuples is several times faster than pickling Book objects
+    """
+    report = TransferReport()
+    line_count = 0
+
+    def counted(lines):
+        nonlocal line_count
+        for line in lines:
+            line_count += 1
+            yield line
+
+    with open(path, "rb") as file:
+        file.seek(start)
+        rows = _rows_from_lines(counted(_lines(file, end)), file_type, fieldnames)
+        books = [(book.book_id, book.title, book.author, book.genre, book.price, book.in_stock, book.image_path)
+                 for book in _books_from_rows(rows, report)]
+    return books, report, line_count
+
+
+def read_books_parallel(path, report=None, file_type=None, workers=None):
+    """
+    Same as read_books, but the file is split into byte ranges that are read and checked
+    by several processes at once. Books still come out in the same order as the file.
+    Each row must be on one line (true for everything export_books writes, unless a value
+    has a line break in it) - otherwise a range could start in the middle of a row.
+    The ranges are about MIN_SHARD_BYTES each and only workers + 1 are handed out at a time,
+    so (like read_books) memory use doesn't grow with the size of the file.
+    """
+    file_type = file_type or file_format(path)
+    workers = workers or os.cpu_count() or 1
+    report = report if report is not None else TransferReport()
+
+    # The CSV header is read here and sent to every worker, since only the first range has it
+    fieldnames = None
+    start = 0
+    first_line = 1
+    if file_type == "csv":
+        with open(path, "rb") as file:
+            header = file.readline()
+        fieldnames = next(csv.reader([header.decode("utf-8")]), None)
+        start = len(header)
+        first_line = 2
+
+    # As many ranges as MIN_SHARD_BYTES allows (file_shards never makes them smaller)
+    shards = file_shards(path, (os.path.getsize(path) - start) // MIN_SHARD_BYTES, start)
+    if len(shards) == 1:
+        # Too small to be worth splitting
+        yield from read_books(path, report, file_type)
+        return
+
+    workers = min(workers, len(shards))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        remaining = iter(shards)
+
+        def submit_next():
+            shard = next(remaining, None)
+            if shard is not None:
+                futures.append(pool.submit(_read_shard, path, file_type, fieldnames, *shard))
+
+        # One range for each worker plus one waiting, so a worker never sits idle
+        # but finished ranges don't pile up while the caller is still busy with earlier books
+        futures = deque()
+        for _ in range(workers + 1):
+            submit_next()
+
+        # Take the results in file order - later ranges keep being read while earlier ones are added
+        while futures:
+            books, shard_report, line_count = futures.popleft().result()
+            submit_next()
+            report.merge(shard_report, first_line - 1)
+            first_line += line_count
+            for fields in books:
+                yield Book(*fields)
+            del books   # Let this range's tuples go before waiting for the next one
+    report.finish()
+
+
+def import_books(path, inventory=None, balanced=True, file_type=None, chunk_size=10_000, workers=1):
+    """
+    Import books from a file
+    Returns (inventory, report)
+    With no inventory (or an empty one) the bulk loaders build all the structures in one go.
+    Otherwise books are added one at a time through the inventory (so the change log records them).
+    Books whose ID or title is already used are skipped and counted as duplicates.
+    (The bulk load doesn't tell the change log, so save a snapshot afterwards.)
+    workers > 1 (or None for one per CPU) reads the file on several processes (see read_books_parallel)
+    """
+    report = TransferReport()
+    if workers == 1:
+        books = read_books(path, report, file_type)
+    else:
+        books = read_books_parallel(path, report, file_type, workers)
+
+    if inventory is None or inventory.size == 0:
+        new_inventory = Inventory.from_books(books, balanced=balanced)
+        if inventory is None:
+            inventory = new_inventory
+        # Keep the caller's inventory object (and its listeners) but use the bulk built structures
+        # (through the inventory, so e.g. a SnapshotInventory rebuilds its snapshot and takes its lock)
+        elif not inventory.replace_structures(new_inventory):
+            # Another thread added books since the check above - add them one at a time after all
+            for book in new_inventory:
+                if not inventory.add(book):
+                    report.duplicates += 1
+        report.duplicates += report.rows - report.rejected - new_inventory.size
+    else:
+        for chunk in chunks(books, chunk_size):
+            for book in chunk:
+                if not inventory.add(book):
+                    report.duplicates += 1
+
+    report.finish()
+    return inventory, report
+
+
+def export_books(books, path, file_type=None):
+    """
+    Write books (an Inventory, or any iterable of books) to a CSV or JSON Lines file
+    Returns a report
+    """
+    file_type = file_type or file_format(path)
+    report = TransferReport()
+
+    # Write to a temporary file first so a failed export never leaves half a file behind
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", newline="", encoding="utf-8") as file:
+        if file_type == "csv":
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            for book in books:
+                data = book_to_dict(book)
+                data["image_path"] = data["image_path"] or ""
+                writer.writerow(data)
+                report.rows += 1
+        else:
+            for book in books:
+                file.write(json.dumps(book_to_dict(book)) + "\n")
+                report.rows += 1
+    os.replace(temp_path, path)
+
+    report.finish()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export the catalogue as CSV or JSON Lines")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("file", help="a .csv or .jsonl file")
+    parser.add_argument("--catalogue", default=CATALOGUE_PATH, help="catalogue snapshot file")
+    parser.add_argument("--sorted", action="store_true", help="export in alphabetical order")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to read an import (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    store = CatalogueStore(args.catalogue)
+    try:
+        inventory = store.open()
+
+        if args.action == "import":
+            inventory, report = import_books(args.file, inventory, workers=args.workers or None)
+            store.save(inventory)
+        else:
+            books = inventory.tree.iter_sorted() if args.sorted else inventory
+            report = export_books(books, args.file)
+    finally:
+        store.close()
+
+    print(f"[{args.action.upper()}] {report.summary()}")
+    for row_number, message in report.errors[:20]:
+        print(f"[ERROR] row {row_number}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# CatalogueStore ties the snapshot file and the change log together
+#
+#   store = CatalogueStore("bookstore.catalogue")
+#   inventory = store.open()      # load snapshot + replay any changes since
+#   inventory.add(book)           # automatically written to the change log
+#   store.save(inventory)         # write a fresh snapshot and empty the log
+
+import os
+
+from data_structures.inventory import Inventory
+from storage.change_log import ChangeLog
+from storage.snapshot import read_snapshot, write_snapshot
+
+
+class CatalogueStore:
+    def __init__(self, path, log_path=None, sync=False):
+        self.path = path                                    # Snapshot file
+        self.log = ChangeLog(log_path or path + ".log", sync=sync)
+        self._inventory = None
+
+    def exists(self):
+        # True if a catalogue has been saved here before
+        return os.path.exists(self.path) or os.path.exists(self.log.path)
+
+    def open(self, balanced=True):
+        """
+        Load the catalogue and start recording changes to the log
+        """
+        if os.path.exists(self.path):
+            inventory = read_snapshot(self.path, balanced=balanced)
+        else:
+            inventory = Inventory(balanced=balanced)
+
+        # Catch up on any edits made after the last snapshot (e.g. before a crash)
+        self.log.replay(inventory)
+
+        self.attach(inventory)
+        return inventory
+
+    def attach(self, inventory):
+        """
+        Start writing this inventory's changes to the log
+        """
+        if self._inventory is not None:
+            self._inventory.remove_listener(self.log.record)
+        inventory.add_listener(self.log.record)
+        self._inventory = inventory
+
+    def save(self, inventory=None):
+        """
+        Write a full snapshot and empty the change log
+        """
+        if inventory is None:
+            inventory = self._inventory
+        write_snapshot(self.path, inventory)
+        self.log.clear()
+
+    def detach(self):
+        """
+        Stop writing changes to the log (e.g. for a big batch that saves a snapshot at the end instead)
+        """
+        if self._inventory is not None:
+            self._inventory.remove_listener(self.log.record)
+            self._inventory = None
+
+    def close(self):
+        self.detach()
+        self.log.close()
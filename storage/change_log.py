@@ -0,0 +1,112 @@
+# Append-only change log
+# Every add/edit/delete is written as one line of JSON straight after it happens.
+# After a crash the last snapshot is loaded and the log is replayed on top, so no edits are lost.
+
+import json
+import os
+
+from models.book import Book
+
+
+def book_to_dict(book):
+    """
+    Convert a book to a plain dictionary (for JSON)
+    """
+    return {
+        "book_id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "genre": book.genre,
+        "price": book.price,
+        "in_stock": book.in_stock,
+        "image_path": book.image_path,
+    }
+
+
+def book_from_dict(data):
+    """
+    Create a book from a dictionary made by book_to_dict
+    """
+    return Book(data["book_id"], data["title"], data["author"], data["genre"], data["price"],
+                in_stock=data.get("in_stock", True), image_path=data.get("image_path"))
+
+
+class ChangeLog:
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync        # sync=True forces every change onto the disk (safer but slower)
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def record(self, action, book, changes=None):
+        """
+        Write one change to the end of the log
+        Has the same arguments as an Inventory listener, so it can be passed to add_listener()
+        """
+        if action == "add":
+            entry = {"action": "add", "book": book_to_dict(book)}
+        elif action == "update":
+            entry = {"action": "update", "book_id": book.id, "changes": changes}
+        elif action == "remove":
+            entry = {"action": "remove", "book_id": book.id}
+        else:
+            raise ValueError(f"Unknown change action '{action}'")
+
+        file = self._open()
+        file.write(json.dumps(entry) + "\n")
+        file.flush()
+        if self.sync:
+            os.fsync(file.fileno())
+
+    def replay(self, inventory):
+        """
+        Apply every change in the log to the inventory
+        Returns how many changes were applied
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        applied = 0
+        good_length = 0         # Bytes of the log that were read successfully
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # A half-written last line means we crashed mid-write
+                    # Cut it off so new changes don't get appended onto the broken line
+                    self.close()
+                    os.truncate(self.path, good_length)
+                    break
+
+                good_length += len(line)
+
+                action = entry["action"]
+                if action == "add":
+                    inventory.add(book_from_dict(entry["book"]))
+                elif action == "update":
+                    inventory.update(entry["book_id"], **entry["changes"])
+                elif action == "remove":
+                    inventory.remove(entry["book_id"])
+                applied += 1
+
+        return applied
+
+    def clear(self):
+        """
+        Empty the log (after its changes have been saved into a new snapshot)
+        """
+        self.close()
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
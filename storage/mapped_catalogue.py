@@ -0,0 +1,190 @@
+# Read-only catalogue that works straight from the snapshot file using mmap
+# Nothing is loaded up front - the operating system pages in only the parts of the file
+# that are actually used, and several processes opening the same file share one copy in memory.
+# Book objects are only created when a lookup finds one.
+#
+#   with MappedCatalogue("bookstore.catalogue") as catalogue:
+#       book = catalogue.hash_table.find_book(12345)
+#       book = catalogue.tree.search_by_title("Animal Farm")
+
+import mmap
+import sys
+
+from models.book import Book
+from storage.snapshot import FIELDS_PER_BOOK, SEPARATOR, read_header
+
+
+class MappedCatalogue:
+    def __init__(self, path):
+        # The snapshot stores little-endian numbers, which are read in place here
+        if sys.byteorder != "little":
+            raise OSError("Memory-mapped catalogues need a little-endian computer - use read_snapshot instead")
+
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = memoryview(self._map)
+
+        self.count, self.bucket_count, sections = read_header(self._data)
+
+        # Views of each column inside the mapped file (no copying)
+        self._ids = self._numbers("q", sections["ids"], self.count)
+        self._prices = self._numbers("d", sections["prices"], self.count)
+        self._stock = self._data[sections["stock"]:sections["stock"] + self.count]
+        self._text_offsets = self._numbers("Q", sections["text_offsets"], self.count + 1)
+        self._text_start = sections["text"]
+        self._bucket_starts = self._numbers("Q", sections["buckets"], self.bucket_count + 1)
+        self._bucket_entries = self._numbers("Q", sections["buckets"] + (self.bucket_count + 1) * 8, self.count)
+        self._title_rows = self._numbers("Q", sections["titles"], self.count)
+
+        # Same lookup methods as HashTable and BinaryTree, but reading from the file
+        self.hash_table = MappedHashTable(self)
+        self.tree = MappedBinaryTree(self)
+
+    def _numbers(self, typecode, position, count):
+        # A memoryview of count numbers starting at position
+        itemsize = 8
+        return self._data[position:position + count * itemsize].cast(typecode)
+
+    def _text(self, row):
+        # Decode the text fields of one row
+        start = self._text_start + self._text_offsets[row]
+        end = self._text_start + self._text_offsets[row + 1] - 1     # -1 skips the trailing separator
+        return str(self._data[start:end], "utf-8").split(SEPARATOR, FIELDS_PER_BOOK - 1)
+
+    def title(self, row):
+        # Only the title of a row (used when searching)
+        start = self._text_start + self._text_offsets[row]
+        end = self._text_start + self._text_offsets[row + 1] - 1
+        return str(self._data[start:end], "utf-8").split(SEPARATOR, 1)[0]
+
+    def book(self, row):
+        # Create a Book object for one row
+        title, author, genre, image_path = self._text(row)
+        return Book(self._ids[row], title, author, genre, self._prices[row],
+                    in_stock=bool(self._stock[row]), image_path=image_path or None)
+
+    @property
+    def size(self):
+        return self.count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Books in the original insertion order
+        for row in range(self.count):
+            yield self.book(row)
+
+    def get(self, book_id):
+        return self.hash_table.find_book(book_id)
+
+    def get_by_title(self, title):
+        return self.tree.search_by_title(title)
+
+    def close(self):
+        # Views must be released before the map can be closed
+        for view in (self._ids, self._prices, self._stock, self._text_offsets,
+                     self._bucket_starts, self._bucket_entries, self._title_rows, self._data):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MappedHashTable:
+    # Looks up books by ID using the hash table buckets saved in the file
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+        self.size = catalogue.bucket_count
+        self.count = catalogue.count
+
+    def find_book(self, book_id):
+        catalogue = self._catalogue
+        if self.size == 0:
+            return None
+
+        # Same hash function as HashTable
+        index = book_id % self.size
+        start = catalogue._bucket_starts[index]
+        end = catalogue._bucket_starts[index + 1]
+
+        # Search through the rows in this bucket
+        for row in catalogue._bucket_entries[start:end]:
+            if catalogue._ids[row] == book_id:
+                return catalogue.book(row)
+
+        # Book not found
+        return None
+
+
+class MappedBinaryTree:
+    # Looks up books by title using the alphabetical order saved in the file
+    # The saved order is searched by halving (binary search), which takes the same
+    # number of steps as walking down a balanced tree
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+        self.size = catalogue.count
+
+    def search_by_title(self, title):
+        catalogue = self._catalogue
+        title_rows = catalogue._title_rows
+        search_title = title.lower()
+
+        low = 0
+        high = self.size
+        while low < high:
+            middle = (low + high) // 2
+            row = title_rows[middle]
+            middle_title = catalogue.title(row).lower()
+
+            if search_title == middle_title:
+                # Found the book!
+                return catalogue.book(row)
+            elif search_title < middle_title:
+                high = middle
+            else:
+                low = middle + 1
+
+        # Book not found
+        return None
+
+    def select(self, position):
+        # The book at a position in alphabetical order - just an index into the saved order
+        if position < 0 or position >= self.size:
+            return None
+        return self._catalogue.book(self._catalogue._title_rows[position])
+
+    def rank(self, title):
+        # Number of titles before title alphabetically (binary search, same as search_by_title)
+        catalogue = self._catalogue
+        search_title = title.lower()
+        low = 0
+        high = self.size
+        while low < high:
+            middle = (low + high) // 2
+            if catalogue.title(catalogue._title_rows[middle]).lower() < search_title:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def slice(self, start, stop=None):
+        # Books at positions start to stop - 1 in alphabetical order
+        # Same rules as BinaryTree.slice - positions are places in the order, not Python indexes,
+        # so a negative start (or stop <= start) gives no books instead of counting from the end
+        stop = self.size if stop is None else min(stop, self.size)
+        if start < 0 or start >= stop:
+            return
+        for row in self._catalogue._title_rows[start:stop]:
+            yield self._catalogue.book(row)
+
+    def iter_sorted(self):
+        # Books in alphabetical order, created one at a time
+        for row in self._catalogue._title_rows:
+            yield self._catalogue.book(row)
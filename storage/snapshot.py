@@ -0,0 +1,215 @@
+# Binary snapshot of the whole catalogue
+# The file holds every book plus the hash table buckets and the title order,
+# so on startup the indexes are rebuilt straight from the file without hashing or sorting.
+#
+# Books are stored column by column (all IDs, then all prices, ...) rather than book by book.
+# That way each column can be read in one go instead of unpacking a million small records.
+#
+# File layout (all numbers little-endian, every section starts on an 8-byte boundary):
+#   header        - magic, book count, bucket count and where each section starts
+#   ids           - book IDs (8 bytes each), in linked list (insertion) order
+#   prices        - prices (8-byte floats)
+#   stock         - in_stock flags (1 byte each)
+#   text offsets  - where each book's text starts in the text section (count + 1 numbers)
+#   text          - title, author, genre and image path of every book, UTF-8,
+#                   all joined together with a separator character
+#   buckets       - hash table layout: bucket start positions, then the row numbers in each bucket
+#   titles        - row numbers in alphabetical title order (binary tree order)
+
+import gc
+import os
+import struct
+import sys
+from array import array
+
+from models.book import Book
+from data_structures.linked_list import DoubleLinkedList
+from data_structures.hash_table import HashTable
+from data_structures.binary_tree import BinaryTree
+from data_structures.inventory import Inventory
+
+MAGIC = b"BKSNAP02"
+
+# magic, book count, bucket count, then the start position of each section
+HEADER = struct.Struct("<8sQQQQQQQQQ")
+SECTIONS = ("ids", "prices", "stock", "text_offsets", "text", "buckets", "titles")
+
+# Separates the text fields - ASCII "unit separator", never appears in normal text
+SEPARATOR = "\x1f"
+FIELDS_PER_BOOK = 4     # title, author, genre, image path
+
+
+def _little_endian(numbers):
+    # array.array uses the computer's own byte order - files always use little-endian
+    if sys.byteorder != "little":
+        numbers = array(numbers.typecode, numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
+
+
+def _write_section(file, data):
+    # Pad with zero bytes so the section starts on an 8-byte boundary, then write it
+    # Returns the position where the section starts
+    position = file.tell()
+    padding = -position % 8
+    file.write(b"\0" * padding)
+    file.write(data)
+    return position + padding
+
+
+def book_text(book):
+    """
+    The text part of one book: title, author, genre and image path joined by SEPARATOR
+    """
+    fields = (book.title, book.author, book.genre, book.image_path or "")
+    for field in fields:
+        if SEPARATOR in field:
+            raise ValueError(f"Book ID {book.id} contains a control character that can't be saved")
+    return SEPARATOR.join(fields)
+
+
+def write_snapshot(path, inventory):
+    """
+    Save the whole inventory to path
+    The file is written to a temporary name first and then swapped in,
+    so a crash while saving never leaves a half-written snapshot behind
+    """
+    temp_path = path + ".tmp"
+    bucket_count = inventory.hash_table.size
+
+    ids = array("q")
+    prices = array("d")
+    stock = bytearray()
+    text_offsets = array("Q", [0])
+    texts = []
+    text_length = 0
+    row_of_id = {}                              # book_id -> row number
+    bucket_rows = [[] for _ in range(bucket_count)]
+
+    # One pass over the books (linked list order) fills every column
+    for row, book in enumerate(inventory):
+        ids.append(book.id)
+        prices.append(float(book.price))
+        stock.append(1 if book.in_stock else 0)
+
+        # Separator goes after every book's text too, so books can be split apart again
+        text = (book_text(book) + SEPARATOR).encode("utf-8")
+        texts.append(text)
+        text_length += len(text)
+        text_offsets.append(text_length)
+
+        row_of_id[book.id] = row
+        bucket_rows[book.id % bucket_count].append(row)
+
+    # Buckets - bucket i holds rows bucket_entries[bucket_starts[i]:bucket_starts[i + 1]]
+    bucket_starts = array("Q", [0])
+    bucket_entries = array("Q")
+    for rows in bucket_rows:
+        bucket_entries.extend(rows)
+        bucket_starts.append(len(bucket_entries))
+
+    # Titles - row numbers in alphabetical order
+    title_rows = array("Q", (row_of_id[book.id] for book in inventory.tree.iter_sorted()))
+
+    with open(temp_path, "wb") as file:
+        # Header is filled in at the end once we know where each section starts
+        file.write(b"\0" * HEADER.size)
+
+        positions = [
+            _write_section(file, _little_endian(ids)),
+            _write_section(file, _little_endian(prices)),
+            _write_section(file, bytes(stock)),
+            _write_section(file, _little_endian(text_offsets)),
+            _write_section(file, b"".join(texts)),
+            _write_section(file, _little_endian(bucket_starts) + _little_endian(bucket_entries)),
+            _write_section(file, _little_endian(title_rows)),
+        ]
+
+        # Go back and write the real header
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, len(ids), bucket_count, *positions))
+
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_path, path)
+
+
+def read_header(data):
+    """
+    Check the magic bytes and return (book count, bucket count, {section name: position})
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Catalogue file is too small to be a snapshot")
+
+    magic, record_count, bucket_count, *positions = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a catalogue snapshot file (bad magic bytes)")
+    return record_count, bucket_count, dict(zip(SECTIONS, positions))
+
+
+def read_numbers(data, typecode, position, count):
+    """
+    Read count numbers of the given array typecode starting at position
+    """
+    numbers = array(typecode)
+    numbers.frombytes(data[position:position + count * numbers.itemsize])
+    if sys.byteorder != "little":
+        numbers.byteswap()
+    return numbers
+
+
+def read_snapshot(path, balanced=True):
+    """
+    Load an Inventory from a snapshot file
+    The hash table and tree are rebuilt from the saved layout, so nothing is hashed or sorted
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    # Python's garbage collector keeps re-scanning all the new objects while millions are created,
+    # which roughly doubles the load time. Nothing here makes garbage, so pause it while loading.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build_inventory(data, balanced)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _build_inventory(data, balanced):
+    # Rebuild the linked list, hash table and tree from the snapshot bytes
+    count, bucket_count, sections = read_header(data)
+
+    # Columns
+    ids = read_numbers(data, "q", sections["ids"], count)
+    prices = read_numbers(data, "d", sections["prices"], count)
+    stock = data[sections["stock"]:sections["stock"] + count]
+    text_offsets = read_numbers(data, "Q", sections["text_offsets"], count + 1)
+
+    # All the text is decoded and split in one go (much faster than one book at a time)
+    text_start = sections["text"]
+    text = str(data[text_start:text_start + text_offsets[count]], "utf-8")
+    fields = text.split(SEPARATOR)
+
+    titles = fields[0::FIELDS_PER_BOOK]
+    authors = fields[1::FIELDS_PER_BOOK]
+    genres = fields[2::FIELDS_PER_BOOK]
+    image_paths = [path or None for path in fields[3::FIELDS_PER_BOOK]]
+
+    books = list(map(Book, ids, titles, authors, genres, prices, map(bool, stock), image_paths))
+
+    # Hash table buckets
+    bucket_starts = read_numbers(data, "Q", sections["buckets"], bucket_count + 1)
+    bucket_entries = read_numbers(data, "Q", sections["buckets"] + (bucket_count + 1) * 8, count)
+    bucket_books = list(map(books.__getitem__, bucket_entries))
+    buckets = [bucket_books[start:end] for start, end in zip(bucket_starts, bucket_starts[1:])]
+
+    # Tree, from the saved alphabetical order
+    title_rows = read_numbers(data, "Q", sections["titles"], count)
+
+    return Inventory.from_structures(DoubleLinkedList.from_books(books),
+                                     HashTable.from_buckets(buckets),
+                                     BinaryTree.from_sorted_books(list(map(books.__getitem__, title_rows)),
+                                                                  balanced=balanced))
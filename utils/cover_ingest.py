@@ -0,0 +1,282 @@
+# Bulk cover image import - attach a whole folder of covers to books in one go
+# Cover files are matched to books by the number at the start of the file name:
+#   12345.jpg, 12345-front.png -> book ID 12345
+#
+# Each cover is checked (image_validator), converted to a standard JPEG in the covers folder,
+# and its thumbnail is made and saved in the same cache folder the GUI uses,
+# so the GUI shows the new covers straight away without decoding them again.
+# The slow part (decoding and re-encoding images) runs on several processes at once.
+#
+# Run from the project folder (close the GUI first - it has the catalogue open):
+#   python -m utils.cover_ingest path/to/publisher_covers
+#   python -m utils.cover_ingest path/to/publisher_covers --covers covers --workers 8
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import os
+import re
+import time
+
+from PIL import Image
+
+from storage.catalogue_store import CatalogueStore
+from utils.image_validator import validate_image
+from utils.thumbnail_cache import ThumbnailCache
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same files as the GUI uses
+CATALOGUE_PATH = os.path.join(PROJECT_DIR, "bookstore.catalogue")
+THUMBNAIL_DIR = os.path.join(PROJECT_DIR, ".thumbnails")
+COVERS_DIR = os.path.join(PROJECT_DIR, "covers")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+
+# Stored covers are JPEGs no taller than this (big scans are shrunk)
+MAX_COVER_HEIGHT = 1200
+JPEG_QUALITY = 90
+
+# Leading digits of the file name are the book ID
+_BOOK_ID_PATTERN = re.compile(r"^(\d+)")
+
+# Each worker process keeps its own thumbnail cache (only used to write thumbnail files)
+_worker_thumbnails = None
+
+
+def scan_covers(folder):
+    """
+    Go through a folder one file at a time (never builds a full list of files)
+    Yields (book_id, file_path) for every image file whose name starts with a book ID
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            match = _BOOK_ID_PATTERN.match(entry.name)
+            if match:
+                yield int(match.group(1)), entry.path
+
+
+def normalise_cover(source_path, dest_path):
+    """
+    Save a cover as an RGB JPEG, shrinking it if it is taller than MAX_COVER_HEIGHT
+    """
+    with Image.open(source_path) as img:
+        # Only decode as many pixels as are needed for the stored size (JPEGs only)
+        if img.height > MAX_COVER_HEIGHT:
+            new_size = (max(1, int(img.width * MAX_COVER_HEIGHT / img.height)), MAX_COVER_HEIGHT)
+            img.draft("RGB", new_size)
+        else:
+            new_size = None
+
+        # Transparent images (PNG/GIF) are put on a white background - JPEG has no transparency
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            cover = Image.new("RGB", rgba.size, "white")
+            cover.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            cover = img.convert("RGB")
+
+        if new_size is not None and cover.size != new_size:
+            cover = cover.resize(new_size, Image.Resampling.LANCZOS)
+
+    # Write to a temporary name first so a half-written cover is never left behind
+    temp_path = dest_path + ".tmp"
+    cover.save(temp_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    os.replace(temp_path, dest_path)
+
+
+def _start_worker(thumbnail_dir, thumbnail_height):
+    # Runs once in each worker process
+    global _worker_thumbnails
+    _worker_thumbnails = ThumbnailCache(height=thumbnail_height, max_bytes=0, cache_dir=thumbnail_dir)
+
+
+def ingest_cover(book_id, source_path, covers_dir):
+    """
+    Validate, normalise and make the thumbnail for one cover (runs in a worker process)
+    Returns (book_id, stored path or None, message)
+    """
+    # Any error is caught here and reported for this one cover - Pillow can raise more than
+    # OSError/ValueError on a bad file (e.g. DecompressionBombError, SyntaxError), and one bad
+    # file must not stop the rest of the batch
+    try:
+        is_valid, message = validate_image(source_path)
+    except Exception as e:
+        return (book_id, None, f"Could not check image: {type(e).__name__}: {e}")
+    if not is_valid:
+        return (book_id, None, message)
+
+    dest_path = os.path.join(covers_dir, f"{book_id}.jpg")
+    try:
+        normalise_cover(source_path, dest_path)
+        if _worker_thumbnails is not None:
+            _worker_thumbnails.get(dest_path)     # Saves the thumbnail file for the GUI
+    except Exception as e:
+        return (book_id, None, f"Could not convert image: {type(e).__name__}: {e}")
+
+    return (book_id, dest_path, message)
+
+
+class IngestReport:
+    # Counters for one import run
+    def __init__(self):
+        self.scanned = 0            # Image files found with a book ID in the name
+        self.attached = 0           # Covers stored and attached to their book
+        self.unknown_book = 0       # No book with that ID in the catalogue
+        self.duplicates = 0         # A second file for a book that already had one in this folder
+        self.failed = 0             # Invalid or unreadable images
+        self.bytes_read = 0
+        self.start_time = time.perf_counter()
+        self.errors = []            # (file path, message) for the failed files
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def progress_line(self):
+        elapsed = self.elapsed()
+        rate = self.attached / elapsed if elapsed > 0 else 0.0
+        return (f"{self.scanned:,} scanned, {self.attached:,} attached, "
+                f"{self.failed:,} failed, {rate:,.0f} covers/s")
+
+    def summary(self):
+        elapsed = self.elapsed()
+        done = self.attached + self.failed
+        lines = [
+            "Cover import",
+            "=" * 40,
+            f"Files scanned:     {self.scanned:10,}",
+            f"Covers attached:   {self.attached:10,}",
+            f"No matching book:  {self.unknown_book:10,}",
+            f"Duplicate files:   {self.duplicates:10,}",
+            f"Failed:            {self.failed:10,}",
+            f"Time:              {elapsed:10.2f} s",
+            f"Throughput:        {done / elapsed if elapsed > 0 else 0.0:10,.1f} covers/s",
+            f"                   {self.bytes_read / 1_000_000 / elapsed if elapsed > 0 else 0.0:10,.1f} MB/s read",
+            "-" * 40,
+        ]
+        return "\n".join(lines)
+
+
+def ingest_folder(folder, store, covers_dir=COVERS_DIR, thumbnail_dir=THUMBNAIL_DIR,
+                  thumbnail_height=80, workers=None, progress_every=1000):
+    """
+    Import every cover in folder into the catalogue opened from store
+    Returns an IngestReport
+    """
+    os.makedirs(covers_dir, exist_ok=True)
+    inventory = store.open()
+    report = IngestReport()
+
+    # Don't write a change log line per cover - one fresh snapshot is saved at the end instead
+    # (if the import is stopped part way, the snapshot still has the covers attached so far)
+    store.detach()
+
+    # Only this many covers are waiting in the pool at once, so a huge folder
+    # doesn't turn into a huge list of pending jobs
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 8
+    jobs = {}       # job -> (book_id, source file), for the jobs still running
+    seen_ids = set()
+
+    def collect(finished_jobs):
+        for job in finished_jobs:
+            book_id, source_path = jobs.pop(job)
+            try:
+                _, dest_path, message = job.result()
+            except Exception as e:
+                # The worker itself failed (e.g. a process died, which fails every cover still on the pool)
+                dest_path, message = None, f"Worker failed: {type(e).__name__}: {e}"
+
+            if dest_path is not None and inventory.update(book_id, image_path=os.path.abspath(dest_path)):
+                report.attached += 1
+            else:
+                report.failed += 1
+                report.errors.append((source_path, message))
+
+            if progress_every and (report.attached + report.failed) % progress_every == 0:
+                print(f"[INGEST] {report.progress_line()}")
+
+    def start_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                                   initargs=(thumbnail_dir, thumbnail_height))
+
+    pool = start_pool()
+    pending = set()
+    try:
+        for book_id, source_path in scan_covers(folder):
+            report.scanned += 1
+
+            # Cheap checks first - no point decoding a cover for a book we don't have
+            if book_id in seen_ids:
+                report.duplicates += 1
+                continue
+            seen_ids.add(book_id)
+
+            if inventory.get(book_id) is None:
+                report.unknown_book += 1
+                continue
+
+            try:
+                report.bytes_read += os.path.getsize(source_path)
+            except OSError:
+                pass
+
+            try:
+                job = pool.submit(ingest_cover, book_id, source_path, covers_dir)
+            except BrokenProcessPool:
+                # A worker process died (e.g. crashed decoding a file) and took the pool with it.
+                # The covers that were still on the pool fail, then a new pool carries on with the rest
+                print("[INGEST] A worker process died - restarting the pool")
+                finished, pending = wait(pending)
+                collect(finished)
+                pool.shutdown()
+                pool = start_pool()
+                job = pool.submit(ingest_cover, book_id, source_path, covers_dir)
+            jobs[job] = (book_id, source_path)
+            pending.add(job)
+
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        finished, pending = wait(pending)
+        collect(finished)
+
+    finally:
+        pool.shutdown(cancel_futures=True)
+        store.save(inventory)
+        store.attach(inventory)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Attach a folder of cover images to books by ID")
+    parser.add_argument("folder", help="folder of cover images named <book id>*.jpg/png/gif/bmp")
+    parser.add_argument("--catalogue", default=CATALOGUE_PATH, help="catalogue snapshot file")
+    parser.add_argument("--covers", default=COVERS_DIR, help="folder to store the converted covers in")
+    parser.add_argument("--thumbnails", default=THUMBNAIL_DIR, help="thumbnail cache folder (same as the GUI)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    store = CatalogueStore(args.catalogue)
+    if not store.exists():
+        parser.error(f"No catalogue found at {args.catalogue} - open the GUI once to create it")
+
+    try:
+        report = ingest_folder(args.folder, store, covers_dir=args.covers,
+                               thumbnail_dir=args.thumbnails, workers=args.workers)
+    finally:
+        store.close()
+
+    print(report.summary())
+    for path, message in report.errors[:20]:
+        print(f"[ERROR] {path}: {message}")
+    if len(report.errors) > 20:
+        print(f"[ERROR] ... and {len(report.errors) - 20:,} more")
+
+
+if __name__ == "__main__":
+    main()
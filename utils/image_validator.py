@@ -1,12 +1,189 @@
 # Image validation utilities for book cover images
-# Using Pillow library to check if image files are valid
+# Only the first few bytes of each file (the header) are read - no pixels are decoded.
+# The header says what kind of image it is (the "magic bytes") and how big it is,
+# which is all we need to check that a cover is a real JPEG, PNG, GIF or BMP file.
+#
+# Results are remembered per (path, modified time, file size), so checking the same
+# cover again (e.g. add then edit) doesn't even open the file.
 
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
 import os
+import struct
+import threading
+
+SUPPORTED_FORMATS = ("JPEG", "PNG", "GIF", "BMP")
+
+# Remembered header results: (path, mtime_ns, size) -> info dict or error message
+# Oldest results are dropped once there are more than _CACHE_LIMIT
+_header_cache = {}
+_cache_lock = threading.Lock()      # validate_image is called from GUI worker threads
+_CACHE_LIMIT = 10000
+
+# Batches smaller than this are checked in this process - starting worker processes costs more
+_MIN_PARALLEL_BATCH = 64
+
+# JPEG markers that start a frame (SOF) - these hold the image size
+# (0xC4, 0xC8 and 0xCC use the same range but mean something else)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# PNG colour type -> Pillow-style mode name
+_PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+_JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
+
+def _read_png(f):
+    # 8 byte signature, then the IHDR chunk: length, "IHDR", width, height, bit depth, colour type
+    header = f.read(26)
+    if len(header) < 26 or header[12:16] != b"IHDR":
+        raise ValueError("PNG header is damaged")
+    width, height = struct.unpack(">II", header[16:24])
+    return "PNG", width, height, _PNG_MODES.get(header[25], "RGB")
+
+
+def _read_gif(f):
+    # "GIF87a"/"GIF89a", then width and height (2 bytes each)
+    header = f.read(10)
+    if len(header) < 10:
+        raise ValueError("GIF header is damaged")
+    width, height = struct.unpack("<HH", header[6:10])
+    return "GIF", width, height, "P"
+
+
+def _read_bmp(f):
+    # 14 byte file header, then a DIB header that starts with its own size
+    header = f.read(30)
+    if len(header) < 26:
+        raise ValueError("BMP header is damaged")
+    dib_size = struct.unpack("<I", header[14:18])[0]
+
+    if dib_size == 12:
+        # Old OS/2 style header - 2 byte width and height
+        width, height, _, bits = struct.unpack("<HHHH", header[18:26])
+    else:
+        if len(header) < 30:
+            raise ValueError("BMP header is damaged")
+        # Height is negative for images stored top to bottom
+        width, height, _, bits = struct.unpack("<iiHH", header[18:30])
+        height = abs(height)
+
+    return "BMP", width, height, "P" if bits <= 8 else "RGB"
+
+
+def _read_jpeg(f):
+    # A JPEG is a list of segments: 0xFF, marker, 2 byte length, data
+    # Skip segments (EXIF data, colour tables, ...) until the frame header with the size
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("JPEG ended before the image size")
+        if byte != b"\xff":
+            continue
+
+        # Any number of 0xFF padding bytes can come before the marker
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            raise ValueError("JPEG ended before the image size")
+        marker = marker[0]
+
+        # Markers with no data after them
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue
+
+        # Start of scan (pixel data) without a frame header - not a valid JPEG
+        if marker in (0xD9, 0xDA):
+            raise ValueError("JPEG has no frame header")
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            raise ValueError("JPEG ended before the image size")
+        length = struct.unpack(">H", length_bytes)[0]
+
+        if marker in _JPEG_SOF_MARKERS:
+            # precision (1 byte), height, width (2 bytes each), number of colour components
+            frame = f.read(6)
+            if len(frame) < 6:
+                raise ValueError("JPEG frame header is damaged")
+            _, height, width, components = struct.unpack(">BHHB", frame)
+            return "JPEG", width, height, _JPEG_MODES.get(components, "RGB")
+
+        # Jump over this segment's data
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_header(file_path):
+    """
+    Read the format and size of an image from its header
+    Returns (format, width, height, mode)
+    Raises ValueError if it isn't a supported image and OSError if it can't be read
+    """
+    with open(file_path, "rb") as f:
+        magic = f.read(8)
+        f.seek(0)
+
+        if magic.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _read_png(f)
+        if magic.startswith((b"GIF87a", b"GIF89a")):
+            return _read_gif(f)
+        if magic.startswith(b"BM"):
+            return _read_bmp(f)
+        if magic.startswith(b"\xff\xd8"):
+            return _read_jpeg(f)
+
+    raise ValueError(f"Unsupported image format (expected {', '.join(SUPPORTED_FORMATS)})")
+
+
+def _cache_key(file_path):
+    # Path + modified time + size - changes whenever the image file is replaced
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _header_info(file_path):
+    # Header info for a file, using the remembered result if the file hasn't changed
+    # Returns an info dict, or an error message string if the file isn't a valid image
+    key = _cache_key(file_path)
+
+    with _cache_lock:
+        result = _header_cache.get(key)
+    if result is not None:
+        return result
+
+    try:
+        image_format, width, height, mode = read_header(file_path)
+        result = {
+            'format': image_format,
+            'width': width,
+            'height': height,
+            'mode': mode  # RGB, RGBA, etc.
+        }
+    except (ValueError, struct.error) as e:
+        result = str(e)
+
+    _remember(key, result)
+    return result
+
+
+def _remember(key, result):
+    with _cache_lock:
+        # Dictionaries keep insertion order, so the first key is the oldest
+        if len(_header_cache) >= _CACHE_LIMIT:
+            del _header_cache[next(iter(_header_cache))]
+        _header_cache[key] = result
+
+
+def clear_cache():
+    # Forget all remembered results
+    with _cache_lock:
+        _header_cache.clear()
+
 
 def validate_image(file_path):
     """
-    Check if a file is a valid image using Pillow
+    Check if a file is a valid image by reading its header
     Returns (success, message) tuple
     """
 
@@ -18,29 +195,22 @@ def validate_image(file_path):
     if not os.path.exists(file_path):
         return (False, f"Image file not found: {file_path}")
 
-    # Try to open and validate the image using Pillow
     try:
-        # Open the image file
-        img = Image.open(file_path)
-
-        # Verify it's actually an image by checking format
-        if img.format not in ['JPEG', 'PNG', 'GIF', 'BMP']:
-            return (False, f"Unsupported image format: {img.format}")
+        info = _header_info(file_path)
+    except OSError as e:
+        return (False, f"Invalid image file: {str(e)}")
 
-        # Check image dimensions are reasonable (not corrupted)
-        width, height = img.size
-        if width < 1 or height < 1:
-            return (False, "Invalid image dimensions")
+    # An error message instead of info means the header wasn't a valid image
+    if isinstance(info, str):
+        return (False, f"Invalid image file: {info}")
 
-        # Close the image file
-        img.close()
+    # Check image dimensions are reasonable (not corrupted)
+    width, height = info['width'], info['height']
+    if width < 1 or height < 1:
+        return (False, "Invalid image dimensions")
 
-        # If we got here, the image is valid
-        return (True, f"Valid {img.format} image ({width}x{height})")
-
-    except Exception as e:
-        # Pillow throws an exception if the file isn't a valid image
-        return (False, f"Invalid image file: {str(e)}")
+    # If we got here, the image is valid
+    return (True, f"Valid {info['format']} image ({width}x{height})")
 
 
 def get_image_info(file_path):
@@ -53,17 +223,62 @@ def get_image_info(file_path):
         return None
 
     try:
-        img = Image.open(file_path)
+        info = _header_info(file_path)
+    except OSError:
+        return None
 
-        info = {
-            'format': img.format,
-            'width': img.size[0],
-            'height': img.size[1],
-            'mode': img.mode  # RGB, RGBA, etc.
-        }
+    if isinstance(info, str):
+        return None
+    return dict(info)   # Copy so callers can't change the remembered result
 
-        img.close()
-        return info
 
-    except Exception:
-        return None
+def _validate_chunk(paths):
+    # Runs in a worker process - returns (path, (success, message), cache entry) for each path
+    # The cache entry is (key, header result), or None if the header wasn't read,
+    # so the main process can remember the results too
+    results = []
+    for path in paths:
+        outcome = validate_image(path)
+        entry = None
+        try:
+            key = _cache_key(path)
+            if key in _header_cache:
+                entry = (key, _header_cache[key])
+        except (OSError, TypeError, ValueError):
+            pass    # Missing file or no path - nothing was remembered
+        results.append((path, outcome, entry))
+    return results
+
+
+def validate_images(paths, max_workers=None):
+    """
+    Validate many image files at once, spread over several processes
+    Returns a dictionary of path -> (success, message)
+    """
+    paths = list(paths)
+
+    # Small batches are quicker to do here than to send to other processes
+    if len(paths) < _MIN_PARALLEL_BATCH:
+        return {path: validate_image(path) for path in paths}
+
+    # Send the paths in chunks so each process gets a good amount of work per message
+    workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, len(paths) // (workers * 4))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_results in pool.map(_validate_chunk, chunks):
+            for path, outcome, entry in chunk_results:
+                results[path] = outcome
+                if entry is not None:
+                    _remember(*entry)
+    return results
+
+
+def image_files(folder):
+    # Paths of the files in a folder that look like images (by extension), e.g. for validate_images
+    extensions = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+    with os.scandir(folder) as entries:
+        return [entry.path for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(extensions)]
@@ -0,0 +1,124 @@
+# Thumbnail cache for book cover images
+# Opening and resizing a full-size cover is slow, so each thumbnail is made once and kept:
+#   - in memory (least recently used thumbnails are dropped when the memory budget is full)
+#   - optionally on disk as small PNG files, so they survive restarting the app
+# Thumbnails are looked up by file path + modified time + file size,
+# so replacing a cover image automatically makes a new thumbnail.
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+from PIL import Image
+
+
+def make_thumbnail(file_path, height=80):
+    """
+    Open an image and resize it to the given height (width keeps the same proportions)
+    Returns a Pillow Image
+    """
+    with Image.open(file_path) as img:
+        thumbnail_width = max(1, int(height * img.width / img.height))
+
+        # For JPEGs, draft() lets the decoder skip most of the full-size pixels
+        # (it decodes at 1/2, 1/4 or 1/8 scale), which is much faster for large photos
+        img.draft(img.mode, (thumbnail_width, height))
+
+        # Resize the image using LANCZOS for good quality
+        return img.resize((thumbnail_width, height), Image.Resampling.LANCZOS)
+
+
+class ThumbnailCache:
+    def __init__(self, height=80, max_bytes=32 * 1024 * 1024, cache_dir=None):
+        self.height = height            # Thumbnail height in pixels
+        self.max_bytes = max_bytes      # Memory budget for thumbnails kept in memory
+        self.cache_dir = cache_dir      # Folder for thumbnail files (None = memory only)
+
+        # key -> (thumbnail, size in bytes), oldest used first
+        self._thumbnails = OrderedDict()
+        self._total_bytes = 0
+
+        # get() can be called from several worker threads at once, so the
+        # in-memory cache is protected by a lock (images are decoded outside the lock)
+        self._lock = threading.Lock()
+
+        # Counters for testing/debugging
+        self.hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, file_path):
+        # Path + modified time + size - changes whenever the image file is replaced
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, self.height)
+
+    def _disk_path(self, key):
+        # File name made from a hash of the key, so it is unique and safe to use as a name
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + ".png")
+
+    def get(self, file_path):
+        """
+        Get the thumbnail for an image file, making it if needed
+        Raises OSError if the file can't be opened (same as Image.open)
+        """
+        key = self._key(file_path)
+
+        # 1. Already in memory
+        with self._lock:
+            entry = self._thumbnails.get(key)
+            if entry is not None:
+                self._thumbnails.move_to_end(key)   # Mark as most recently used
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+
+        # 2. Saved on disk from an earlier run
+        thumbnail = None
+        if self.cache_dir:
+            disk_path = self._disk_path(key)
+            if os.path.exists(disk_path):
+                try:
+                    with Image.open(disk_path) as img:
+                        img.load()
+                        thumbnail = img.copy()
+                except OSError:
+                    thumbnail = None    # Damaged cache file - just make it again
+
+        # 3. Make it from the full-size image
+        if thumbnail is None:
+            thumbnail = make_thumbnail(file_path, self.height)
+            if self.cache_dir:
+                try:
+                    thumbnail.save(self._disk_path(key), "PNG")
+                except OSError as e:
+                    print(f"[WARNING] Could not save thumbnail for {file_path}: {e}")
+
+        self._store(key, thumbnail)
+        return thumbnail
+
+    def _store(self, key, thumbnail):
+        # Keep a thumbnail in memory, dropping the least recently used ones if over budget
+        size = thumbnail.width * thumbnail.height * len(thumbnail.getbands())
+        with self._lock:
+            # Another thread may have stored the same thumbnail while this one was decoding
+            old_entry = self._thumbnails.pop(key, None)
+            if old_entry is not None:
+                self._total_bytes -= old_entry[1]
+
+            self._thumbnails[key] = (thumbnail, size)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes and len(self._thumbnails) > 1:
+                _, (_, old_size) = self._thumbnails.popitem(last=False)
+                self._total_bytes -= old_size
+
+    def clear(self):
+        # Forget all thumbnails held in memory (files on disk are kept)
+        with self._lock:
+            self._thumbnails.clear()
+            self._total_bytes = 0